@@ -7,12 +7,13 @@ from django import forms
 from django.urls import path, reverse
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.db.models.functions import TruncMonth
 import datetime
 import json
 import urllib.parse
 from django.utils.safestring import mark_safe
+from .search import search_athletes
 from .models import (
     City,
     Club,
@@ -774,13 +775,24 @@ class RefereeScoreInline(admin.TabularInline):
             'all': ('admin/css/referee_rounds_narrow.css',)
         }
 
+    def _match_results(self, obj):
+        """Scoring results for the row's match, computed once per match.
+
+        Inline instances are created per request, so the cache lives for one
+        change-form render instead of being recomputed for every cell.
+        """
+        cache = self.__dict__.setdefault('_results_cache', {})
+        if obj.match_id not in cache:
+            from api.scoring import compute_match_results_from_totals
+            cache[obj.match_id] = compute_match_results_from_totals(obj.match)
+        return cache[obj.match_id]
+
     def red_total(self, obj):
         """Computed RED TOTAL: sum of round scores minus central penalties (read-only)."""
         if obj is None:
             return ''
         try:
-            from api.scoring import compute_match_results
-            res = compute_match_results(obj.match)
+            res = self._match_results(obj)
             per = res.get('per_ref', {})
             p = per.get(obj.referee_id)
             if not p:
@@ -804,8 +816,7 @@ class RefereeScoreInline(admin.TabularInline):
 
     def _red_round(self, obj, rd):
         try:
-            from api.scoring import compute_match_results
-            res = compute_match_results(obj.match)
+            res = self._match_results(obj)
             per = res.get('per_ref', {})
             p = per.get(obj.referee_id, {})
             rounds = p.get('rounds', {}) or {}
@@ -821,8 +832,7 @@ class RefereeScoreInline(admin.TabularInline):
         if obj is None:
             return ''
         try:
-            from api.scoring import compute_match_results
-            res = compute_match_results(obj.match)
+            res = self._match_results(obj)
             per = res.get('per_ref', {})
             p = per.get(obj.referee_id)
             if not p:
@@ -846,8 +856,7 @@ class RefereeScoreInline(admin.TabularInline):
 
     def _blue_round(self, obj, rd):
         try:
-            from api.scoring import compute_match_results
-            res = compute_match_results(obj.match)
+            res = self._match_results(obj)
             per = res.get('per_ref', {})
             p = per.get(obj.referee_id, {})
             rounds = p.get('rounds', {}) or {}
@@ -863,8 +872,7 @@ class RefereeScoreInline(admin.TabularInline):
         if obj is None:
             return ''
         try:
-            from api.scoring import compute_match_results
-            res = compute_match_results(obj.match)
+            res = self._match_results(obj)
             per = res.get('per_ref', {})
             p = per.get(obj.referee_id)
             if not p:
@@ -895,8 +903,7 @@ class RefereeScoreInline(admin.TabularInline):
                     return 'Blue'
 
             # Otherwise compute adjusted winner
-            from api.scoring import compute_match_results
-            res = compute_match_results(obj.match)
+            res = self._match_results(obj)
             per = res.get('per_ref', {})
             p = per.get(obj.referee_id)
             if not p:
@@ -1561,6 +1568,10 @@ class CategoryAdmin(admin.ModelAdmin):
             ('CATEGORY DETAILS', {
                 'fields': ('name', 'event', 'group', 'type', 'gender')
             }),
+            ('ELIGIBILITY', {
+                'fields': (('min_age', 'max_age'), ('min_grade', 'max_grade'), ('requires_medical_visa', 'requires_annual_visa')),
+                'classes': ('collapse',),
+            }),
         ]
         if obj and obj.type in ['solo', 'fight']:
             fieldsets.append(('AWARDS - INDIVIDUAL', {
@@ -1845,6 +1856,7 @@ class MatchAdmin(admin.ModelAdmin):
 
     # Show per-referee score inline and a read-only list of central penalties
     inlines = [RefereeScoreInline, CentralPenaltyInline]
+    actions = ['restore_archived_events']
 
     class Media:
         js = ('/static/api/js/referee_inline_winner.js', '/static/api/js/recompute_match_results.js',)
@@ -1886,8 +1898,8 @@ class MatchAdmin(admin.ModelAdmin):
         try:
             # Prefer the computed winner from referee aggregates so the change-list
             # reflects the same logic as the change form.
-            from api.scoring import compute_match_results
-            results = compute_match_results(obj)
+            from api.scoring import compute_match_results_from_totals
+            results = compute_match_results_from_totals(obj)
             mw = results.get('match_winner')
             if mw:
                 return f"{mw.first_name} {mw.last_name}"
@@ -1905,8 +1917,8 @@ class MatchAdmin(admin.ModelAdmin):
         or 'TBD' when no winner can be determined.
         """
         try:
-            from api.scoring import compute_match_results
-            results = compute_match_results(obj)
+            from api.scoring import compute_match_results_from_totals
+            results = compute_match_results_from_totals(obj)
             mw = results.get('match_winner')
             if mw:
                 return f"{mw.first_name} {mw.last_name}"
@@ -1940,6 +1952,27 @@ class MatchAdmin(admin.ModelAdmin):
                 kwargs['queryset'] = Athlete.objects.filter(is_referee=True)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    @admin.action(description=_('Restore archived point events'), permissions=['change'])
+    def restore_archived_events(self, request, queryset):
+        from .archive import restore_match_events
+        restored = restore_match_events(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'Restored {restored} archived point events.')
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        # The inlines edit RefereePointEvent rows directly. Showing the page
+        # never writes; an archived event log is brought back into the hot
+        # table on save (or with the restore action) by users who may change it.
+        from .archive import restore_match_events
+        from .models import MatchEventArchive
+        if str(object_id).isdigit() and MatchEventArchive.objects.filter(match_id=object_id).exists():
+            match = self.get_object(request, object_id)
+            if request.method == 'POST' and match is not None and self.has_change_permission(request, match):
+                restore_match_events([match.pk])
+            elif request.method == 'GET':
+                messages.info(request, _("This match's point events are archived; saving the match (or the "
+                                         "'Restore archived point events' action) moves them back for editing."))
+        return super().change_view(request, object_id, form_url, extra_context)
+
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
@@ -1995,58 +2028,20 @@ class MatchAdmin(admin.ModelAdmin):
                 try:
                     from django.db import transaction
                     from .models import RefereeScore
+                    from api.scoring import compute_match_results_from_totals
 
                     with transaction.atomic():
-                        # Recompute totals using all events for this match
-                        events_all = list(RefereePointEvent.objects.filter(match=match).order_by('timestamp'))
-                        per_ref = {}
-                        central_penalties = {'red': 0, 'blue': 0}
-                        central_id = getattr(match, 'central_referee_id', None)
-                        for e in events_all:
-                            rid = e.referee_id
-                            if rid not in per_ref:
-                                per_ref[rid] = {'red': 0, 'blue': 0}
-                            per_ref[rid][e.side] = per_ref[rid].get(e.side, 0) + (e.points or 0)
-                            if central_id and e.referee_id == central_id and e.event_type == 'penalty':
-                                central_penalties[e.side] = central_penalties.get(e.side, 0) + (e.points or 0)
-
-                        referee_scores = []
-                        for rid, sums in per_ref.items():
-                            red = sums.get('red', 0)
-                            blue = sums.get('blue', 0)
-                            adj_red = red - central_penalties.get('red', 0)
-                            adj_blue = blue - central_penalties.get('blue', 0)
-                            if adj_red > adj_blue:
-                                winner = 'red'
-                            elif adj_blue > adj_red:
-                                winner = 'blue'
-                            else:
-                                winner = None
-                            rs, _ = RefereeScore.objects.update_or_create(
+                        # Use the shared scoring helper so this view persists the
+                        # same results as the recompute button and aggregator.
+                        results = compute_match_results_from_totals(match)
+                        for (rid, red, blue, winner) in results.get('referee_scores_data', []):
+                            RefereeScore.objects.update_or_create(
                                 match=match,
                                 referee_id=rid,
                                 defaults={'red_corner_score': red, 'blue_corner_score': blue, 'winner': winner}
                             )
-                            referee_scores.append(rs)
-
-                        # Determine match winner by majority votes
-                        votes_red = sum(1 for r in referee_scores if r.winner == 'red')
-                        votes_blue = sum(1 for r in referee_scores if r.winner == 'blue')
-                        chosen_winner = None
-                        if votes_red >= 3 and votes_red > votes_blue:
-                            chosen_winner = match.red_corner
-                        elif votes_blue >= 3 and votes_blue > votes_red:
-                            chosen_winner = match.blue_corner
-                        else:
-                            total_red = sum(r.red_corner_score for r in referee_scores) - (central_penalties.get('red', 0) * len(referee_scores))
-                            total_blue = sum(r.blue_corner_score for r in referee_scores) - (central_penalties.get('blue', 0) * len(referee_scores))
-                            if total_red > total_blue:
-                                chosen_winner = match.red_corner
-                            elif total_blue > total_red:
-                                chosen_winner = match.blue_corner
-                            else:
-                                chosen_winner = None
 
+                        chosen_winner = results.get('match_winner')
                         if match.winner != chosen_winner:
                             match.winner = chosen_winner
                             match.save()
@@ -2231,8 +2226,8 @@ class MatchAdmin(admin.ModelAdmin):
             # done in save_related but gives faster feedback in the same save
             # operation (the full recompute still runs in save_related).
             try:
-                from api.scoring import compute_match_results
-                results = compute_match_results(match)
+                from api.scoring import compute_match_results_from_totals
+                results = compute_match_results_from_totals(match)
                 for (rid, red, blue, winner) in results.get('referee_scores_data', []):
                     try:
                         existing = RefereeScore.objects.filter(match=match, referee_id=rid).first()
@@ -2273,11 +2268,12 @@ class MatchAdmin(admin.ModelAdmin):
 
         # Then run the shared helper and persist winners based on the saved DB state
         try:
-            from .models import RefereePointEvent, RefereeScore
-            from api.scoring import compute_match_results
+            from .models import RefereeScore
+            from api.scoring import compute_match_results_from_totals
             match = form.instance
-            events_qs = RefereePointEvent.objects.filter(match=match)
-            results = compute_match_results(match, events_qs)
+            # Read the per-round running totals kept in sync by the event inlines
+            # instead of replaying the match's whole event log.
+            results = compute_match_results_from_totals(match)
 
             # Persist per-referee winners/scores. Do not overwrite an explicit
             # referee winner that was provided via the inline form: prefer the
@@ -2340,9 +2336,8 @@ class MatchAdmin(admin.ModelAdmin):
 
         try:
             # Recompute using the shared helper and persist per-referee winners
-            from api.scoring import compute_match_results
-            events_qs = RefereePointEvent.objects.filter(match=match)
-            results = compute_match_results(match, events_qs)
+            from api.scoring import compute_match_results_from_totals
+            results = compute_match_results_from_totals(match)
 
             persisted = []
             for (rid, red, blue, winner) in results.get('referee_scores_data', []):
@@ -2637,7 +2632,20 @@ class AthleteAdmin(admin.ModelAdmin):
         # If autocomplete is being called for examiner_1/examiner_2 (or referer points to GradeHistory), restrict to coaches
         if field in ('examiner_1', 'examiner_2') or 'admin/api/gradehistory' in referer.lower():
             queryset = queryset.filter(is_coach=True)
-        return super().get_search_results(request, queryset, search_term)
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+
+        # Names go through the indexed, diacritic-insensitive search; autocomplete
+        # widgets only search names and keep its relevance order.
+        by_name = search_athletes(queryset, search_term)
+        if request.path.endswith('/autocomplete/'):
+            return by_name, False
+        others = super().get_search_results(request, queryset, search_term)[0]
+        return queryset.filter(Q(pk__in=by_name.values('pk')) | Q(pk__in=others.values('pk'))), False
+
+    def get_search_fields(self, request):
+        # first/last name are matched by get_search_results through search_athletes
+        return [f for f in super().get_search_fields(request) if f not in ('first_name', 'last_name')]
 
     def save_model(self, request, obj, form, change):
         """
@@ -0,0 +1,256 @@
+"""Set-based aggregation of pending RefereePointEvent rows.
+
+The aggregation command used to walk every match and issue one events query,
+one `update_or_create` per referee and one `match.save()` per match. The
+helpers below process matches in chunks instead: the pending backlog of a
+whole chunk is read with one grouped query, results are derived in memory
+from the `RefereeRoundTotal` running totals (so earlier, already processed
+events are accounted for), and written back with one upsert for
+`RefereeScore` and one `bulk_update` for `Match.winner` per chunk.
+
+`run_worker` keeps polling for pending events; several workers (threads or
+processes) can run side by side because each match is claimed first, with
+row locks where the backend supports SKIP LOCKED and a conditional UPDATE
+otherwise.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .models import Match, RefereePointEvent, RefereeScore, sync_match_to_category_scores
+from .pools import refresh_pools_for_matches
+from .scoring import compute_match_results_from_totals
+
+
+@dataclass
+class AggregationStats:
+    """Counters reported by `aggregate_pending_events`."""
+    chunks: int = 0
+    matches: int = 0
+    events: int = 0
+    referee_scores: int = 0
+    winners_changed: int = 0
+    idle_polls: int = 0
+    lag_seconds_total: float = 0.0
+    lag_seconds_max: float = 0.0
+    match_winners: Dict[int, Optional[int]] = field(default_factory=dict)
+
+
+def pending_match_ids(match_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Return the ordered ids of matches that have unprocessed events."""
+    qs = RefereePointEvent.objects.filter(processed=False)
+    if match_ids is not None:
+        qs = qs.filter(match_id__in=list(match_ids))
+    return list(qs.order_by('match_id').values_list('match_id', flat=True).distinct())
+
+
+def _pending_counts(match_ids: Iterable[int]) -> Dict[int, dict]:
+    """Per-match pending event count, highest pending id and oldest timestamp."""
+    return {
+        row['match_id']: row
+        for row in RefereePointEvent.objects.filter(match_id__in=list(match_ids), processed=False)
+        .values('match_id')
+        .annotate(n=Count('pk'), max_id=Max('pk'), oldest=Min('timestamp'))
+    }
+
+
+def _score_matches(pending: Dict[int, dict], dry_run: bool, stats: AggregationStats) -> None:
+    """Score the matches in `pending` from their running totals and write the results.
+
+    Must run inside a transaction; marking the events processed is left to
+    the caller since that is also how workers claim matches.
+    """
+    matches = {
+        m.pk: m
+        for m in Match.objects.filter(pk__in=list(pending))
+        .select_related('red_corner', 'blue_corner')
+        .prefetch_related('referee_scores', 'round_totals')
+    }
+    now = timezone.now()
+    score_rows = []
+    changed_matches = []
+    for match_id in sorted(pending):
+        match = matches.get(match_id)
+        if match is None:
+            continue
+        results = compute_match_results_from_totals(match)
+        for (rid, red, blue, winner) in results.get('referee_scores_data', []):
+            score_rows.append(RefereeScore(
+                match_id=match_id,
+                referee_id=rid,
+                red_corner_score=red,
+                blue_corner_score=blue,
+                winner=winner,
+            ))
+        match_winner = results.get('match_winner')
+        winner_id = match_winner.pk if match_winner else None
+        if match.winner_id != winner_id:
+            match.winner = match_winner
+            changed_matches.append(match)
+        stats.matches += 1
+        stats.events += pending[match_id]['n']
+        stats.match_winners[match_id] = winner_id
+        oldest = pending[match_id].get('oldest')
+        if oldest is not None:
+            lag = max(0.0, (now - oldest).total_seconds())
+            stats.lag_seconds_total += lag
+            stats.lag_seconds_max = max(stats.lag_seconds_max, lag)
+
+    stats.chunks += 1
+    stats.referee_scores += len(score_rows)
+    stats.winners_changed += len(changed_matches)
+    if dry_run:
+        return
+
+    if score_rows:
+        RefereeScore.objects.bulk_create(
+            score_rows,
+            update_conflicts=True,
+            unique_fields=['match', 'referee'],
+            update_fields=['red_corner_score', 'blue_corner_score', 'winner'],
+        )
+    if changed_matches:
+        Match.objects.bulk_update(changed_matches, ['winner'])
+
+    # bulk writes bypass post_save, so mirror the match -> category result
+    # sync explicitly for matches that have a winner.
+    for match in matches.values():
+        if match.pk in pending and match.winner_id:
+            # Drop the stale prefetch so the sync reads the upserted scores.
+            getattr(match, '_prefetched_objects_cache', {}).pop('referee_scores', None)
+            sync_match_to_category_scores(Match, instance=match)
+    # Same for the pool tables of the scored matches.
+    refresh_pools_for_matches([pk for pk in matches if pk in pending])
+
+
+def aggregate_match_chunk(match_ids: List[int], dry_run: bool = False, stats: Optional[AggregationStats] = None) -> AggregationStats:
+    """Aggregate pending events for `match_ids` with a fixed number of queries.
+
+    Events are marked processed only up to the highest pending id that was
+    read so events appended concurrently are left for the next run.
+    """
+    stats = stats if stats is not None else AggregationStats()
+    if not match_ids:
+        return stats
+
+    with transaction.atomic():
+        pending = _pending_counts(match_ids)
+        if not pending:
+            return stats
+        _score_matches(pending, dry_run, stats)
+        if not dry_run:
+            max_event_id = max(row['max_id'] for row in pending.values())
+            RefereePointEvent.objects.filter(
+                match_id__in=list(pending), processed=False, pk__lte=max_event_id
+            ).update(processed=True)
+
+    return stats
+
+
+def _claim_with_row_locks(batch_size: int, stats: AggregationStats) -> int:
+    """Claim matches by locking their rows with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    The locks are held until the chunk commits, so concurrent workers skip
+    matches another worker is scoring instead of waiting for them.
+    """
+    with transaction.atomic():
+        claimed = list(
+            Match.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(pk__in=RefereePointEvent.objects.filter(processed=False).values('match_id'))
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        before = stats.matches
+        aggregate_match_chunk(claimed, stats=stats)
+        return stats.matches - before
+
+
+def _claim_with_conditional_update(batch_size: int, stats: AggregationStats) -> int:
+    """Claim matches on backends without row locks (SQLite).
+
+    Candidates are read outside the transaction; each one is then claimed by
+    flipping its pending events to processed. Only the worker whose UPDATE
+    matched rows owns the match, and since the claim and the result writes
+    commit together a crashed worker leaves the events pending.
+    """
+    candidate_ids = list(
+        RefereePointEvent.objects.filter(processed=False)
+        .order_by('match_id').values_list('match_id', flat=True).distinct()[:batch_size]
+    )
+    candidates = _pending_counts(candidate_ids)
+    if not candidates:
+        return 0
+    with transaction.atomic():
+        claimed = {}
+        for match_id, row in candidates.items():
+            updated = RefereePointEvent.objects.filter(
+                match_id=match_id, processed=False, pk__lte=row['max_id']
+            ).update(processed=True)
+            if updated:
+                claimed[match_id] = dict(row, n=updated)
+        if claimed:
+            _score_matches(claimed, False, stats)
+    return len(claimed)
+
+
+def claim_and_aggregate(batch_size: int = 100, stats: Optional[AggregationStats] = None) -> int:
+    """Claim up to `batch_size` matches with pending events and aggregate them.
+
+    Safe to call from several workers at once: a match is only scored by the
+    worker that claimed it. Returns the number of matches processed.
+    """
+    stats = stats if stats is not None else AggregationStats()
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_with_row_locks(batch_size, stats)
+    return _claim_with_conditional_update(batch_size, stats)
+
+
+def backlog_stats() -> Dict[str, int]:
+    """Return the number of pending events and of matches that have some."""
+    return RefereePointEvent.objects.filter(processed=False).aggregate(
+        events=Count('pk'), matches=Count('match_id', distinct=True)
+    )
+
+
+def run_worker(poll_interval: float = 1.0, batch_size: int = 100, max_loops: Optional[int] = None, stop_event=None, stats: Optional[AggregationStats] = None, on_loop=None) -> AggregationStats:
+    """Poll for pending events until `stop_event` is set or `max_loops` is reached.
+
+    A loop that processed something polls again immediately so a backlog is
+    drained at full speed; an idle loop sleeps `poll_interval` seconds.
+    `on_loop(stats)` is called after every poll.
+    """
+    stats = stats if stats is not None else AggregationStats()
+    loops = 0
+    while not (stop_event is not None and stop_event.is_set()):
+        if max_loops is not None and loops >= max_loops:
+            break
+        loops += 1
+        processed = claim_and_aggregate(batch_size, stats)
+        if on_loop is not None:
+            on_loop(stats)
+        if processed:
+            continue
+        stats.idle_polls += 1
+        if stop_event is not None:
+            stop_event.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+    return stats
+
+
+def aggregate_pending_events(match_ids: Optional[Iterable[int]] = None, batch_size: int = 500, dry_run: bool = False, on_chunk=None) -> AggregationStats:
+    """Aggregate every match with pending events, `batch_size` matches at a time.
+
+    `on_chunk(stats)` is called after each chunk so callers can report progress.
+    """
+    stats = AggregationStats()
+    ids = pending_match_ids(match_ids)
+    for start in range(0, len(ids), batch_size):
+        aggregate_match_chunk(ids[start:start + batch_size], dry_run=dry_run, stats=stats)
+        if on_chunk is not None:
+            on_chunk(stats)
+    return stats
@@ -0,0 +1,194 @@
+"""Cold storage for the RefereePointEvent log of finished matches.
+
+Only live matches need their events in the hot table. `archive_matches`
+compacts the log of a finished match (no pending events, last event older
+than `POINT_EVENT_ARCHIVE_DAYS`) into one `MatchEventArchive` row holding a
+zlib-compressed blob plus the summary the match serializer shows, and
+deletes the hot rows. Running totals, snapshots and stored results are left
+as they are, so scoring keeps working from `RefereeRoundTotal`.
+
+Reads that need the events themselves go through `load_match_events` /
+`archived_events`, which unpack the blob into unsaved `RefereePointEvent`
+instances (original ids and timestamps). `restore_match_events` moves them
+back into the hot table, e.g. before the admin edits a match.
+"""
+import heapq
+import json
+import zlib
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Athlete, Match, MatchEventArchive, RefereePointEvent
+
+# Columns stored per event, in order.
+COLUMNS = ('id', 'referee_id', 'timestamp', 'side', 'points', 'event_type', 'processed', 'external_id', 'metadata', 'created_by_id')
+
+
+def archive_after() -> timedelta:
+    return timedelta(days=getattr(settings, 'POINT_EVENT_ARCHIVE_DAYS', 90))
+
+
+def archivable_match_ids(older_than: Optional[timedelta] = None, match_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Matches whose events are all processed and older than `older_than`."""
+    cutoff = timezone.now() - (older_than if older_than is not None else archive_after())
+    qs = RefereePointEvent.objects.all()
+    if match_ids is not None:
+        qs = qs.filter(match_id__in=list(match_ids))
+    return list(
+        qs.values('match_id')
+        .annotate(last=Max('timestamp'), pending=Count('pk', filter=Q(processed=False)))
+        .filter(last__lt=cutoff, pending=0)
+        .order_by('match_id')
+        .values_list('match_id', flat=True)
+    )
+
+
+def _pack(events: List[RefereePointEvent]) -> bytes:
+    rows = [
+        [e.pk, e.referee_id, e.timestamp.isoformat(), e.side, e.points, e.event_type,
+         e.processed, e.external_id, e.metadata, e.created_by_id]
+        for e in events
+    ]
+    return zlib.compress(json.dumps(rows, separators=(',', ':')).encode(), 9)
+
+
+def _unpack(match_id: int, blob) -> List[RefereePointEvent]:
+    events = []
+    for row in json.loads(zlib.decompress(bytes(blob))):
+        values = dict(zip(COLUMNS, row))
+        values['timestamp'] = parse_datetime(values['timestamp'])
+        event = RefereePointEvent(match_id=match_id, **values)
+        # Rehydrated rows mirror stored events; saving one must not INSERT a copy.
+        event._state.adding = False
+        events.append(event)
+    return events
+
+
+def archive_matches(match_ids: Iterable[int], dry_run: bool = False) -> Dict[str, int]:
+    """Move the hot events of `match_ids` into their archives.
+
+    Events a match received after it was archived are merged into the
+    existing blob. Returns counters for matches, events and raw/compressed
+    bytes.
+    """
+    from .scoring import referee_score_rows, summarize_match_events
+
+    stats = {'matches': 0, 'events': 0, 'raw_bytes': 0, 'compressed_bytes': 0}
+    for match in Match.objects.filter(pk__in=list(match_ids)).select_related('event_archive'):
+        with transaction.atomic():
+            # of=('self',): on PostgreSQL only the event rows are locked, not the joined referees.
+            hot = list(RefereePointEvent.objects.select_for_update(of=('self',)).filter(match=match).select_related('referee'))
+            if not hot:
+                continue
+            archive = getattr(match, 'event_archive', None)
+            events = (_unpack(match.pk, archive.data) if archive else []) + hot
+            events.sort(key=lambda e: (e.timestamp, e.pk))
+            _attach_referees(events)
+            summary = summarize_match_events(match, events)
+            blob = _pack(events)
+            stats['matches'] += 1
+            stats['events'] += len(hot)
+            stats['raw_bytes'] += len(json.dumps([[getattr(e, c) for c in COLUMNS] for e in events], default=str))
+            stats['compressed_bytes'] += len(blob)
+            if dry_run:
+                continue
+            MatchEventArchive.objects.update_or_create(match=match, defaults={
+                'event_count': len(events),
+                'first_event_at': events[0].timestamp,
+                'last_event_at': events[-1].timestamp,
+                'summary': {
+                    'referee_scores': referee_score_rows(summary),
+                    'central_penalties': summary['central_penalties'],
+                },
+                'data': blob,
+            })
+            # A plain DELETE: going through the ORM collector would fire the
+            # post_delete handler and subtract the events from the totals.
+            _delete_events([e.pk for e in hot])
+    return stats
+
+
+def _delete_events(pks: List[int], batch_size: int = 500) -> None:
+    """DELETE event rows by primary key in raw SQL (no signals, no collector)."""
+    meta = RefereePointEvent._meta
+    table, column = connection.ops.quote_name(meta.db_table), connection.ops.quote_name(meta.pk.column)
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), batch_size):
+            chunk = pks[start:start + batch_size]
+            cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({", ".join(["%s"] * len(chunk))})', chunk)
+
+
+def _attach_referees(events: List[RefereePointEvent]) -> None:
+    missing = {e.referee_id for e in events if not RefereePointEvent.referee.is_cached(e)}
+    if not missing:
+        return
+    referees = Athlete.objects.in_bulk(missing)
+    for e in events:
+        if not RefereePointEvent.referee.is_cached(e):
+            e.referee = referees.get(e.referee_id)
+
+
+def archived_events(match_ids: Iterable[int], with_referees: bool = False) -> Dict[int, List[RefereePointEvent]]:
+    """Unpack the archived events of `match_ids` (one query): {match_id: [events]}."""
+    result = {}
+    for match_id, blob in MatchEventArchive.objects.filter(match_id__in=list(match_ids)).values_list('match_id', 'data'):
+        result[match_id] = _unpack(match_id, blob)
+    if with_referees:
+        _attach_referees([e for events in result.values() for e in events])
+    return result
+
+
+def load_match_events(match, with_referees: bool = False) -> List[RefereePointEvent]:
+    """All events of a match, hot and archived, ordered by timestamp then id."""
+    match_id = getattr(match, 'pk', match)
+    hot = RefereePointEvent.objects.filter(match_id=match_id)
+    if with_referees:
+        hot = hot.select_related('referee')
+    events = list(hot) + archived_events([match_id], with_referees=with_referees).get(match_id, [])
+    events.sort(key=lambda e: (e.timestamp, e.pk))
+    return events
+
+
+def iter_events_with_archives(events, match_ids: Optional[Iterable[int]] = None):
+    """Merge an events queryset ordered by (match, timestamp, id) with the archived events.
+
+    Repair paths (`rebuild_match_totals`, `rebuild_snapshots`, batch scoring)
+    must see archived history as well as the hot table; the merged stream
+    keeps the (match, timestamp, id) order.
+    """
+    archives = MatchEventArchive.objects.all()
+    if match_ids is not None:
+        archives = archives.filter(match_id__in=list(match_ids))
+
+    def archived():
+        for match_id, blob in archives.order_by('match_id').values_list('match_id', 'data').iterator():
+            yield from sorted(_unpack(match_id, blob), key=lambda e: (e.timestamp, e.pk))
+
+    yield from heapq.merge(events.iterator(), archived(), key=lambda e: (e.match_id, e.timestamp, e.pk))
+
+
+def restore_match_events(match_ids: Iterable[int]) -> int:
+    """Move archived events back into the hot table and drop the archives."""
+    restored = 0
+    for match_id, events in archived_events(match_ids).items():
+        timestamps = {e.pk: e.timestamp for e in events}
+        with transaction.atomic():
+            # Inserted as-is: the totals already include these events.
+            for e in events:
+                e._state.adding = True
+            created = RefereePointEvent.objects.bulk_create(events, batch_size=1000)
+            # auto_now_add stamps inserts with the current time; put the
+            # original timestamps back.
+            for e in created:
+                e.timestamp = timestamps[e.pk]
+            RefereePointEvent.objects.bulk_update(created, ['timestamp'], batch_size=1000)
+            MatchEventArchive.objects.filter(match_id=match_id).delete()
+        restored += len(events)
+    return restored
+
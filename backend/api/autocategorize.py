@@ -0,0 +1,244 @@
+"""Automatic categorization of an event's athletes.
+
+Given an event and a rule set, every registered athlete (approved event
+participation, or an explicit list of athlete IDs) is placed into the
+category for their gender, age bracket and grade range. Categories missing
+from the event are created with matching eligibility rules (gender,
+`min_age`/`max_age`, `min_grade`/`max_grade`, see api/eligibility.py).
+
+Rules, as a dict (e.g. parsed from JSON)::
+
+    {
+        "type": "fight",                                # solo or fight (default solo)
+        "genders": ["male", "female"],                  # or ["mixt"] for mixed categories
+        "age_brackets": [[6, 9], [10, 13], [14, null]], # inclusive ages on the event day; null = open
+        "grade_ranges": [                               # optional, by Grade.rank_order
+            {"label": "Beginners", "max": 3},
+            {"label": "Advanced", "min": 4}
+        ],
+        "name": "{type} {gender} {age} {grade}"         # optional category name template
+    }
+
+The first matching bracket and range win. `autocategorize` loads athletes,
+grades, the event's categories and their enrollments with one query each
+and returns a preview of the changes; with `commit=True` it also writes
+them with one `bulk_create` for categories and one for enrollments.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from django.db import transaction
+
+from .eligibility import age_on, start_day
+from .enrollment import ATHLETE_CATEGORY_TYPES
+from .models import Athlete, Category, CategoryAthlete, Grade, TrainingSeminarParticipation
+
+DEFAULT_NAME = '{type} {gender} {age} {grade}'
+GENDERS = ('male', 'female', 'mixt')
+
+
+def _bound(value, what):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f'{what} must be a non-negative integer or null.')
+    return value
+
+
+def parse_rules(data) -> Dict[str, Any]:
+    """Validate a rule set; raises ValueError with a readable message."""
+    if not isinstance(data, dict):
+        raise ValueError('Rules must be an object.')
+    category_type = data.get('type', 'solo')
+    if category_type not in ATHLETE_CATEGORY_TYPES:
+        raise ValueError(f"type must be one of: {', '.join(sorted(ATHLETE_CATEGORY_TYPES))}.")
+    genders = data.get('genders', ['male', 'female'])
+    if not isinstance(genders, list) or not genders or any(g not in GENDERS for g in genders):
+        raise ValueError(f"genders must be a non-empty list of: {', '.join(GENDERS)}.")
+    if 'mixt' in genders and len(genders) > 1:
+        raise ValueError('"mixt" cannot be combined with other genders.')
+
+    brackets = data.get('age_brackets')
+    if not isinstance(brackets, list) or not brackets:
+        raise ValueError('age_brackets must be a non-empty list of [min, max] pairs.')
+    parsed_brackets = []
+    for bracket in brackets:
+        if not isinstance(bracket, (list, tuple)) or len(bracket) != 2:
+            raise ValueError('Each age bracket must be a [min, max] pair.')
+        low, high = _bound(bracket[0], 'Bracket ages'), _bound(bracket[1], 'Bracket ages')
+        if low is not None and high is not None and low > high:
+            raise ValueError(f'Age bracket {list(bracket)} has min above max.')
+        parsed_brackets.append((low, high))
+
+    ranges = data.get('grade_ranges') or []
+    if not isinstance(ranges, list):
+        raise ValueError('grade_ranges must be a list.')
+    parsed_ranges = []
+    for grade_range in ranges:
+        if not isinstance(grade_range, dict) or not grade_range.get('label'):
+            raise ValueError('Each grade range needs a label.')
+        low, high = grade_range.get('min'), grade_range.get('max')
+        for value in (low, high):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+                raise ValueError('Grade range bounds must be integers (Grade.rank_order) or null.')
+        parsed_ranges.append((str(grade_range['label']), low, high))
+
+    name = data.get('name', DEFAULT_NAME)
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError('name must be a non-empty template string.')
+    rules = {'type': category_type, 'genders': genders, 'age_brackets': parsed_brackets, 'grade_ranges': parsed_ranges, 'name': name}
+    try:
+        _category_name(rules, genders[0], parsed_brackets[0], parsed_ranges[0][0] if parsed_ranges else None)
+    except (KeyError, IndexError, ValueError, AttributeError) as e:
+        raise ValueError(f'name may only use the {{type}}, {{gender}}, {{age}} and {{grade}} placeholders ({e!r}).')
+    names = set()
+    for gender in genders:
+        for bracket in parsed_brackets:
+            for label in [r[0] for r in parsed_ranges] or [None]:
+                category_name = _category_name(rules, gender, bracket, label)
+                if category_name in names:
+                    raise ValueError(f'name gives two categories the same name: "{category_name}".')
+                names.add(category_name)
+    return rules
+
+
+def _category_name(rules, gender, bracket, label) -> str:
+    name = rules['name'].format(type=rules['type'].title(), gender=gender.title(), age=_age_label(*bracket), grade=label or '')
+    return ' '.join(name.split())
+
+
+def _age_label(low, high) -> str:
+    if low is None and high is None:
+        return 'open age'
+    if high is None:
+        return f'{low}+'
+    if low is None:
+        return f'up to {high}'
+    return f'{low}-{high}'
+
+
+def _within(value, low, high) -> bool:
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def registered_athlete_ids(event) -> Iterable[int]:
+    """Athletes with an approved participation in `event` (as a subquery)."""
+    return TrainingSeminarParticipation.objects.filter(event=event, status='approved').values('athlete_id')
+
+
+def autocategorize(event, rules: Dict[str, Any], athlete_ids: Optional[Iterable[int]] = None,
+                   commit: bool = False) -> Dict[str, Any]:
+    """Place athletes into the event's categories; see the module docstring.
+
+    Returns the preview: `categories` (each with `action` 'create' or
+    'existing', its rules and the `add` / `already_enrolled` athlete IDs),
+    `unplaced` athletes with a reason, `summary` counts and `committed`.
+    """
+    on = start_day(event.start_date)
+    source = registered_athlete_ids(event) if athlete_ids is None else list(athlete_ids)
+    athletes = list(Athlete.objects.filter(pk__in=source).order_by('last_name', 'first_name', 'pk').values(
+        'pk', 'first_name', 'last_name', 'gender', 'date_of_birth', 'status', 'current_grade__rank_order',
+    ))
+
+    # Category slots: (gender, bracket index, range index) -> planned category.
+    ranges = rules['grade_ranges'] or [(None, None, None)]
+    grades = sorted(Grade.objects.values_list('pk', 'rank_order'), key=lambda g: g[1]) if rules['grade_ranges'] else []
+    slots = {}
+    for gender in rules['genders']:
+        for b, (low, high) in enumerate(rules['age_brackets']):
+            for r, (label, grade_low, grade_high) in enumerate(ranges):
+                slots[gender, b, r] = {
+                    'name': _category_name(rules, gender, (low, high), label),
+                    'type': rules['type'],
+                    'gender': gender,
+                    'min_age': low,
+                    'max_age': high,
+                    'min_grade_id': next((pk for pk, rank in grades if grade_low is None or rank >= grade_low), None) if label else None,
+                    'max_grade_id': next((pk for pk, rank in reversed(grades) if grade_high is None or rank <= grade_high), None) if label else None,
+                    'grade_range': label,
+                }
+
+    placements = defaultdict(list)  # slot key -> athlete IDs
+    unplaced = []
+    for athlete in athletes:
+        reason = None
+        gender = 'mixt' if rules['genders'] == ['mixt'] else athlete['gender']
+        age = age_on(athlete['date_of_birth'], on)
+        rank = athlete['current_grade__rank_order']
+        bracket = grade_range = None
+        if athlete['status'] != 'approved':
+            reason = 'not_approved'
+        elif gender not in rules['genders']:
+            reason = 'gender'
+        elif age is None:
+            reason = 'no_birth_date'
+        else:
+            bracket = next((b for b, (low, high) in enumerate(rules['age_brackets']) if _within(age, low, high)), None)
+            if bracket is None:
+                reason = 'age_out_of_range'
+            elif not rules['grade_ranges']:
+                grade_range = 0
+            elif rank is None:
+                reason = 'no_grade'
+            else:
+                grade_range = next((r for r, (_, low, high) in enumerate(ranges) if _within(rank, low, high)), None)
+                if grade_range is None:
+                    reason = 'grade_out_of_range'
+        if reason:
+            unplaced.append({'athlete': athlete['pk'], 'name': f"{athlete['first_name']} {athlete['last_name']}", 'age': age, 'reason': reason})
+        else:
+            placements[gender, bracket, grade_range].append(athlete['pk'])
+
+    used = [key for key in slots if placements[key]]
+    existing = {
+        row['name']: row['pk']
+        for row in Category.objects.filter(event=event, type=rules['type'], name__in=[slots[key]['name'] for key in used]).values('pk', 'name')
+    }
+    enrolled = set(CategoryAthlete.objects.filter(
+        category_id__in=list(existing.values()), athlete_id__in=[a['pk'] for a in athletes],
+    ).values_list('category_id', 'athlete_id')) if existing else set()
+
+    categories = []
+    for key in used:
+        slot = slots[key]
+        category_id = existing.get(slot['name'])
+        ids = placements[key]
+        categories.append({
+            **slot,
+            'id': category_id,
+            'action': 'existing' if category_id else 'create',
+            'add': [pk for pk in ids if (category_id, pk) not in enrolled],
+            'already_enrolled': [pk for pk in ids if (category_id, pk) in enrolled],
+        })
+
+    if commit:
+        with transaction.atomic():
+            # bulk_create skips Category.save()/CategoryAthlete.full_clean(); the
+            # placement above already applied the rules those enforce.
+            new = [c for c in categories if c['action'] == 'create']
+            created = Category.objects.bulk_create([
+                Category(
+                    name=c['name'], event=event, type=c['type'], gender=c['gender'], min_age=c['min_age'], max_age=c['max_age'],
+                    min_grade_id=c['min_grade_id'], max_grade_id=c['max_grade_id'],
+                ) for c in new
+            ])
+            for plan, category in zip(new, created):
+                plan['id'] = category.pk
+            CategoryAthlete.objects.bulk_create([
+                CategoryAthlete(category_id=c['id'], athlete_id=pk) for c in categories for pk in c['add']
+            ], batch_size=1000, ignore_conflicts=True)
+
+    return {
+        'event': event.pk,
+        'event_date': on,
+        'committed': commit,
+        'categories': categories,
+        'unplaced': unplaced,
+        'summary': {
+            'athletes': len(athletes),
+            'categories_to_create': sum(1 for c in categories if c['action'] == 'create'),
+            'enrollments_to_add': sum(len(c['add']) for c in categories),
+            'already_enrolled': sum(len(c['already_enrolled']) for c in categories),
+            'unplaced': len(unplaced),
+        },
+    }
@@ -0,0 +1,192 @@
+"""Synthetic tournaments and timers for the scoring benchmark suite.
+
+`run_suite` builds a tournament (categories x matches x referees x rounds x
+events), times the scoring hot paths against it and returns a JSON-ready
+report with wall time and query counts per step. Each step runs once under
+query capture and then `repeat` more times without it; every run is rolled
+back to a savepoint so all of them see the same data, and the median wall
+time is reported. Wall times are compared by median against a threshold,
+query counts exactly and separately, since only the latter are
+deterministic.
+
+Everything runs inside a transaction that is rolled back, so it can be
+pointed at a real database; work deferred with `transaction.on_commit` is
+therefore not measured.
+"""
+import platform
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .aggregation import aggregate_pending_events
+from .models import Athlete, Category, Match, RefereePointEvent
+from .scoring import rebuild_match_totals
+
+
+@dataclass
+class TournamentSpec:
+    categories: int = 4
+    matches: int = 8
+    referees: int = 5
+    rounds: int = 3
+    events: int = 4  # per referee and round
+    seed: int = 1
+
+
+class _Rollback(Exception):
+    pass
+
+
+def build_tournament(spec: TournamentSpec):
+    """Create the synthetic tournament and return its match ids."""
+    rng = random.Random(spec.seed)
+    referees = Athlete.objects.bulk_create([
+        Athlete(first_name=f'BenchRef{i}', last_name='Referee', is_referee=True) for i in range(spec.referees)
+    ])
+    match_ids = []
+    for c in range(spec.categories):
+        category = Category.objects.create(name=f'Benchmark category {c}')
+        fighters = Athlete.objects.bulk_create([
+            Athlete(first_name=f'Bench{c}-{i}', last_name='Fighter') for i in range(spec.matches * 2)
+        ])
+        for m in range(spec.matches):
+            match = Match.objects.create(
+                category=category, match_type='qualifications',
+                red_corner=fighters[2 * m], blue_corner=fighters[2 * m + 1], central_referee=referees[0],
+            )
+            match.referees.add(*referees)
+            match_ids.append(match.pk)
+
+    events = []
+    for match_id in match_ids:
+        for referee in referees:
+            for rd in range(1, spec.rounds + 1):
+                for _ in range(spec.events):
+                    penalty = referee == referees[0] and rng.random() < 0.3
+                    events.append(RefereePointEvent(
+                        match_id=match_id, referee=referee,
+                        side=rng.choice(('red', 'blue')),
+                        points=-1 if penalty else rng.randint(1, 3),
+                        event_type='penalty' if penalty else 'score',
+                        metadata={'round': rd},
+                    ))
+    RefereePointEvent.objects.bulk_create(events, batch_size=1000)
+    rebuild_match_totals(match_ids)
+    return match_ids
+
+
+def _rolled_back(func):
+    """Run `func` in a savepoint that is rolled back; returns its wall time in seconds."""
+    sid = transaction.savepoint()
+    try:
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
+    finally:
+        transaction.savepoint_rollback(sid)
+
+
+def _measure(func, items, repeat):
+    # Count queries on a separate run (which also warms caches) so capturing
+    # them does not add to the timed runs.
+    with CaptureQueriesContext(connection) as queries:
+        _rolled_back(func)
+    runs = [_rolled_back(func) * 1000 for _ in range(max(1, repeat))]
+    median = statistics.median(runs)
+    return {
+        'wall_ms': round(median, 2),
+        'wall_ms_runs': [round(ms, 2) for ms in runs],
+        'queries': len(queries),
+        'items': items,
+        'ms_per_item': round(median / items, 3) if items else None,
+        'queries_per_item': round(len(queries) / items, 2) if items else None,
+    }
+
+
+def _benchmarks(match_ids):
+    from django.contrib import admin
+    from .scoring import compute_match_results
+    from .serializers import MatchSerializer
+    from .views import MatchViewSet
+
+    user = get_user_model().objects.create_superuser(username=f'bench-{time.time_ns()}', password='x')
+    factory = RequestFactory()
+    match_admin = admin.site._registry[Match]
+
+    def compute_all():
+        for match in Match.objects.filter(pk__in=match_ids).select_related('red_corner', 'blue_corner'):
+            compute_match_results(match)
+
+    def aggregate():
+        # What `manage.py aggregate_match_events` runs, scoped to the synthetic matches.
+        aggregate_pending_events(match_ids=match_ids)
+
+    def serialize_list():
+        MatchSerializer(MatchViewSet.queryset.filter(pk__in=match_ids), many=True).data
+
+    def admin_recompute():
+        for match_id in match_ids:
+            request = factory.post(f'/admin/api/match/{match_id}/recompute/')
+            request.user = user
+            match_admin.recompute_results_view(request, str(match_id))
+
+    return [
+        ('compute_match_results', compute_all),
+        ('aggregate_match_events', aggregate),
+        ('match_serializer_list', serialize_list),
+        ('admin_recompute_view', admin_recompute),
+    ]
+
+
+def run_suite(spec: TournamentSpec, repeat: int = 5) -> dict:
+    """Build the tournament, run every benchmark `repeat` times and roll everything back."""
+    report = {
+        'generated_at': timezone.now().isoformat(),
+        'spec': asdict(spec),
+        'repeat': repeat,
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'results': {},
+    }
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            match_ids = build_tournament(spec)
+            report['setup_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            report['matches'] = len(match_ids)
+            report['events'] = RefereePointEvent.objects.filter(match_id__in=match_ids).count()
+            for name, func in _benchmarks(match_ids):
+                report['results'][name] = _measure(func, len(match_ids), repeat)
+            raise _Rollback
+    except _Rollback:
+        pass
+    return report
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float = 0.2):
+    """Yield (name, metric, before, after, regressed) for every shared result.
+
+    `wall_ms` (the median of the timed runs) regresses when it is more than
+    `threshold` slower; `queries` regresses on any increase.
+    """
+    for name, after in current.get('results', {}).items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        for metric in ('wall_ms', 'queries'):
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            regressed = new > old * (1 + threshold) if metric == 'wall_ms' else new > old
+            yield name, metric, old, new, regressed
@@ -0,0 +1,151 @@
+"""Check stored match results against the event log, and repair them.
+
+`check_matches` rescores a shard of matches from their RefereePointEvent log
+(`api.scoring_batch.compute_results_batch`, i.e. the `api.scoring` rules)
+and compares the result with the stored `RefereeScore` rows and
+`Match.winner`. With `repair=True` the differing rows and winners are
+written back in bulk, the same way `aggregate_match_events` writes them,
+`RefereeScore` rows of referees without events are deleted and the
+shard's `RefereeRoundTotal` rows are rebuilt from the log.
+
+Shards are independent, so the `check_match_results` command fans them out
+over a process pool; `check_shard` is the picklable entry point the pool
+workers run.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set
+
+from django.db import transaction
+from django.db.models import Q
+
+from .archive import archived_events
+from .models import Match, RefereePointEvent, RefereeScore, sync_match_to_category_scores
+from .pools import refresh_pools_for_matches
+from .scoring import rebuild_match_totals
+from .scoring_batch import compute_results_batch
+
+
+def shards(match_ids: Iterable[int], size: int) -> List[List[int]]:
+    """Split match ids, in id order, into shards of at most `size`."""
+    ids = sorted(match_ids)
+    size = max(1, size)
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def check_matches(match_ids: Iterable[int], repair: bool = False) -> Dict[str, Any]:
+    """Diff recomputed results of `match_ids` against what is stored.
+
+    Returns {'checked': n, 'repaired': n, 'mismatches': [...]} where each
+    mismatch is a dict with `match`, `field` ('referee_score' or 'winner'),
+    `referee` (for referee scores), `stored` and `expected` (None for a
+    stale referee score). A referee score is stale when its match has events
+    (hot or archived) but the referee has none. Matches without events are
+    skipped for the winner and stale-score checks since their results may
+    have been entered by hand.
+
+    Stale scores are deleted before rescoring, because `api.scoring` counts
+    event-less `RefereeScore` rows as round 1 input; without `repair` the
+    deletion is rolled back once the diff is taken.
+    """
+    match_ids = list(match_ids)
+    with transaction.atomic():
+        stored_scores = defaultdict(dict)
+        for match_id, referee_id, red, blue, winner in RefereeScore.objects.filter(match_id__in=match_ids).values_list(
+            'match_id', 'referee_id', 'red_corner_score', 'blue_corner_score', 'winner'
+        ):
+            stored_scores[match_id][referee_id] = [red, blue, winner or None]
+        with_events = defaultdict(set)
+        for match_id, referee_id in RefereePointEvent.objects.filter(match_id__in=match_ids).values_list('match_id', 'referee_id').distinct():
+            with_events[match_id].add(referee_id)
+        # Old matches keep their history in MatchEventArchive.
+        for match_id, events in archived_events(match_ids).items():
+            with_events[match_id].update(e.referee_id for e in events)
+
+        mismatches = []
+        stale_scores = []
+        for match_id in sorted(with_events):
+            for rid in sorted(set(stored_scores[match_id]) - with_events[match_id]):
+                mismatches.append({'match': match_id, 'field': 'referee_score', 'referee': rid, 'stored': stored_scores[match_id][rid], 'expected': None})
+                stale_scores.append((match_id, rid))
+        if stale_scores:
+            stale = Q()
+            for match_id, referee_id in stale_scores:
+                stale |= Q(match_id=match_id, referee_id=referee_id)
+            RefereeScore.objects.filter(stale).delete()
+
+        results = compute_results_batch(match_ids)
+        stored_winners = dict(Match.objects.filter(pk__in=match_ids).values_list('pk', 'winner_id'))
+        fix_scores = []
+        fix_winners = {}
+        for match_id in sorted(results):
+            result = results[match_id]
+            for rid, red, blue, winner in result.get('referee_scores_data', []):
+                if match_id in with_events and rid not in with_events[match_id]:
+                    continue
+                expected = [red, blue, winner]
+                stored = stored_scores[match_id].get(rid)
+                if stored != expected:
+                    mismatches.append({'match': match_id, 'field': 'referee_score', 'referee': rid, 'stored': stored, 'expected': expected})
+                    fix_scores.append(RefereeScore(
+                        match_id=match_id, referee_id=rid, red_corner_score=red, blue_corner_score=blue, winner=winner,
+                    ))
+            if match_id not in with_events:
+                continue
+            match_winner = result.get('match_winner')
+            winner_id = match_winner.pk if match_winner else None
+            if stored_winners.get(match_id) != winner_id:
+                mismatches.append({'match': match_id, 'field': 'winner', 'referee': None, 'stored': stored_winners.get(match_id), 'expected': winner_id})
+                fix_winners[match_id] = winner_id
+
+        repaired = 0
+        if repair:
+            touched = {match_id for match_id, _ in stale_scores}
+            repaired = _repair(match_ids, fix_scores, fix_winners, touched)
+        else:
+            transaction.set_rollback(True)
+    return {'checked': len(results), 'repaired': repaired, 'mismatches': mismatches}
+
+
+def _repair(match_ids: List[int], fix_scores: List[RefereeScore], fix_winners: Dict[int, Any], touched: Set[int]) -> int:
+    # The running totals can drift on their own; rebuild the shard's from the log.
+    rebuild_match_totals(match_ids)
+    if fix_scores:
+        RefereeScore.objects.bulk_create(
+            fix_scores,
+            update_conflicts=True,
+            unique_fields=['match', 'referee'],
+            update_fields=['red_corner_score', 'blue_corner_score', 'winner'],
+        )
+    if fix_winners:
+        Match.objects.bulk_update([Match(pk=pk, winner_id=w) for pk, w in fix_winners.items()], ['winner'])
+    touched = touched | {row.match_id for row in fix_scores} | set(fix_winners)
+    if not touched:
+        return 0
+    # bulk writes bypass post_save, so mirror the match -> category result
+    # sync and the pool tables.
+    for match in Match.objects.filter(pk__in=touched, winner__isnull=False).select_related('category', 'winner'):
+        sync_match_to_category_scores(Match, instance=match)
+    refresh_pools_for_matches(touched)
+    return len(touched)
+
+
+def init_worker() -> None:
+    """Pool initializer: make Django usable in the worker and drop inherited connections."""
+    import django
+    from django.db import connections
+
+    django.setup()
+    connections.close_all()
+
+
+def check_shard(args) -> Dict[str, Any]:
+    """Pool entry point: `args` is (match_ids, repair)."""
+    match_ids, repair = args
+    result = check_matches(match_ids, repair=repair)
+    result['shard'] = shard_key(match_ids)
+    return result
+
+
+def shard_key(match_ids: List[int]) -> List[int]:
+    """Checkpoint key of a shard: its [first, last] match id."""
+    return [match_ids[0], match_ids[-1]] if match_ids else []
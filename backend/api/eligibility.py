@@ -0,0 +1,145 @@
+"""Which athletes may enroll in a category.
+
+A category's rules are evaluated on its event date (the event's or
+competition's start date, today when it has neither):
+
+- the athlete is approved;
+- male/female categories: the athlete has that gender ('mixt' takes all);
+- `min_age`/`max_age`: age on the event date (needs a birth date);
+- `min_grade`/`max_grade`: current grade's `rank_order` within the bounds;
+- `requires_medical_visa`/`requires_annual_visa`: an approved visa of that
+  type valid on the event date (see `api.visas.valid_visas`);
+- not enrolled yet (directly, or through a team for teams categories).
+
+`evaluate` checks every rule for every athlete in one annotated query
+(one boolean column per rule) and returns lightweight rows with the
+failed rules as reason codes, so a registration desk can check hundreds of
+athletes at once.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .models import Athlete, CategoryAthlete, TeamMember
+from .visas import valid_visas
+
+REASONS = {
+    'not_approved': 'Athlete is not approved.',
+    'gender': 'Gender does not match the category.',
+    'no_birth_date': 'Birth date is required for age limits.',
+    'too_young': 'Below the minimum age on the event date.',
+    'too_old': 'Above the maximum age on the event date.',
+    'no_grade': 'A current grade is required.',
+    'grade_too_low': 'Grade is below the category minimum.',
+    'grade_too_high': 'Grade is above the category maximum.',
+    'medical_visa': 'No medical visa valid on the event date.',
+    'annual_visa': 'No annual visa valid on the event date.',
+    'already_enrolled': 'Already enrolled in the category.',
+}
+
+
+def has_limits(category) -> bool:
+    """Whether the category sets age, grade or visa rules (beyond approval and gender)."""
+    return any((
+        category.min_age is not None, category.max_age is not None, category.min_grade_id, category.max_grade_id,
+        category.requires_medical_visa, category.requires_annual_visa,
+    ))
+
+
+def start_day(start) -> date:
+    """A start date/datetime (events store aware datetimes) as a local date; today when unset."""
+    if start is None:
+        return date.today()
+    if isinstance(start, datetime):
+        return timezone.localtime(start).date() if timezone.is_aware(start) else start.date()
+    return start
+
+
+def event_date(category) -> date:
+    """The day eligibility is judged on."""
+    source = category.event if category.event_id else category.competition
+    return start_day(getattr(source, 'start_date', None) if source else None)
+
+
+def _years_before(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # 29 February
+        return day.replace(year=day.year - years, day=28)
+
+
+def age_on(date_of_birth: Optional[date], day: date) -> Optional[int]:
+    if date_of_birth is None:
+        return None
+    return day.year - date_of_birth.year - ((day.month, day.day) < (date_of_birth.month, date_of_birth.day))
+
+
+def conditions(category, on: Optional[date] = None) -> Dict[str, Any]:
+    """{reason code: condition an athlete must satisfy}, for the rules the category sets."""
+    on = on or event_date(category)
+    rules = {'not_approved': Q(status='approved')}
+    if category.gender != 'mixt':
+        rules['gender'] = Q(gender=category.gender)
+    if category.min_age is not None:
+        rules['too_young'] = Q(date_of_birth__lte=_years_before(on, category.min_age))
+    if category.max_age is not None:
+        rules['too_old'] = Q(date_of_birth__gt=_years_before(on, category.max_age + 1))
+    if category.min_grade_id:
+        rules['grade_too_low'] = Q(current_grade__rank_order__gte=category.min_grade.rank_order)
+    if category.max_grade_id:
+        rules['grade_too_high'] = Q(current_grade__rank_order__lte=category.max_grade.rank_order)
+    for visa_type in ('medical', 'annual'):
+        if getattr(category, f'requires_{visa_type}_visa'):
+            rules[f'{visa_type}_visa'] = Exists(valid_visas(visa_type, on).filter(athlete=OuterRef('pk')))
+    if category.type == 'teams':
+        enrolled = TeamMember.objects.filter(athlete=OuterRef('pk'), team__enrolled_categories__category=category)
+    else:
+        enrolled = CategoryAthlete.objects.filter(athlete=OuterRef('pk'), category=category)
+    rules['already_enrolled'] = ~Exists(enrolled)
+    return rules
+
+
+def evaluate(category, athlete_ids: Optional[Iterable[int]] = None, only_eligible: bool = False,
+             on: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Eligibility rows for `athlete_ids` (all athletes when None), in one query.
+
+    Each row has `id`, `name`, `club`, `gender`, `date_of_birth`, `age`
+    (on the event date), `grade`, `eligible` and `reasons` (failed rule
+    codes, see `REASONS`). `only_eligible` filters in SQL instead.
+    """
+    on = on or event_date(category)
+    rules = conditions(category, on)
+    queryset = Athlete.objects.all()
+    if athlete_ids is not None:
+        queryset = queryset.filter(pk__in=list(athlete_ids))
+    if only_eligible:
+        queryset = queryset.filter(*rules.values())
+    flags = {
+        f'ok_{code}': Case(When(condition, then=Value(True)), default=Value(False), output_field=BooleanField())
+        for code, condition in rules.items()
+    }
+    values = queryset.annotate(**flags).order_by('last_name', 'first_name', 'pk').values(
+        'pk', 'first_name', 'last_name', 'gender', 'date_of_birth', 'club__name', 'current_grade_id', 'current_grade__name', *flags,
+    )
+
+    rows = []
+    for row in values:
+        reasons = [code for code in rules if not row[f'ok_{code}']]
+        if row['date_of_birth'] is None and {'too_young', 'too_old'} & set(reasons):
+            reasons = [code for code in reasons if code not in ('too_young', 'too_old')] + ['no_birth_date']
+        if row['current_grade_id'] is None and {'grade_too_low', 'grade_too_high'} & set(reasons):
+            reasons = [code for code in reasons if code not in ('grade_too_low', 'grade_too_high')] + ['no_grade']
+        rows.append({
+            'id': row['pk'],
+            'name': f"{row['first_name']} {row['last_name']}",
+            'club': row['club__name'],
+            'gender': row['gender'],
+            'date_of_birth': row['date_of_birth'],
+            'age': age_on(row['date_of_birth'], on),
+            'grade': row['current_grade__name'],
+            'eligible': not reasons,
+            'reasons': reasons,
+        })
+    return rows
@@ -0,0 +1,263 @@
+"""Bulk enrollment of athletes and teams into categories.
+
+`enroll` takes a list of items, each naming a `category` and either an
+`athlete` (optionally with a `weight`) or a `team`, and validates the whole
+batch with one query per related table: categories, athletes, team
+members' genders and the existing enrollments. The rules are the ones
+`CategoryAthlete.clean` and the eligible-athletes endpoint apply one row at
+a time:
+
+- athletes go into solo and fight categories, teams into teams categories;
+- athletes must be approved, and male/female categories only take athletes
+  (or teams whose members all are) of that gender;
+- athletes, and every member of a team, must meet the category's age,
+  grade and visa rules, checked by `api.eligibility.evaluate` with one
+  query per category that sets any;
+- an athlete or team is enrolled once per category; pairs enrolled by a
+  concurrent request are reported as duplicates too.
+
+Valid items are inserted with one `bulk_create` per table.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+
+from .eligibility import REASONS, evaluate, has_limits
+from .models import Athlete, Category, CategoryAthlete, CategoryTeam, Team, TeamMember
+
+MAX_BATCH_SIZE = 1000
+ATHLETE_CATEGORY_TYPES = {'solo', 'fight'}
+WEIGHT_FIELD = CategoryAthlete._meta.get_field('weight')
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def expand_payload(data) -> Optional[List[Any]]:
+    """Items from either a list / {"items": [...]} or the {"categories", "athletes", "teams"} shorthand."""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return None
+    if 'items' in data:
+        return data['items'] if isinstance(data['items'], list) else None
+    categories = data.get('categories')
+    if not isinstance(categories, list):
+        return None
+    athletes = data.get('athletes') or []
+    teams = data.get('teams') or []
+    if not isinstance(athletes, list) or not isinstance(teams, list):
+        return None
+    return [
+        *[{'category': c, 'athlete': a} for c in categories for a in athletes],
+        *[{'category': c, 'team': t} for c in categories for t in teams],
+    ]
+
+
+def _clean_item(item) -> Tuple[Optional[Dict[str, Any]], Dict[str, List[str]]]:
+    """Shape-check one payload item; returns (cleaned fields, errors)."""
+    if not isinstance(item, dict):
+        return None, {'non_field_errors': ['Expected an object.']}
+    errors = {}
+    cleaned = {'category': _as_int(item.get('category'))}
+    if cleaned['category'] is None:
+        errors['category'] = ['A valid integer is required.']
+    if ('athlete' in item) == ('team' in item):
+        errors['non_field_errors'] = ['Give exactly one of "athlete" or "team".']
+        return cleaned, errors
+    kind = 'athlete' if 'athlete' in item else 'team'
+    cleaned[kind] = _as_int(item.get(kind))
+    if cleaned[kind] is None:
+        errors[kind] = ['A valid integer is required.']
+
+    weight = item.get('weight')
+    if weight not in (None, ''):
+        if kind == 'team':
+            errors['weight'] = ['Teams are enrolled without a weight.']
+        else:
+            try:
+                cleaned['weight'] = WEIGHT_FIELD.clean(weight, None)
+                if cleaned['weight'] <= 0:
+                    errors['weight'] = ['Ensure this value is greater than 0.']
+            except DjangoValidationError as exc:
+                errors['weight'] = list(exc.messages)
+    return cleaned, errors
+
+
+def _gender_error(category, genders) -> Optional[str]:
+    if category.gender == 'mixt':
+        return None
+    wrong = sorted({g for g in genders if g and g != category.gender})
+    if wrong:
+        return f"Gender ({', '.join(wrong)}) does not match category gender requirement ({category.gender})."
+    return None
+
+
+def enroll(items: List[Any], dry_run: bool = False) -> List[Dict[str, Any]]:
+    """Validate and insert a batch of enrollments.
+
+    Returns one result per item, in order, with `status` set to `created`
+    (plus the new `id`), `duplicate` (already enrolled, or repeated in the
+    batch) or `invalid` (plus `errors`). With `dry_run` nothing is written
+    and valid items report `valid` instead of `created`.
+    """
+    results: List[Dict[str, Any]] = [{'index': i} for i in range(len(items))]
+    candidates = []
+    for i, item in enumerate(items):
+        cleaned, errors = _clean_item(item)
+        if errors:
+            results[i].update(status='invalid', errors=errors)
+        else:
+            candidates.append((i, cleaned))
+
+    # One query per related table for the whole batch.
+    category_ids = {c['category'] for _, c in candidates}
+    athlete_ids = {c['athlete'] for _, c in candidates if 'athlete' in c}
+    team_ids = {c['team'] for _, c in candidates if 'team' in c}
+    categories = Category.objects.filter(pk__in=category_ids).select_related('event', 'competition', 'min_grade', 'max_grade')
+    categories = {category.pk: category for category in categories}
+    athletes = {row['pk']: row for row in Athlete.objects.filter(pk__in=athlete_ids).values('pk', 'gender', 'status')}
+    teams = set(Team.objects.filter(pk__in=team_ids).values_list('pk', flat=True)) if team_ids else set()
+    member_genders = defaultdict(list)
+    member_ids = defaultdict(set)
+    if team_ids:
+        for team_id, athlete_id, gender in TeamMember.objects.filter(team_id__in=team_ids).values_list(
+                'team_id', 'athlete_id', 'athlete__gender'):
+            member_genders[team_id].append(gender)
+            member_ids[team_id].add(athlete_id)
+    enrolled = set()
+    if athlete_ids:
+        enrolled.update(('athlete', c, a) for c, a in CategoryAthlete.objects.filter(
+            category_id__in=category_ids, athlete_id__in=athlete_ids).values_list('category_id', 'athlete_id'))
+    if team_ids:
+        enrolled.update(('team', c, t) for c, t in CategoryTeam.objects.filter(
+            category_id__in=category_ids, team_id__in=team_ids).values_list('category_id', 'team_id'))
+
+    # Age, grade and visa rules, for the categories that set them.
+    limit_errors = defaultdict(list)  # (category, athlete) -> reason codes
+    names = {}
+    for category in categories.values():
+        if not has_limits(category):
+            continue
+        ids = set()
+        for _, c in candidates:
+            if c['category'] != category.pk:
+                continue
+            if c.get('athlete') in athletes:
+                ids.add(c['athlete'])
+            elif c.get('team') in teams:
+                ids.update(member_ids[c['team']])
+        if ids:
+            for row in evaluate(category, ids):
+                names[row['id']] = row['name']
+                limit_errors[category.pk, row['id']] = [
+                    code for code in row['reasons'] if code not in ('not_approved', 'gender', 'already_enrolled')
+                ]
+
+    seen = {}
+    new_athletes, new_teams = [], []
+    for i, cleaned in candidates:
+        kind = 'athlete' if 'athlete' in cleaned else 'team'
+        category = categories.get(cleaned['category'])
+        errors = {}
+        if category is None:
+            errors['category'] = [f'Invalid pk "{cleaned["category"]}" - object does not exist.']
+        if kind == 'athlete':
+            athlete = athletes.get(cleaned['athlete'])
+            if athlete is None:
+                errors['athlete'] = [f'Invalid pk "{cleaned["athlete"]}" - object does not exist.']
+            elif category is not None:
+                if category.type not in ATHLETE_CATEGORY_TYPES:
+                    errors['athlete'] = [f"A {category.type} category takes teams, not athletes."]
+                elif athlete['status'] != 'approved':
+                    errors['athlete'] = ['Only approved athletes can be enrolled.']
+                else:
+                    mismatch = _gender_error(category, [athlete['gender']])
+                    if mismatch:
+                        errors['athlete'] = [mismatch]
+                    elif limit_errors[category.pk, athlete['pk']]:
+                        errors['athlete'] = [REASONS[code] for code in limit_errors[category.pk, athlete['pk']]]
+        else:
+            if cleaned['team'] not in teams:
+                errors['team'] = [f'Invalid pk "{cleaned["team"]}" - object does not exist.']
+            elif category is not None:
+                mismatch = _gender_error(category, member_genders[cleaned['team']])
+                if category.type in ATHLETE_CATEGORY_TYPES:
+                    errors['team'] = [f"A {category.type} category takes athletes, not teams."]
+                elif mismatch:
+                    errors['team'] = [mismatch]
+                else:
+                    failed = [
+                        f'{names[member]}: {REASONS[code]}'
+                        for member in sorted(member_ids[cleaned['team']])
+                        for code in limit_errors[category.pk, member]
+                    ]
+                    if failed:
+                        errors['team'] = failed
+        if errors:
+            results[i].update(status='invalid', errors=errors)
+            continue
+
+        key = (kind, cleaned['category'], cleaned[kind])
+        if key in enrolled:
+            results[i].update(status='duplicate')
+        elif key in seen:
+            # Repeated within the same batch: the first occurrence wins.
+            results[i].update(status='duplicate', duplicate_of=seen[key])
+        else:
+            seen[key] = i
+            if kind == 'athlete':
+                new_athletes.append((i, CategoryAthlete(
+                    category_id=cleaned['category'], athlete_id=cleaned['athlete'], weight=cleaned.get('weight'))))
+            else:
+                new_teams.append((i, CategoryTeam(category_id=cleaned['category'], team_id=cleaned['team'])))
+
+    if dry_run:
+        for i, _ in new_athletes + new_teams:
+            results[i]['status'] = 'valid'
+        return results
+
+    # A concurrent request can enroll one of our pairs between the duplicate
+    # check and the insert; the unique constraint rejects the batch, and the
+    # retry reports the pairs it finds committed as duplicates.
+    pending = {CategoryAthlete: new_athletes, CategoryTeam: new_teams}
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                # bulk_create bypasses CategoryAthlete.save()/full_clean(); the
+                # checks above are the same ones, done for the whole batch.
+                created = {model: model.objects.bulk_create([row for _, row in rows]) for model, rows in pending.items()}
+            break
+        except IntegrityError:
+            if attempt == 2:
+                raise
+            pending = {model: _drop_taken(model, rows, results) for model, rows in pending.items()}
+    for model, rows in pending.items():
+        for (i, _), row in zip(rows, created[model]):
+            results[i].update(status='created', id=row.pk)
+    return results
+
+
+def _drop_taken(model, rows, results):
+    """Mark `rows` that are now enrolled as duplicates; return the others."""
+    if not rows:
+        return rows
+    field = 'athlete_id' if model is CategoryAthlete else 'team_id'
+    category_ids = {row.category_id for _, row in rows}
+    member_ids = {getattr(row, field) for _, row in rows}
+    taken = set(model.objects.filter(category_id__in=category_ids, **{f'{field}__in': member_ids}).values_list('category_id', field))
+    remaining = []
+    for i, row in rows:
+        if (row.category_id, getattr(row, field)) in taken:
+            results[i].update(status='duplicate')
+        else:
+            remaining.append((i, row))
+    return remaining
@@ -0,0 +1,171 @@
+"""Batch ingestion of referee point events.
+
+Referee clients buffer taps and flush them as one array instead of one POST
+per point. `ingest_point_events` validates every item without per-item
+queries, drops items whose `external_id` was already ingested (clients retry
+unacknowledged batches), inserts the rest with a single `bulk_create` and
+folds them into the `RefereeRoundTotal` running totals.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .live import hub
+from .models import Athlete, Match, RefereePointEvent
+from .scoring import apply_events_to_totals
+from .snapshots import record_events
+from .validators import validate_referee_point_event_metadata
+
+MAX_BATCH_SIZE = 1000
+
+EVENT_TYPES = {choice for choice, _ in RefereePointEvent.EVENT_TYPE_CHOICES}
+SIDES = {'red', 'blue'}
+EXTERNAL_ID_MAX_LENGTH = RefereePointEvent._meta.get_field('external_id').max_length
+
+
+def _metadata_error(metadata) -> Optional[str]:
+    # The shared validator reuses one compiled jsonschema validator.
+    try:
+        validate_referee_point_event_metadata(metadata)
+    except ValidationError as e:
+        return '; '.join(e.messages)
+    return None
+
+
+def _as_int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _clean_item(item) -> Tuple[Optional[Dict[str, Any]], Dict[str, List[str]]]:
+    """Shape-check one payload item; returns (cleaned fields, errors)."""
+    if not isinstance(item, dict):
+        return None, {'non_field_errors': ['Expected an object.']}
+
+    errors = {}
+    cleaned = {}
+    for name in ('match', 'referee'):
+        value = _as_int(item.get(name))
+        if value is None:
+            errors[name] = ['A valid integer is required.']
+        cleaned[f'{name}_id'] = value
+
+    side = item.get('side')
+    if side not in SIDES:
+        errors['side'] = [f'"{side}" is not a valid choice.']
+    cleaned['side'] = side
+
+    points = _as_int(item.get('points', 0))
+    if points is None:
+        errors['points'] = ['A valid integer is required.']
+    cleaned['points'] = points
+
+    event_type = item.get('event_type', 'score')
+    if event_type not in EVENT_TYPES:
+        errors['event_type'] = [f'"{event_type}" is not a valid choice.']
+    cleaned['event_type'] = event_type
+
+    external_id = item.get('external_id') or None
+    if external_id is not None:
+        external_id = str(external_id)
+        if len(external_id) > EXTERNAL_ID_MAX_LENGTH:
+            errors['external_id'] = [f'Ensure this field has no more than {EXTERNAL_ID_MAX_LENGTH} characters.']
+    cleaned['external_id'] = external_id
+
+    metadata = item.get('metadata')
+    metadata_error = _metadata_error(metadata)
+    if metadata_error:
+        errors['metadata'] = [metadata_error]
+    cleaned['metadata'] = metadata
+
+    return cleaned, errors
+
+
+def ingest_point_events(items: List[Any], created_by=None) -> List[Dict[str, Any]]:
+    """Validate and insert a batch of point events.
+
+    Returns one result per input item, in order, with `status` set to
+    `created` (plus the new `id` when the backend returns it), `duplicate`
+    (plus the `id` of the already stored event) or `invalid` (plus `errors`).
+    """
+    results: List[Dict[str, Any]] = [{'index': i} for i in range(len(items))]
+    candidates = []
+    for i, item in enumerate(items):
+        cleaned, errors = _clean_item(item)
+        if errors:
+            results[i].update(status='invalid', errors=errors)
+        else:
+            candidates.append((i, cleaned))
+
+    # Referential checks for the whole batch: one query per related table.
+    match_ids = {c['match_id'] for _, c in candidates}
+    referee_ids = {c['referee_id'] for _, c in candidates}
+    known_matches = set(Match.objects.filter(pk__in=match_ids).values_list('pk', flat=True))
+    known_referees = set(Athlete.objects.filter(pk__in=referee_ids, is_referee=True).values_list('pk', flat=True))
+    valid = []
+    for i, cleaned in candidates:
+        errors = {}
+        if cleaned['match_id'] not in known_matches:
+            errors['match'] = [f'Invalid pk "{cleaned["match_id"]}" - object does not exist.']
+        if cleaned['referee_id'] not in known_referees:
+            errors['referee'] = [f'Invalid pk "{cleaned["referee_id"]}" - object does not exist.']
+        if errors:
+            results[i].update(status='invalid', errors=errors)
+        else:
+            valid.append((i, cleaned))
+
+    # A concurrent batch can insert one of our external ids between the
+    # duplicate check and the insert; the unique index rejects ours, and the
+    # retry sees the committed row as a duplicate.
+    for attempt in range(3):
+        # Outcomes written by a rolled back attempt (created ids, in-batch
+        # `duplicate_of`) must not leak into the retry's results.
+        for i, _ in valid:
+            results[i] = {'index': i}
+        try:
+            with transaction.atomic():
+                _insert_new(valid, results, created_by)
+            break
+        except IntegrityError:
+            if attempt == 2:
+                raise
+    return results
+
+
+def _insert_new(valid, results, created_by) -> None:
+    external_ids = [c['external_id'] for _, c in valid if c['external_id']]
+    seen = dict(
+        RefereePointEvent.objects.filter(external_id__in=external_ids).values_list('external_id', 'pk')
+    ) if external_ids else {}
+
+    to_create = []
+    positions = []
+    batch_ids = {}
+    for i, cleaned in valid:
+        ext = cleaned['external_id']
+        if ext and ext in seen:
+            results[i].update(status='duplicate', id=seen[ext], external_id=ext)
+            continue
+        if ext and ext in batch_ids:
+            # Repeated within the same batch: the first occurrence wins.
+            results[i].update(status='duplicate', external_id=ext, duplicate_of=batch_ids[ext])
+            continue
+        if ext:
+            batch_ids[ext] = i
+        to_create.append(RefereePointEvent(created_by=created_by, **cleaned))
+        positions.append(i)
+
+    created = RefereePointEvent.objects.bulk_create(to_create)
+    # bulk_create bypasses RefereePointEvent.save(), so fold the new events
+    # into the running totals and snapshots here.
+    apply_events_to_totals(created)
+    record_events(created)
+    for match_id in {event.match_id for event in created}:
+        hub.notify_on_commit(match_id)
+    for i, event in zip(positions, created):
+        results[i].update(status='created', id=event.pk, external_id=event.external_id)
@@ -0,0 +1,241 @@
+"""Live per-match scoreboard state shared by Server-Sent Events streams.
+
+Every open `/api/matches/<id>/stream/` connection subscribes to one
+`MatchChannel` per match. Writers only mark the channel dirty (no query on
+the write path); the first subscriber that wakes up rebuilds the compact
+snapshot from `RefereeRoundTotal` and every other viewer of the match reuses
+it, so the database cost is per change rather than per viewer.
+
+Channels live in process memory. Events written by another process are
+picked up by a rate-limited staleness check (one read per match every
+`LIVE_SCORE_POLL_SECONDS`), again shared by all viewers of the match.
+
+A stream occupies a worker thread for its whole life, so it is only served
+when `LIVE_SCORE_STREAMING` is on (threaded gunicorn workers, see
+entrypoint.sh) and is capped by `LIVE_SCORE_STREAM_MAX_SECONDS`, which must
+stay below the worker timeout. Otherwise the endpoint answers with a single
+snapshot and EventSource clients fall back to polling via the `retry` hint.
+"""
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Match
+from .scoring import compute_match_results_from_totals
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def load_snapshot(match_id: int) -> Optional[Dict[str, Any]]:
+    """Build the compact scoreboard for a match from its running totals."""
+    match = (
+        Match.objects.filter(pk=match_id)
+        .select_related('red_corner', 'blue_corner')
+        .prefetch_related('round_totals', 'referee_scores')
+        .first()
+    )
+    if match is None:
+        return None
+    return scoreboard(match, compute_match_results_from_totals(match))
+
+
+def scoreboard(match: Match, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Format `compute_match_results`-style results as the compact scoreboard."""
+    winner = results.get('match_winner')
+    if winner is None:
+        winner_side = None
+    elif winner.pk == match.red_corner_id:
+        winner_side = 'red'
+    else:
+        winner_side = 'blue'
+    return {
+        'match': match.pk,
+        'referees': {
+            str(rid): {
+                'rounds': {str(rd): [v['adj_red'], v['adj_blue']] for rd, v in sorted(data['rounds'].items())},
+                'total': [data['adj_red'], data['adj_blue']],
+                'winner': data['winner'],
+            }
+            for rid, data in results['per_ref'].items()
+        },
+        'central': {str(rd): [v.get('red', 0), v.get('blue', 0)] for rd, v in sorted(results['central_penalties_by_round'].items())},
+        'votes': [results['votes']['red'], results['votes']['blue']],
+        'winner': winner_side,
+        'winner_id': winner.pk if winner else None,
+    }
+
+
+def diff_snapshots(old: Optional[dict], new: Optional[dict]) -> dict:
+    """Return only the keys of `new` that changed; removed keys map to None."""
+    old = old or {}
+    new = new or {}
+    delta = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            sub = diff_snapshots(previous, value)
+            if sub:
+                delta[key] = sub
+        elif value != previous or key not in old:
+            delta[key] = value
+    for key in old:
+        if key not in new:
+            delta[key] = None
+    return delta
+
+
+class MatchChannel:
+    """Latest snapshot of one match plus the condition its viewers wait on."""
+
+    def __init__(self, match_id: int):
+        self.match_id = match_id
+        self.condition = threading.Condition()
+        self.version = 0
+        self.snapshot = None
+        self.delta = None
+        self.dirty = True
+        self.loading = False
+        self.checked_at = 0.0
+        self.subscribers = 0
+
+    def stale(self, poll: float) -> bool:
+        """Whether a reload is due and nobody is loading yet; call with `condition` held."""
+        return not self.loading and (self.dirty or time.monotonic() - self.checked_at >= poll)
+
+    def refresh(self) -> None:
+        """Reload the snapshot without holding `condition`, then swap it in under it.
+
+        Only one viewer loads at a time; the others keep waiting on the
+        condition and are woken once the new version is in place.
+        """
+        with self.condition:
+            if self.loading:
+                return
+            self.loading = True
+            self.dirty = False
+        try:
+            snapshot = load_snapshot(self.match_id)
+        except Exception:
+            with self.condition:
+                self.loading = False
+                self.dirty = True
+                self.condition.notify_all()
+            raise
+        with self.condition:
+            self.loading = False
+            self.checked_at = time.monotonic()
+            if snapshot != self.snapshot:
+                self.delta = diff_snapshots(self.snapshot, snapshot)
+                self.snapshot = snapshot
+                self.version += 1
+            self.condition.notify_all()
+
+
+class ScoreboardHub:
+    """Registry of match channels for the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels: Dict[int, MatchChannel] = {}
+
+    def notify(self, match_id: int) -> None:
+        """Mark a match as changed and wake its viewers (no-op without viewers)."""
+        channel = self._channels.get(match_id)
+        if channel is None:
+            return
+        with channel.condition:
+            channel.dirty = True
+            channel.condition.notify_all()
+
+    def notify_on_commit(self, match_id: int) -> None:
+        transaction.on_commit(lambda: self.notify(match_id))
+
+    def _acquire(self, match_id: int) -> MatchChannel:
+        with self._lock:
+            channel = self._channels.get(match_id)
+            if channel is None:
+                channel = self._channels[match_id] = MatchChannel(match_id)
+            channel.subscribers += 1
+            return channel
+
+    def _release(self, channel: MatchChannel) -> None:
+        with self._lock:
+            channel.subscribers -= 1
+            if channel.subscribers <= 0:
+                self._channels.pop(channel.match_id, None)
+
+    def messages(self, match_id: int, max_seconds: Optional[float] = None):
+        """Yield ('snapshot' | 'delta' | 'keepalive', version, payload) tuples.
+
+        The first message is always a full snapshot; afterwards a viewer gets
+        the delta for each new version, or a fresh snapshot if it fell more
+        than one version behind.
+        """
+        poll = float(_setting('LIVE_SCORE_POLL_SECONDS', 2.0))
+        keepalive = float(_setting('LIVE_SCORE_KEEPALIVE_SECONDS', 15.0))
+        if max_seconds is None:
+            max_seconds = float(_setting('LIVE_SCORE_STREAM_MAX_SECONDS', 60.0))
+        started = last_sent = time.monotonic()
+        channel = self._acquire(match_id)
+        seen = None
+        try:
+            while time.monotonic() - started < max_seconds:
+                message = None
+                with channel.condition:
+                    stale = channel.stale(poll)
+                if stale:
+                    channel.refresh()
+                with channel.condition:
+                    if channel.version != seen:
+                        if seen is not None and channel.version == seen + 1:
+                            message = ('delta', channel.version, channel.delta)
+                        else:
+                            message = ('snapshot', channel.version, channel.snapshot)
+                        seen = channel.version
+                    elif not channel.stale(poll):
+                        remaining = max_seconds - (time.monotonic() - started)
+                        channel.condition.wait(timeout=max(0.0, min(poll, keepalive, remaining)))
+                if message is not None:
+                    last_sent = time.monotonic()
+                    yield message
+                elif time.monotonic() - last_sent >= keepalive:
+                    last_sent = time.monotonic()
+                    yield ('keepalive', seen, None)
+        finally:
+            self._release(channel)
+
+
+hub = ScoreboardHub()
+
+
+def format_sse(kind: str, version: Optional[int], payload: Any) -> str:
+    if kind == 'keepalive':
+        return ': keepalive\n\n'
+    event_id = '' if version is None else f'id: {version}\n'
+    return f'{event_id}event: {kind}\ndata: {json.dumps(payload, separators=(",", ":"))}\n\n'
+
+
+def event_stream(match_id: int, max_seconds: Optional[float] = None):
+    """SSE text chunks for a match; ends after `max_seconds` so clients reconnect."""
+    # Ask EventSource clients to reconnect quickly once the stream ends.
+    yield 'retry: 1000\n\n'
+    for kind, version, payload in hub.messages(match_id, max_seconds=max_seconds):
+        yield format_sse(kind, version, payload)
+
+
+def streaming_enabled() -> bool:
+    """Whether long-lived streams may hold a worker (threaded/async workers only)."""
+    return bool(_setting('LIVE_SCORE_STREAMING', False))
+
+
+def single_snapshot(match_id: int):
+    """One-shot SSE response for sync workers; `retry` makes EventSource poll."""
+    poll = float(_setting('LIVE_SCORE_FALLBACK_POLL_SECONDS', 5.0))
+    yield f'retry: {int(poll * 1000)}\n\n'
+    yield format_sse('snapshot', None, load_snapshot(match_id))
@@ -1,50 +1,129 @@
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from django.utils import timezone
-from api.models import Match, RefereePointEvent, RefereeScore
-from api.scoring import compute_match_results
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from api.aggregation import AggregationStats, aggregate_pending_events, backlog_stats, run_worker
+
 
 class Command(BaseCommand):
     help = 'Aggregate unprocessed RefereePointEvent rows into RefereeScore and update Match winner.'
 
     def add_arguments(self, parser):
         parser.add_argument('--match', type=int, help='Match ID to aggregate (optional). If omitted, aggregates all matches with pending events.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of matches loaded, scored and written per chunk (default: 500).')
+        parser.add_argument('--dry-run', action='store_true', help='Compute results and report stats without writing anything.')
+        parser.add_argument('--worker', action='store_true', help='Keep running and poll for new pending events instead of exiting after one pass.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Worker mode: seconds to sleep when no events are pending (default: 1.0).')
+        parser.add_argument('--workers', type=int, default=1, help='Worker mode: number of worker threads, each with its own database connection (default: 1). '
+                            'The work is mostly database round trips, so threads only help on a server database; '
+                            'SQLite allows one writer at a time and is refused.')
+        parser.add_argument('--stats-interval', type=float, default=30.0, help='Worker mode: seconds between backlog/latency reports (default: 30).')
+        parser.add_argument('--max-loops', type=int, help='Worker mode: stop each worker after this many polls (mainly for testing).')
 
     def handle(self, *args, **options):
+        if options.get('worker'):
+            return self.handle_worker(options)
+
         match_id = options.get('match')
-        qs = Match.objects.all()
-        if match_id:
-            qs = qs.filter(pk=match_id)
-
-        matches = qs
-        total = 0
-        for match in matches:
-            events = list(RefereePointEvent.objects.filter(match=match, processed=False).order_by('timestamp'))
-            if not events:
-                continue
-            total += 1
-            self.stdout.write(f'Aggregating match {match.pk} - {len(events)} events')
-            with transaction.atomic():
-                # Use centralized scoring logic to compute per-referee and match results
-                results = compute_match_results(match, events)
-
-                referee_scores = []
-                for (rid, red, blue, winner) in results.get('referee_scores_data', []):
-                    rs, created = RefereeScore.objects.update_or_create(
-                        match=match,
-                        referee_id=rid,
-                        defaults={'red_corner_score': red, 'blue_corner_score': blue, 'winner': winner}
-                    )
-                    referee_scores.append(rs)
-
-                match_winner = results.get('match_winner')
-                if match.winner != match_winner:
-                    match.winner = match_winner
-                    match.save()
-
-                # mark events processed
-                RefereePointEvent.objects.filter(pk__in=[e.pk for e in events]).update(processed=True)
-
-                self.stdout.write(self.style.SUCCESS(f'Aggregated match {match.pk}: winner={match.winner}'))
-
-        self.stdout.write(self.style.SUCCESS(f'Processed {total} matches'))
+        batch_size = max(1, options.get('batch_size') or 500)
+        dry_run = options.get('dry_run', False)
+        verbosity = options.get('verbosity', 1)
+
+        started = time.monotonic()
+
+        def report_chunk(stats):
+            if verbosity >= 2:
+                self.stdout.write(f'Chunk {stats.chunks}: {stats.matches} matches, {stats.events} events so far')
+
+        stats = aggregate_pending_events(
+            match_ids=[match_id] if match_id else None,
+            batch_size=batch_size,
+            dry_run=dry_run,
+            on_chunk=report_chunk,
+        )
+        elapsed = time.monotonic() - started
+
+        if verbosity >= 2:
+            for mid, winner_id in stats.match_winners.items():
+                self.stdout.write(f'Aggregated match {mid}: winner_id={winner_id}')
+
+        rate_matches = stats.matches / elapsed if elapsed > 0 else 0.0
+        rate_events = stats.events / elapsed if elapsed > 0 else 0.0
+        prefix = '[dry-run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Processed {stats.matches} matches ({stats.events} events, '
+            f'{stats.referee_scores} referee scores, {stats.winners_changed} winners changed) '
+            f'in {stats.chunks} chunks, {elapsed:.2f}s '
+            f'({rate_matches:.1f} matches/s, {rate_events:.1f} events/s)'
+        ))
+
+    def handle_worker(self, options):
+        if options.get('dry_run') or options.get('match'):
+            raise CommandError('--worker cannot be combined with --dry-run or --match')
+
+        batch_size = max(1, options.get('batch_size') or 500)
+        poll_interval = max(0.0, options.get('poll_interval') or 0.0)
+        workers = max(1, options.get('workers') or 1)
+        stats_interval = max(0.1, options.get('stats_interval') or 30.0)
+        max_loops = options.get('max_loops')
+        if workers > 1 and connection.vendor == 'sqlite':
+            raise CommandError('--workers > 1 needs a database with concurrent writers; SQLite locks on every claim')
+
+        stop_event = threading.Event()
+        worker_stats = [AggregationStats() for _ in range(workers)]
+        started = time.monotonic()
+        last_report = [started]
+
+        def report(final=False):
+            last_report[0] = time.monotonic()
+            self.stdout.write(self.format_worker_stats(worker_stats, time.monotonic() - started, final=final))
+
+        def maybe_report(stats):
+            if time.monotonic() - last_report[0] >= stats_interval:
+                report()
+
+        self.stdout.write(f'Aggregation worker started: {workers} worker(s), batch size {batch_size}, poll interval {poll_interval}s')
+        threads = []
+        try:
+            if workers == 1:
+                run_worker(poll_interval, batch_size, max_loops, stop_event, worker_stats[0], on_loop=maybe_report)
+            else:
+                def target(stats):
+                    try:
+                        run_worker(poll_interval, batch_size, max_loops, stop_event, stats)
+                    finally:
+                        # Each thread owns its database connection.
+                        connection.close()
+
+                threads = [threading.Thread(target=target, args=(stats,)) for stats in worker_stats]
+                for thread in threads:
+                    thread.start()
+                while any(thread.is_alive() for thread in threads):
+                    for thread in threads:
+                        thread.join(timeout=stats_interval / len(threads))
+                    maybe_report(None)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping aggregation worker...')
+        finally:
+            # Let every thread finish its in-flight claim before reporting.
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+        report(final=True)
+
+    def format_worker_stats(self, worker_stats, elapsed, final=False):
+        matches = sum(s.matches for s in worker_stats)
+        events = sum(s.events for s in worker_stats)
+        lag_total = sum(s.lag_seconds_total for s in worker_stats)
+        lag_max = max((s.lag_seconds_max for s in worker_stats), default=0.0)
+        idle = sum(s.idle_polls for s in worker_stats)
+        backlog = backlog_stats()
+        avg_lag = lag_total / matches if matches else 0.0
+        rate = events / elapsed if elapsed > 0 else 0.0
+        line = (
+            f'{"Worker stopped" if final else "Worker"}: processed {matches} matches ({events} events, {rate:.1f} events/s), '
+            f'lag avg {avg_lag:.2f}s max {lag_max:.2f}s, backlog {backlog["events"]} events in {backlog["matches"]} matches, '
+            f'{idle} idle polls'
+        )
+        return self.style.SUCCESS(line) if final else line
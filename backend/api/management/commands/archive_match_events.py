@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from api.archive import archivable_match_ids, archive_after, archive_matches, restore_match_events
+
+
+class Command(BaseCommand):
+    help = 'Compact the RefereePointEvent log of finished matches into compressed MatchEventArchive rows (or restore them).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, help='Archive matches whose last event is older than this many days (default: POINT_EVENT_ARCHIVE_DAYS, 90).')
+        parser.add_argument('--match', type=int, action='append', help='Only consider this match ID (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=200, help='Matches archived per batch (default: 200).')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived without writing anything.')
+        parser.add_argument('--restore', action='store_true', help='Move the archived events of --match back into the hot table.')
+
+    def handle(self, *args, **options):
+        match_ids = options.get('match')
+        if options.get('restore'):
+            if not match_ids:
+                raise CommandError('--restore needs at least one --match')
+            restored = restore_match_events(match_ids)
+            self.stdout.write(self.style.SUCCESS(f'Restored {restored} events for {len(match_ids)} match(es)'))
+            return
+
+        older_than = timedelta(days=options['older_than']) if options.get('older_than') is not None else archive_after()
+        candidates = archivable_match_ids(older_than, match_ids)
+        batch_size = max(1, options.get('batch_size') or 200)
+        totals = {'matches': 0, 'events': 0, 'raw_bytes': 0, 'compressed_bytes': 0}
+        for i in range(0, len(candidates), batch_size):
+            stats = archive_matches(candidates[i:i + batch_size], dry_run=options.get('dry_run', False))
+            for key, value in stats.items():
+                totals[key] += value
+            if options.get('verbosity', 1) >= 2:
+                self.stdout.write(f'Batch {i // batch_size + 1}: {stats["matches"]} matches, {stats["events"]} events')
+
+        ratio = totals['raw_bytes'] / totals['compressed_bytes'] if totals['compressed_bytes'] else 0.0
+        prefix = '[dry-run] ' if options.get('dry_run') else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Archived {totals["events"]} events from {totals["matches"]} matches '
+            f'({totals["raw_bytes"]} bytes -> {totals["compressed_bytes"]} bytes, {ratio:.1f}x)'
+        ))
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from landing.models import Event
+
+from api.autocategorize import autocategorize, parse_rules
+
+
+class Command(BaseCommand):
+    help = ("Place an event's registered athletes into categories by gender, age bracket and grade range. "
+            'Prints the planned changes; pass --commit to write them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='Event ID.')
+        parser.add_argument('--rules', required=True, help='Rule set as JSON, or the path of a JSON file (see api/autocategorize.py).')
+        parser.add_argument('--athletes', help='Comma-separated athlete IDs (default: approved event participations).')
+        parser.add_argument('--commit', action='store_true', help='Create the categories and enrollments.')
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event'])
+        except Event.DoesNotExist:
+            raise CommandError(f"Event {options['event']} does not exist")
+        source = options['rules']
+        path = Path(source)
+        try:
+            data = json.loads(path.read_text() if not source.lstrip().startswith('{') and path.is_file() else source)
+            rules = parse_rules(data)
+        except (OSError, json.JSONDecodeError, ValueError) as e:
+            raise CommandError(f'Invalid --rules: {e}')
+        athlete_ids = None
+        if options.get('athletes'):
+            try:
+                athlete_ids = [int(v) for v in options['athletes'].split(',') if v.strip()]
+            except ValueError:
+                raise CommandError('--athletes must be a comma-separated list of IDs')
+
+        plan = autocategorize(event, rules, athlete_ids, commit=options['commit'])
+        for category in plan['categories']:
+            marker = '+' if category['action'] == 'create' else ' '
+            self.stdout.write(
+                f"{marker} {category['name']}: +{len(category['add'])} athletes"
+                f" ({len(category['already_enrolled'])} already enrolled)"
+            )
+        for row in plan['unplaced']:
+            self.stdout.write(f"! {row['name']} (#{row['athlete']}): {row['reason']}")
+
+        summary = plan['summary']
+        verb = 'Created' if options['commit'] else 'Would create'
+        message = (f"{verb} {summary['categories_to_create']} categories and {summary['enrollments_to_add']} enrollments "
+                   f"for {summary['athletes']} athletes ({summary['already_enrolled']} already enrolled, {summary['unplaced']} unplaced)")
+        self.stdout.write(self.style.SUCCESS(message) if options['commit'] else message)
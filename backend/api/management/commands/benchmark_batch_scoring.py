@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Match
+from api.scoring import compute_match_results
+from api.scoring_batch import compute_results_batch, matches_for, np
+
+
+class Command(BaseCommand):
+    help = 'Time batch (vectorized) scoring against per-match compute_match_results and check they agree.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', type=int, help='Only score matches of this category.')
+        parser.add_argument('--event', type=int, help='Only score matches of this event.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the best time is reported (default: 3).')
+
+    def handle(self, *args, **options):
+        match_ids = matches_for(options.get('category'), options.get('event'))
+        if not match_ids:
+            raise CommandError('No matches to score')
+        repeat = max(1, options.get('repeat') or 3)
+
+        def per_match():
+            return {
+                m.pk: compute_match_results(m)
+                for m in Match.objects.filter(pk__in=match_ids).select_related('red_corner', 'blue_corner')
+            }
+
+        variants = [('per-match scalar', per_match), ('batch scalar', lambda: compute_results_batch(match_ids, use_numpy=False))]
+        if np is not None:
+            variants.append(('batch numpy', lambda: compute_results_batch(match_ids, use_numpy=True)))
+        else:
+            self.stdout.write(self.style.WARNING('NumPy is not installed; skipping the vectorized variant.'))
+
+        reference = None
+        for label, func in variants:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results = func()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            if reference is None:
+                reference = results
+            agrees = self._same(reference, results)
+            self.stdout.write(
+                f'{label:<18} {best * 1000:9.1f} ms  ({len(match_ids) / best if best else 0:.0f} matches/s)'
+                f'{"" if agrees else "  MISMATCH"}'
+            )
+            if not agrees:
+                raise CommandError(f'{label} results differ from per-match scoring')
+
+    def _same(self, expected, actual):
+        def key(result):
+            return (
+                result['per_ref'],
+                sorted(result['referee_scores_data'], key=lambda row: row[0]),
+                result['central_penalties'],
+                dict(result['central_penalties_by_round']),
+                result['match_winner'],
+                result['votes'],
+            )
+        return expected.keys() == actual.keys() and all(key(expected[k]) == key(actual[k]) for k in expected)
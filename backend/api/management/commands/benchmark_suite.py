@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from api.benchmarks import TournamentSpec, compare_reports, run_suite
+
+
+class Command(BaseCommand):
+    help = 'Benchmark scoring, aggregation, match serialization and the admin recompute view on a synthetic tournament (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=4, help='Number of categories (default: 4).')
+        parser.add_argument('--matches', type=int, default=8, help='Matches per category (default: 8).')
+        parser.add_argument('--referees', type=int, default=5, help='Referees per match (default: 5).')
+        parser.add_argument('--rounds', type=int, default=3, help='Rounds per match (default: 3).')
+        parser.add_argument('--events', type=int, default=4, help='Events per referee and round (default: 4).')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for reproducible tournaments (default: 1).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark; the median is reported (default: 5).')
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--baseline', help='Compare against a previous JSON report and fail on regressions.')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Allowed median wall-time slowdown vs the baseline (default: 0.2 = 20%%).')
+        parser.add_argument(
+            '--check', choices=['all', 'queries', 'time'], default='all',
+            help='Which baseline regressions fail the command: query counts (deterministic), wall time, or both (default: all).',
+        )
+
+    def handle(self, *args, **options):
+        spec = TournamentSpec(
+            categories=options['categories'],
+            matches=options['matches'],
+            referees=options['referees'],
+            rounds=options['rounds'],
+            events=options['events'],
+            seed=options['seed'],
+        )
+        report = run_suite(spec, repeat=max(1, options['repeat']))
+
+        self.stdout.write(f'{report["matches"]} matches, {report["events"]} events (setup {report["setup_ms"]} ms)')
+        for name, result in report['results'].items():
+            self.stdout.write(
+                f'{name:<24} {result["wall_ms"]:>10.1f} ms median of {len(result["wall_ms_runs"])} '
+                f'{result["queries"]:>7} queries ({result["queries_per_item"]} per match)'
+            )
+
+        if options.get('output'):
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
+
+        if options.get('baseline'):
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+            checked = {'all': ('queries', 'wall_ms'), 'queries': ('queries',), 'time': ('wall_ms',)}[options['check']]
+            regressions = []
+            for name, metric, before, after, regressed in compare_reports(baseline, report, options['threshold']):
+                flag = ('  REGRESSION' if metric in checked else '  (not checked)') if regressed else ''
+                self.stdout.write(f'{name}.{metric}: {before} -> {after}{flag}')
+                if regressed and metric in checked:
+                    regressions.append(f'{name}.{metric}')
+            if regressions:
+                raise CommandError(f'Regressions against baseline: {", ".join(regressions)}')
@@ -0,0 +1,113 @@
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from api.consistency import check_shard, init_worker, shard_key, shards
+from api.scoring_batch import matches_for
+
+# Each worker holds a connection and runs shard-sized queries; keep the
+# load on a production database modest unless asked for more.
+DEFAULT_PROCESSES = 2
+
+
+class Command(BaseCommand):
+    help = 'Recompute match results from the event log, report where stored RefereeScore/winner disagree and optionally repair them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--match', type=int, action='append', help='Match ID to check (repeatable). If omitted, checks every match.')
+        parser.add_argument('--category', type=int, help='Only check matches of this category.')
+        parser.add_argument('--event', type=int, help='Only check matches of this event.')
+        parser.add_argument('--repair', action='store_true', help='Write the recomputed referee scores and winners where they differ.')
+        parser.add_argument('--shard-size', type=int, default=200, help='Matches per shard (default: 200).')
+        parser.add_argument(
+            '--processes', type=int, default=DEFAULT_PROCESSES,
+            help=f'Worker processes, each with its own database connection; 1 runs in-process (default: {DEFAULT_PROCESSES}).',
+        )
+        parser.add_argument('--checkpoint', help='Record finished shards in this JSON file and skip them when it already exists (resume).')
+        parser.add_argument('--show', type=int, default=50, help='Print at most this many mismatches (default: 50).')
+
+    def handle(self, *args, **options):
+        match_ids = options.get('match') or matches_for(options.get('category'), options.get('event'))
+        shard_size = max(1, options.get('shard_size') or 200)
+        repair = options.get('repair', False)
+        work = shards(match_ids, shard_size)
+
+        state = self.load_checkpoint(options.get('checkpoint'), shard_size, repair)
+        done = {tuple(key) for key in state['done']}
+        todo = [shard for shard in work if tuple(shard_key(shard)) not in done]
+        if done:
+            self.stdout.write(f'Resuming: {len(work) - len(todo)} of {len(work)} shards already checked')
+
+        processes = max(1, min(options.get('processes') or 1, len(todo) or 1))
+        started = time.monotonic()
+        checked = 0
+        for result in self.run(todo, repair, processes):
+            checked += result['checked']
+            state['checked'] += result['checked']
+            state['repaired'] += result['repaired']
+            state['mismatches'].extend(result['mismatches'])
+            state['done'].append(result['shard'])
+            self.save_checkpoint(options.get('checkpoint'), state)
+            if options.get('verbosity', 1) >= 2:
+                self.stdout.write(f'Shard {result["shard"]}: {result["checked"]} matches, {len(result["mismatches"])} mismatches')
+        elapsed = time.monotonic() - started
+
+        self.report(state, options.get('show', 50))
+        rate = checked / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'{"Repaired" if repair else "Checked"}: {state["checked"]} matches, {len(state["mismatches"])} mismatches, '
+            f'{state["repaired"]} matches repaired; {checked} matches in {elapsed:.2f}s '
+            f'({rate:.1f} matches/s, {processes} process{"es" if processes != 1 else ""})'
+        ))
+
+    def run(self, todo, repair, processes):
+        tasks = [(shard, repair) for shard in todo]
+        if processes == 1:
+            yield from map(check_shard, tasks)
+            return
+        # Forked workers must not share the parent's database connection.
+        connections.close_all()
+        with multiprocessing.Pool(processes, initializer=init_worker) as pool:
+            yield from pool.imap_unordered(check_shard, tasks)
+
+    def load_checkpoint(self, path, shard_size, repair):
+        state = {'shard_size': shard_size, 'repair': repair, 'done': [], 'checked': 0, 'repaired': 0, 'mismatches': []}
+        if not path or not os.path.exists(path):
+            return state
+        with open(path) as fh:
+            saved = json.load(fh)
+        if saved.get('shard_size') != shard_size or saved.get('repair') != repair:
+            raise CommandError(
+                f'Checkpoint {path} was written with --shard-size {saved.get("shard_size")}'
+                f'{" --repair" if saved.get("repair") else ""}; rerun with the same options or delete it.'
+            )
+        if any(not isinstance(key, list) for key in saved.get('done', [])):
+            raise CommandError(f'Checkpoint {path} was written by an older version (shards keyed by first id); delete it.')
+        state.update(saved)
+        return state
+
+    def save_checkpoint(self, path, state):
+        if not path:
+            return
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(state, fh)
+        os.replace(tmp, path)
+
+    def report(self, state, show):
+        # Shards finish out of order under the pool.
+        mismatches = sorted(state['mismatches'], key=lambda m: (m['match'], m['field'], m['referee'] or 0))
+        if not mismatches:
+            return
+        kinds = Counter(m['field'] for m in mismatches)
+        matches = len({m['match'] for m in mismatches})
+        self.stdout.write(f'Mismatches in {matches} matches: ' + ', '.join(f'{n} {kind}' for kind, n in sorted(kinds.items())))
+        for m in mismatches[:max(0, show)]:
+            who = f' referee {m["referee"]}' if m['referee'] is not None else ''
+            self.stdout.write(f'  match {m["match"]} {m["field"]}{who}: stored {m["stored"]} expected {m["expected"]}')
+        if len(mismatches) > show:
+            self.stdout.write(f'  ... {len(mismatches) - show} more')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.search import rebuild_athlete_search
+
+
+class Command(BaseCommand):
+    help = 'Recompute athlete search names and rebuild the name search index (FTS5 on SQLite, pg_trgm on PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild (default: "default").')
+
+    def handle(self, *args, **options):
+        updated = rebuild_athlete_search(options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt athlete search index ({updated} search names updated)'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from api.scoring import rebuild_match_totals
+from api.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild RefereeRoundTotal running totals (and optionally score snapshots) from the RefereePointEvent log.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--match', type=int, action='append', help='Match ID to rebuild (repeatable). If omitted, rebuilds every match.')
+        parser.add_argument('--snapshots', action='store_true', help='Also rebuild the MatchScoreSnapshot checkpoints.')
+
+    def handle(self, *args, **options):
+        match_ids = options.get('match')
+        rows = rebuild_match_totals(match_ids)
+        scope = f'{len(match_ids)} match(es)' if match_ids else 'all matches'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} round totals for {scope}'))
+        if options.get('snapshots'):
+            snapshots = rebuild_snapshots(match_ids)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {snapshots} score snapshots for {scope}'))
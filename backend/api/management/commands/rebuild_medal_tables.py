@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.medals import rebuild_medal_tables
+
+
+class Command(BaseCommand):
+    help = 'Recompute CategoryMedal rows and the event/season medal tables from podiums and approved results.'
+
+    def handle(self, *args, **options):
+        stats = rebuild_medal_tables()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {stats["medals"]} medals: {stats["event_club"]} event/club, '
+            f'{stats["season_club"]} season/club and {stats["season_athlete"]} season/athlete rows'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from api.models import Match
+from api.pools import POOL_MATCH_TYPE, rebuild_pools
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored round-robin pool tables of fight categories from their qualification matches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', type=int, action='append', help='Only rebuild this category ID (repeatable).')
+
+    def handle(self, *args, **options):
+        category_ids = options.get('category')
+        if not category_ids:
+            category_ids = list(Match.objects.filter(match_type=POOL_MATCH_TYPE).values_list('category_id', flat=True).distinct())
+        written = rebuild_pools(category_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt pool tables of {len(category_ids)} categories ({written} standings)'))
@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from api.visas import refresh_visa_statuses
+
+
+class Command(BaseCommand):
+    help = 'Refresh the stored visa_status of every visa (one UPDATE per visa type). Schedule nightly, e.g. from cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Evaluate expiry as of this day (YYYY-MM-DD) instead of today.')
+
+    def handle(self, *args, **options):
+        today = None
+        if options.get('date'):
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+        updated = refresh_visa_statuses(today)
+        details = ', '.join(f'{count} {visa_type}' for visa_type, count in updated.items())
+        self.stdout.write(self.style.SUCCESS(f'Refreshed visa statuses ({details} updated)'))
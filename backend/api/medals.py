@@ -0,0 +1,202 @@
+"""Materialized medal tables (event x club, season x club, season x athlete).
+
+A category's medals are its podium FKs (`first_place`..., `first_place_team`...,
+team members get a medal each) plus approved `CategoryAthleteScore` results
+with a `placement_claimed`; an athlete keeps their best place per category.
+They are stored as `CategoryMedal` rows together with the club, event and
+season they count for.
+
+`refresh_category_medals` recomputes the medals of a few categories, diffs
+them against the stored rows and applies only the difference to the medal
+tables, so a podium change or a result (un)approval touches a handful of
+rows. `rebuild_medal_tables` recomputes everything with set-based queries.
+Club tables count a team medal once per club, and a medal counts for the
+club the athlete belonged to when it was recorded.
+
+Deletes cascade around signals, so categories and athletes that are being
+deleted are tracked in `deleting` and left out of the recomputation.
+"""
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .models import (
+    Athlete, Category, CategoryAthleteScore, CategoryMedal, EventClubMedals, SeasonAthleteMedals, SeasonClubMedals,
+    TeamMember,
+)
+
+PODIUM = (('first_place', 1), ('second_place', 2), ('third_place', 3))
+CLAIMED_PLACES = {'1st': 1, '2nd': 2, '3rd': 3}
+MEDAL_FIELDS = {1: 'gold', 2: 'silver', 3: 'bronze'}
+# Category fields a category's medals depend on.
+CATEGORY_FIELDS = tuple(f'{field}{team}' for field, _ in PODIUM for team in ('', '_team')) + ('event', 'competition')
+
+# table -> (model, key fields)
+TABLES = {
+    'event_club': (EventClubMedals, ('event_id', 'club_id')),
+    'season_club': (SeasonClubMedals, ('season', 'club_id')),
+    'season_athlete': (SeasonAthleteMedals, ('season', 'athlete_id')),
+}
+
+_state = threading.local()
+
+
+def deleting(kind: str) -> set:
+    """Primary keys of 'category' or 'athlete' rows being deleted in this thread."""
+    if not hasattr(_state, kind):
+        setattr(_state, kind, set())
+    return getattr(_state, kind)
+
+
+def _season(category) -> Optional[int]:
+    source = category.event if category.event_id else category.competition
+    start = getattr(source, 'start_date', None) if source else None
+    return start.year if start else None
+
+
+def compute_category_medals(category_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[int, CategoryMedal]]:
+    """Current medals per category: {category_id: {athlete_id: unsaved CategoryMedal}}."""
+    categories = Category.objects.select_related('event', 'competition')
+    claims = CategoryAthleteScore.objects.filter(status='approved', placement_claimed__in=list(CLAIMED_PLACES))
+    if category_ids is not None:
+        category_ids = list(category_ids)
+        categories = categories.filter(pk__in=category_ids)
+        claims = claims.filter(category_id__in=category_ids)
+    categories = {c.pk: c for c in categories}
+
+    places = defaultdict(dict)  # category -> athlete -> best place
+    skip = deleting('athlete')
+
+    def award(category_id, athlete_id, place):
+        if athlete_id and category_id in categories and athlete_id not in skip:
+            current = places[category_id].get(athlete_id)
+            places[category_id][athlete_id] = place if current is None else min(current, place)
+
+    team_places = defaultdict(list)  # team -> [(category, place)]
+    for c in categories.values():
+        for field, place in PODIUM:
+            award(c.pk, getattr(c, f'{field}_id'), place)
+            if getattr(c, f'{field}_team_id'):
+                team_places[getattr(c, f'{field}_team_id')].append((c.pk, place))
+    if team_places:
+        for team_id, athlete_id in TeamMember.objects.filter(team_id__in=list(team_places)).values_list('team_id', 'athlete_id'):
+            for category_id, place in team_places[team_id]:
+                award(category_id, athlete_id, place)
+
+    claim_rows = list(claims.values_list('pk', 'category_id', 'athlete_id', 'placement_claimed', 'type'))
+    team_claims = {pk: (category_id, CLAIMED_PLACES[placement]) for pk, category_id, _, placement, kind in claim_rows if kind == 'teams'}
+    for _, category_id, athlete_id, placement, _ in claim_rows:
+        award(category_id, athlete_id, CLAIMED_PLACES[placement])
+    if team_claims:
+        through = CategoryAthleteScore.team_members.through
+        for score_id, athlete_id in through.objects.filter(categoryathletescore_id__in=list(team_claims)).values_list('categoryathletescore_id', 'athlete_id'):
+            category_id, place = team_claims[score_id]
+            award(category_id, athlete_id, place)
+
+    clubs = dict(Athlete.objects.filter(pk__in={a for p in places.values() for a in p}).values_list('pk', 'club_id'))
+    medals = {}
+    for category_id, athletes in places.items():
+        category = categories[category_id]
+        season = _season(category)
+        medals[category_id] = {
+            athlete_id: CategoryMedal(
+                category_id=category_id, athlete_id=athlete_id, place=place,
+                club_id=clubs.get(athlete_id), event_id=category.event_id, season=season,
+            )
+            for athlete_id, place in athletes.items()
+        }
+    return medals
+
+
+def _contributions(medals: Iterable[CategoryMedal]) -> Counter:
+    """Medal table increments of a set of CategoryMedal rows: {(table, key, place): n}."""
+    counts = Counter()
+    club_medals = set()
+    for m in medals:
+        if m.season is not None:
+            counts[('season_athlete', (m.season, m.athlete_id), m.place)] += 1
+        if m.club_id:
+            # A team medal counts once per club, not once per member.
+            club_medals.add((m.category_id, m.place, m.club_id, m.event_id, m.season))
+    for _, place, club_id, event_id, season in club_medals:
+        if event_id:
+            counts[('event_club', (event_id, club_id), place)] += 1
+        if season is not None:
+            counts[('season_club', (season, club_id), place)] += 1
+    return counts
+
+
+def _apply(deltas: Dict[Tuple[str, tuple, int], int]) -> None:
+    """Add the deltas to the medal tables, creating rows as needed and dropping empty ones."""
+    by_row = defaultdict(dict)
+    for (table, key, place), n in deltas.items():
+        if n:
+            by_row[(table, key)][MEDAL_FIELDS[place]] = n
+    touched = defaultdict(list)
+    for (table, key), delta in by_row.items():
+        model, fields = TABLES[table]
+        lookup = dict(zip(fields, key))
+        updates = {name: F(name) + n for name, n in delta.items()}
+        with transaction.atomic():
+            if not model.objects.filter(**lookup).update(**updates):
+                try:
+                    with transaction.atomic():
+                        model.objects.create(**lookup, **{name: max(n, 0) for name, n in delta.items()})
+                except IntegrityError:
+                    model.objects.filter(**lookup).update(**updates)
+        touched[model].append(Q(**lookup))
+    for model, lookups in touched.items():
+        empty = Q()
+        for q in lookups:
+            empty |= q
+        model.objects.filter(empty, gold=0, silver=0, bronze=0).delete()
+
+
+def refresh_category_medals(category_ids: Iterable[int], deleted: bool = False) -> int:
+    """Recompute the medals of `category_ids` and apply the difference to the medal tables.
+
+    With `deleted=True` the categories' medals are withdrawn (used before a
+    category is deleted). Returns the number of medal table increments applied.
+    """
+    category_ids = [pk for pk in category_ids if deleted or pk not in deleting('category')]
+    if not category_ids:
+        return 0
+    with transaction.atomic():
+        stored = list(CategoryMedal.objects.select_for_update().filter(category_id__in=category_ids))
+        current = {} if deleted else compute_category_medals(category_ids)
+        new_rows = [m for medals in current.values() for m in medals.values()]
+
+        key = lambda m: (m.category_id, m.athlete_id, m.place, m.club_id, m.event_id, m.season)
+        if sorted(map(key, stored)) == sorted(map(key, new_rows)):
+            return 0
+        deltas = _contributions(new_rows)
+        deltas.subtract(_contributions(stored))
+        _apply(deltas)
+        CategoryMedal.objects.filter(category_id__in=category_ids).delete()
+        CategoryMedal.objects.bulk_create(new_rows)
+    return sum(abs(n) for n in deltas.values())
+
+
+def rebuild_medal_tables() -> Dict[str, int]:
+    """Recompute every CategoryMedal row and medal table from scratch."""
+    rows = [m for medals in compute_category_medals().values() for m in medals.values()]
+    counts = _contributions(rows)
+    tables = defaultdict(lambda: defaultdict(dict))
+    for (table, key, place), n in counts.items():
+        tables[table][key][MEDAL_FIELDS[place]] = n
+
+    with transaction.atomic():
+        CategoryMedal.objects.all().delete()
+        CategoryMedal.objects.bulk_create(rows, batch_size=1000)
+        stats = {'medals': len(rows)}
+        for table, (model, fields) in TABLES.items():
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                [model(**dict(zip(fields, key)), **medals) for key, medals in tables[table].items()],
+                batch_size=1000,
+            )
+            stats[table] = len(tables[table])
+    return stats
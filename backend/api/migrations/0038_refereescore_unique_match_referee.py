@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-17 01:54
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def forwards_dedupe(apps, schema_editor):
+    RefereeScore = apps.get_model('api', 'RefereeScore')
+
+    # Older aggregation runs could create several rows for the same
+    # (match, referee) pair. Keep the most recently written one (highest pk).
+    duplicates = (
+        RefereeScore.objects.values('match_id', 'referee_id')
+        .annotate(n=Count('pk'), keep=Max('pk'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        RefereeScore.objects.filter(
+            match_id=row['match_id'], referee_id=row['referee_id']
+        ).exclude(pk=row['keep']).delete()
+
+
+def reverse_noop(apps, schema_editor):
+    # Removing the uniqueness constraint is reversible; deleted rows are not restored.
+    return
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0037_alter_category_competition_alter_category_event_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_dedupe, reverse_noop),
+        migrations.AddConstraint(
+            model_name='refereescore',
+            constraint=models.UniqueConstraint(fields=('match', 'referee'), name='referee_score_unique_match_referee'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.1 on 2026-10-17 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_round_totals(apps, schema_editor):
+    """Fold the existing event log into RefereeRoundTotal rows.
+
+    Mirrors api.scoring._event_deltas with historical models.
+    """
+    RefereePointEvent = apps.get_model('api', 'RefereePointEvent')
+    RefereeRoundTotal = apps.get_model('api', 'RefereeRoundTotal')
+
+    totals = {}
+    for e in RefereePointEvent.objects.order_by('match_id', 'timestamp', 'pk').iterator():
+        if e.side not in ('red', 'blue'):
+            continue
+        meta = e.metadata if isinstance(e.metadata, dict) else {}
+        try:
+            rd = int(meta['round']) if meta.get('round') is not None else 1
+        except Exception:
+            rd = 1
+        row = totals.setdefault((e.match_id, e.referee_id, rd), {})
+        points = e.points or 0
+        if e.event_type == 'score':
+            row[e.side] = row.get(e.side, 0) + points
+            row['score_events'] = row.get('score_events', 0) + 1
+        elif e.event_type == 'penalty':
+            prefix = 'flagged' if meta.get('central') else 'penalty'
+            row[f'{prefix}_{e.side}'] = row.get(f'{prefix}_{e.side}', 0) + points
+            row[f'{prefix}_events'] = row.get(f'{prefix}_events', 0) + 1
+
+    RefereeRoundTotal.objects.bulk_create(
+        [
+            RefereeRoundTotal(match_id=match_id, referee_id=referee_id, round=rd, **values)
+            for (match_id, referee_id, rd), values in totals.items()
+            if values
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0038_refereescore_unique_match_referee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefereeRoundTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.PositiveSmallIntegerField(default=1)),
+                ('red', models.IntegerField(default=0)),
+                ('blue', models.IntegerField(default=0)),
+                ('score_events', models.IntegerField(default=0)),
+                ('penalty_red', models.IntegerField(default=0)),
+                ('penalty_blue', models.IntegerField(default=0)),
+                ('penalty_events', models.IntegerField(default=0)),
+                ('flagged_red', models.IntegerField(default=0)),
+                ('flagged_blue', models.IntegerField(default=0)),
+                ('flagged_events', models.IntegerField(default=0)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_totals', to='api.match')),
+                ('referee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.athlete')),
+            ],
+            options={
+                'ordering': ['match', 'referee', 'round'],
+                'constraints': [models.UniqueConstraint(fields=('match', 'referee', 'round'), name='referee_round_total_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_round_totals, migrations.RunPython.noop),
+    ]
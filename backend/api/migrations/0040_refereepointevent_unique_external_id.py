@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:01
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def forwards_clear_duplicate_external_ids(apps, schema_editor):
+    RefereePointEvent = apps.get_model('api', 'RefereePointEvent')
+
+    # Keep the external_id on the first ingested event (lowest pk) and clear
+    # it on later copies; the events themselves are left in place.
+    duplicates = (
+        RefereePointEvent.objects.exclude(external_id__isnull=True).exclude(external_id='')
+        .values('external_id')
+        .annotate(n=Count('pk'), keep=Min('pk'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        RefereePointEvent.objects.filter(
+            external_id=row['external_id']
+        ).exclude(pk=row['keep']).update(external_id=None)
+
+
+def reverse_noop(apps, schema_editor):
+    # Cleared external ids are not restored.
+    return
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0039_refereeroundtotal'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_clear_duplicate_external_ids, reverse_noop),
+        migrations.AddConstraint(
+            model_name='refereepointevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('external_id__isnull', False), models.Q(('external_id', ''), _negated=True)), fields=('external_id',), name='referee_point_event_unique_external_id'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0040_refereepointevent_unique_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchScoreSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_event_pk', models.BigIntegerField()),
+                ('last_event_at', models.DateTimeField()),
+                ('round', models.PositiveSmallIntegerField(default=1)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('totals', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_snapshots', to='api.match')),
+            ],
+            options={
+                'ordering': ['match', 'last_event_at', 'last_event_pk'],
+                'indexes': [models.Index(fields=['match', 'last_event_at', 'last_event_pk'], name='match_snapshot_position_idx')],
+            },
+        ),
+    ]
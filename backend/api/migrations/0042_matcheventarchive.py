@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0041_matchscoresnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchEventArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('first_event_at', models.DateTimeField(blank=True, null=True)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+                ('summary', models.JSONField(default=dict)),
+                ('data', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='refereepointevent',
+            name='processed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='refereepointevent',
+            index=models.Index(condition=models.Q(('processed', False)), fields=['match'], name='point_event_pending_idx'),
+        ),
+        migrations.AddField(
+            model_name='matcheventarchive',
+            name='match',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='event_archive', to='api.match'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0042_matcheventarchive'),
+        ('landing', '0008_alter_newscomment_options_alter_newspost_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryMedal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('place', models.PositiveSmallIntegerField(choices=[(1, 'Gold'), (2, 'Silver'), (3, 'Bronze')])),
+                ('season', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medals', to='api.athlete')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medals', to='api.category')),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.club')),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='landing.event')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'athlete'), name='category_medal_unique_athlete')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventClubMedals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gold', models.PositiveIntegerField(default=0)),
+                ('silver', models.PositiveIntegerField(default=0)),
+                ('bronze', models.PositiveIntegerField(default=0)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_medals', to='api.club')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='club_medals', to='landing.event')),
+            ],
+            options={
+                'ordering': ['-gold', '-silver', '-bronze'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('event', 'club'), name='event_club_medals_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeasonAthleteMedals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gold', models.PositiveIntegerField(default=0)),
+                ('silver', models.PositiveIntegerField(default=0)),
+                ('bronze', models.PositiveIntegerField(default=0)),
+                ('season', models.PositiveSmallIntegerField()),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_medals', to='api.athlete')),
+            ],
+            options={
+                'ordering': ['-gold', '-silver', '-bronze'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('season', 'athlete'), name='season_athlete_medals_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeasonClubMedals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gold', models.PositiveIntegerField(default=0)),
+                ('silver', models.PositiveIntegerField(default=0)),
+                ('bronze', models.PositiveIntegerField(default=0)),
+                ('season', models.PositiveSmallIntegerField()),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_medals', to='api.club')),
+            ],
+            options={
+                'ordering': ['-gold', '-silver', '-bronze'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('season', 'club'), name='season_club_medals_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_links(apps, schema_editor):
+    """One link per result owner and per team member.
+
+    Mirrors api.result_links.desired_links with historical models.
+    """
+    Score = apps.get_model('api', 'CategoryAthleteScore')
+    Link = apps.get_model('api', 'AthleteResultLink')
+    copied_fields = ('type', 'status', 'submitted_by_athlete')
+
+    scores = {row['pk']: row for row in Score.objects.values('pk', 'athlete_id', *copied_fields)}
+    links = {}
+    for score_id, row in scores.items():
+        copied = {name: row[name] for name in copied_fields}
+        links[(row['athlete_id'], score_id)] = {'is_owner': True, 'is_member': False, **copied}
+    for score_id, athlete_id in Score.team_members.through.objects.values_list('categoryathletescore_id', 'athlete_id'):
+        link = links.get((athlete_id, score_id))
+        if link is None:
+            copied = {name: scores[score_id][name] for name in copied_fields}
+            links[(athlete_id, score_id)] = {'is_owner': False, 'is_member': True, **copied}
+        else:
+            link['is_member'] = True
+
+    Link.objects.bulk_create(
+        [Link(athlete_id=a, score_id=s, **values) for (a, s), values in links.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0043_medal_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AthleteResultLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_owner', models.BooleanField(default=False, help_text="The athlete is the result's own athlete")),
+                ('is_member', models.BooleanField(default=False, help_text='The athlete is listed in team_members')),
+                ('type', models.CharField(max_length=10)),
+                ('status', models.CharField(max_length=20)),
+                ('submitted_by_athlete', models.BooleanField(default=False)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_links', to='api.athlete')),
+                ('score', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='athlete_links', to='api.categoryathletescore')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['athlete', '-score'], name='athlete_result_link_idx')],
+                'constraints': [models.UniqueConstraint(fields=('athlete', 'score'), name='athlete_result_link_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_links, migrations.RunPython.noop),
+    ]
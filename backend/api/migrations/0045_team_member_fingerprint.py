@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:28
+
+import hashlib
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fingerprint_for(athlete_ids):
+    """Frozen copy of Team.fingerprint_for: SHA-1 of the sorted, distinct member ids."""
+    ids = sorted({int(pk) for pk in athlete_ids})
+    return hashlib.sha1(','.join(map(str, ids)).encode()).hexdigest() if ids else ''
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Team = apps.get_model('api', 'Team')
+    TeamMember = apps.get_model('api', 'TeamMember')
+    members = defaultdict(list)
+    for team_id, athlete_id in TeamMember.objects.values_list('team_id', 'athlete_id'):
+        members[team_id].append(athlete_id)
+    teams = list(Team.objects.filter(pk__in=list(members)))
+    for team in teams:
+        team.member_fingerprint = fingerprint_for(members[team.pk])
+    Team.objects.bulk_update(teams, ['member_fingerprint'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0044_athlete_result_links'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='member_fingerprint',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=40),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
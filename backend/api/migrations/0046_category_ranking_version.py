@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0045_team_member_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryRankingVersion',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking_version', serialize=False, to='api.category')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0046_category_ranking_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoolStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pool', models.PositiveSmallIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('played', models.PositiveSmallIntegerField(default=0)),
+                ('wins', models.PositiveSmallIntegerField(default=0)),
+                ('draws', models.PositiveSmallIntegerField(default=0)),
+                ('losses', models.PositiveSmallIntegerField(default=0)),
+                ('points_for', models.IntegerField(default=0)),
+                ('points_against', models.IntegerField(default=0)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pool_standings', to='api.athlete')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pool_standings', to='api.category')),
+            ],
+            options={
+                'ordering': ['category', 'pool', 'rank'],
+                'indexes': [models.Index(fields=['category', 'pool', 'rank'], name='pool_standing_table_idx')],
+                'constraints': [models.UniqueConstraint(fields=('category', 'athlete'), name='pool_standing_unique_athlete')],
+            },
+        ),
+    ]
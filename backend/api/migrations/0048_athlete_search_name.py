@@ -0,0 +1,92 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:40
+
+import re
+import unicodedata
+
+from django.db import DatabaseError, migrations, models, transaction
+
+# Frozen copies of api.search at the time of this migration; later changes
+# to that module apply through its post_migrate hook, not here.
+FTS_TABLE = 'api_athlete_search'
+TRGM_INDEX = 'athlete_search_name_trgm'
+SQLITE_TRIGGERS = {
+    'api_athlete_search_ai': (
+        f"CREATE TRIGGER IF NOT EXISTS api_athlete_search_ai AFTER INSERT ON api_athlete BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.first_name || ' ' || new.last_name); END"
+    ),
+    'api_athlete_search_au': (
+        f"CREATE TRIGGER IF NOT EXISTS api_athlete_search_au AFTER UPDATE OF first_name, last_name ON api_athlete BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; "
+        f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.first_name || ' ' || new.last_name); END"
+    ),
+    'api_athlete_search_ad': (
+        f"CREATE TRIGGER IF NOT EXISTS api_athlete_search_ad AFTER DELETE ON api_athlete BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END"
+    ),
+}
+
+
+def normalize_name(text):
+    decomposed = unicodedata.normalize('NFKD', str(text or '').casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(re.split(r'[\W_]+', stripped)).strip()
+
+
+def backfill_search_names(apps, schema_editor):
+    Athlete = apps.get_model('api', 'Athlete')
+    athletes = list(Athlete.objects.only('pk', 'first_name', 'last_name'))
+    for athlete in athletes:
+        athlete.search_name = normalize_name(f'{athlete.first_name} {athlete.last_name}')
+    Athlete.objects.bulk_update(athletes, ['search_name'], batch_size=1000)
+
+
+def install_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON api_athlete USING gin (search_name gin_trgm_ops)')
+        except DatabaseError:
+            pass  # No permission to install pg_trgm: the btree index on search_name still serves prefixes.
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+            except DatabaseError:
+                return  # SQLite built without FTS5
+            for trigger in SQLITE_TRIGGERS.values():
+                cursor.execute(trigger)
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, name) SELECT id, first_name || ' ' || last_name FROM api_athlete")
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0047_pool_standings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=201),
+        ),
+        migrations.RunPython(backfill_search_names, migrations.RunPython.noop),
+        migrations.RunPython(install_index, drop_index),
+    ]
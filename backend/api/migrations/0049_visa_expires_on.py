@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:45
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+# Frozen copy of Visa.VALIDITY_DAYS (unknown types count as annual).
+VALIDITY_DAYS = {'medical': 180, 'annual': 365}
+
+
+def backfill_expires_on(apps, schema_editor):
+    Visa = apps.get_model('api', 'Visa')
+    visas = list(Visa.objects.filter(issued_date__isnull=False).only('pk', 'visa_type', 'issued_date'))
+    for visa in visas:
+        visa.expires_on = visa.issued_date + timedelta(days=VALIDITY_DAYS.get(visa.visa_type, VALIDITY_DAYS['annual']))
+    Visa.objects.bulk_update(visas, ['expires_on'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0048_athlete_search_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visa',
+            name='expires_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='visa',
+            index=models.Index(fields=['visa_type', 'expires_on'], name='visa_type_expiry_idx'),
+        ),
+        migrations.RunPython(backfill_expires_on, migrations.RunPython.noop),
+    ]
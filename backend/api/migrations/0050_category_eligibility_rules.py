@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0049_visa_expires_on'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='max_age',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Maximum age on the event date', null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='max_grade',
+            field=models.ForeignKey(blank=True, help_text='Highest grade (by rank order) allowed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.grade'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='min_age',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Minimum age on the event date', null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='min_grade',
+            field=models.ForeignKey(blank=True, help_text='Lowest grade (by rank order) allowed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.grade'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='requires_annual_visa',
+            field=models.BooleanField(default=False, help_text='Athletes need an annual visa valid on the event date'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='requires_medical_visa',
+            field=models.BooleanField(default=False, help_text='Athletes need a medical visa valid on the event date'),
+        ),
+    ]
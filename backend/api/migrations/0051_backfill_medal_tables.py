@@ -0,0 +1,100 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations
+
+# Frozen copy of the api.medals rules: podium FKs (team members get a medal
+# each) plus approved results claiming 1st-3rd; an athlete keeps their best
+# place per category and a team medal counts once per club.
+PODIUM = (('first_place', 1), ('second_place', 2), ('third_place', 3))
+CLAIMED_PLACES = {'1st': 1, '2nd': 2, '3rd': 3}
+MEDAL_FIELDS = {1: 'gold', 2: 'silver', 3: 'bronze'}
+
+
+def backfill_medal_tables(apps, schema_editor):
+    Athlete = apps.get_model('api', 'Athlete')
+    Category = apps.get_model('api', 'Category')
+    CategoryAthleteScore = apps.get_model('api', 'CategoryAthleteScore')
+    CategoryMedal = apps.get_model('api', 'CategoryMedal')
+    TeamMember = apps.get_model('api', 'TeamMember')
+    tables = {
+        'event_club': (apps.get_model('api', 'EventClubMedals'), ('event_id', 'club_id')),
+        'season_club': (apps.get_model('api', 'SeasonClubMedals'), ('season', 'club_id')),
+        'season_athlete': (apps.get_model('api', 'SeasonAthleteMedals'), ('season', 'athlete_id')),
+    }
+
+    categories = {c.pk: c for c in Category.objects.select_related('event', 'competition')}
+    places = defaultdict(dict)
+
+    def award(category_id, athlete_id, place):
+        if athlete_id and category_id in categories:
+            current = places[category_id].get(athlete_id)
+            places[category_id][athlete_id] = place if current is None else min(current, place)
+
+    team_places = defaultdict(list)
+    for c in categories.values():
+        for field, place in PODIUM:
+            award(c.pk, getattr(c, f'{field}_id'), place)
+            if getattr(c, f'{field}_team_id'):
+                team_places[getattr(c, f'{field}_team_id')].append((c.pk, place))
+    for team_id, athlete_id in TeamMember.objects.filter(team_id__in=list(team_places)).values_list('team_id', 'athlete_id'):
+        for category_id, place in team_places[team_id]:
+            award(category_id, athlete_id, place)
+
+    claims = CategoryAthleteScore.objects.filter(status='approved', placement_claimed__in=list(CLAIMED_PLACES))
+    claim_rows = list(claims.values_list('pk', 'category_id', 'athlete_id', 'placement_claimed', 'type'))
+    team_claims = {pk: (category_id, CLAIMED_PLACES[placement]) for pk, category_id, _, placement, kind in claim_rows if kind == 'teams'}
+    for _, category_id, athlete_id, placement, _ in claim_rows:
+        award(category_id, athlete_id, CLAIMED_PLACES[placement])
+    through = CategoryAthleteScore.team_members.through
+    for score_id, athlete_id in through.objects.filter(categoryathletescore_id__in=list(team_claims)).values_list('categoryathletescore_id', 'athlete_id'):
+        category_id, place = team_claims[score_id]
+        award(category_id, athlete_id, place)
+
+    clubs = dict(Athlete.objects.filter(pk__in={a for p in places.values() for a in p}).values_list('pk', 'club_id'))
+    rows = []
+    for category_id, athletes in places.items():
+        category = categories[category_id]
+        source = category.event if category.event_id else category.competition
+        start = getattr(source, 'start_date', None) if source else None
+        season = start.year if start else None
+        for athlete_id, place in athletes.items():
+            rows.append(CategoryMedal(
+                category_id=category_id, athlete_id=athlete_id, place=place,
+                club_id=clubs.get(athlete_id), event_id=category.event_id, season=season,
+            ))
+
+    counts = Counter()
+    club_medals = set()
+    for m in rows:
+        if m.season is not None:
+            counts[('season_athlete', (m.season, m.athlete_id), m.place)] += 1
+        if m.club_id:
+            club_medals.add((m.category_id, m.place, m.club_id, m.event_id, m.season))
+    for _, place, club_id, event_id, season in club_medals:
+        if event_id:
+            counts[('event_club', (event_id, club_id), place)] += 1
+        if season is not None:
+            counts[('season_club', (season, club_id), place)] += 1
+    by_table = defaultdict(lambda: defaultdict(dict))
+    for (table, key, place), n in counts.items():
+        by_table[table][key][MEDAL_FIELDS[place]] = n
+
+    CategoryMedal.objects.all().delete()
+    CategoryMedal.objects.bulk_create(rows, batch_size=1000)
+    for table, (model, fields) in tables.items():
+        model.objects.all().delete()
+        model.objects.bulk_create(
+            [model(**dict(zip(fields, key)), **medals) for key, medals in by_table[table].items()],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0050_category_eligibility_rules'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_medal_tables, migrations.RunPython.noop),
+    ]
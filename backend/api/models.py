@@ -1,4 +1,8 @@
-from django.db import models
+import hashlib
+import threading
+import weakref
+
+from django.db import models, transaction
 from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.contrib import admin
@@ -10,6 +14,8 @@ from django.core.exceptions import ValidationError
 from django.db.models.signals import post_delete
 from django.utils.translation import gettext_lazy as _
 
+from .search import normalize_name
+
 # Create your models here.
 
 # Base Mixin for Approval Workflow
@@ -255,6 +261,8 @@ class Athlete(models.Model):
     # Personal Data
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
+    # "first last" without diacritics, lowercased; kept in sync by save() and indexed for search (see api/search.py)
+    search_name = models.CharField(max_length=201, blank=True, default='', editable=False, db_index=True)
     date_of_birth = models.DateField(blank=True, null=True)
     
     GENDER_CHOICES = [
@@ -332,6 +340,13 @@ class Athlete(models.Model):
     approved_date = models.DateTimeField(blank=True, null=True)
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='approved_athletes')
 
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_name(f'{self.first_name} {self.last_name}')
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+
     def update_current_grade(self):
         """
         Automatically set the current_grade to the grade with the highest rank_order from GradeHistory.
@@ -686,9 +701,17 @@ class Visa(models.Model):
         ('revision_required', 'Revision Required'),
     ]
 
+    # How long a visa stays valid after its issue date, per type
+    VALIDITY_DAYS = {
+        'medical': 180,
+        'annual': 365,
+    }
+
     athlete = models.ForeignKey(Athlete, on_delete=models.CASCADE, related_name='visas')
     visa_type = models.CharField(max_length=10, choices=VISA_TYPE_CHOICES)
     issued_date = models.DateField(blank=True, null=True)
+    # Last valid day (issued_date + VALIDITY_DAYS), stored so expiry can be filtered on in SQL
+    expires_on = models.DateField(blank=True, null=True, editable=False)
 
     # Fields that may be used for either type
     document = models.FileField(upload_to='visa_documents/', null=True, blank=True)
@@ -711,15 +734,17 @@ class Visa(models.Model):
         verbose_name = _('Visa')
         verbose_name_plural = _('Visas')
 
+    @classmethod
+    def expiry_for(cls, visa_type, issued_date):
+        """Last valid day of a visa of `visa_type` issued on `issued_date` (None without one)."""
+        if not issued_date:
+            return None
+        return issued_date + timedelta(days=cls.VALIDITY_DAYS.get(visa_type, cls.VALIDITY_DAYS['annual']))
+
     def is_valid(self):
         """Return whether the visa is currently valid depending on type."""
-        if not self.issued_date:
-            return False
-        if self.visa_type == 'medical':
-            expiration = self.issued_date + timedelta(days=180)
-        else:
-            expiration = self.issued_date + timedelta(days=365)
-        return date.today() <= expiration
+        expires_on = self.expires_on or self.expiry_for(self.visa_type, self.issued_date)
+        return expires_on is not None and date.today() <= expires_on
 
     def save(self, *args, **kwargs):
         # Set default status based on submission origin
@@ -728,7 +753,9 @@ class Visa(models.Model):
         elif not getattr(self, 'submitted_by_athlete', False):
             self.status = 'approved'
 
-        # Update visa_status depending on visa type
+        self.expires_on = self.expiry_for(self.visa_type, self.issued_date)
+
+        # Update visa_status depending on visa type (refresh_visa_statuses applies the same rules in bulk)
         if self.visa_type == 'annual':
             if self.issued_date:
                 self.visa_status = 'Valid' if self.is_valid() else 'Expired'
@@ -752,6 +779,9 @@ class Visa(models.Model):
     class Meta:
         verbose_name = _('Visa')
         verbose_name_plural = _('Visas')
+        indexes = [
+            models.Index(fields=['visa_type', 'expires_on'], name='visa_type_expiry_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=(
@@ -971,11 +1001,34 @@ class Team(models.Model):
         blank=True,
         limit_choices_to={'type': 'teams'},  # Only allow categories with type 'teams'
     )
+    # SHA-1 of the sorted member athlete IDs, kept in step by the TeamMember signals.
+    member_fingerprint = models.CharField(max_length=40, blank=True, default='', db_index=True, editable=False)
 
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def fingerprint_for(athlete_ids):
+        """Canonical fingerprint of a member set (order and duplicates don't matter)."""
+        ids = sorted({int(pk) for pk in athlete_ids})
+        return hashlib.sha1(','.join(map(str, ids)).encode()).hexdigest() if ids else ''
+
+    def refresh_member_fingerprint(self):
+        self.member_fingerprint = Team.fingerprint_for(self.members.values_list('athlete_id', flat=True))
+        Team.objects.filter(pk=self.pk).update(member_fingerprint=self.member_fingerprint)
+
+    @classmethod
+    def find_by_members(cls, athlete_ids, category=None):
+        """An existing team with exactly these members (enrolled in `category`, if given)."""
+        fingerprint = cls.fingerprint_for(athlete_ids)
+        if not fingerprint:
+            return None
+        teams = cls.objects.filter(member_fingerprint=fingerprint)
+        if category is not None:
+            teams = teams.filter(enrolled_categories__category=category)
+        return teams.order_by('pk').first()
+
 
 class TeamMember(models.Model):
     """
@@ -1032,6 +1085,14 @@ class Category(models.Model):
         related_name='categories'
     )  # Each category can be assigned to one group
 
+    # Eligibility rules, checked against the event date (see api/eligibility.py); blank means no limit
+    min_age = models.PositiveSmallIntegerField(null=True, blank=True, help_text='Minimum age on the event date')
+    max_age = models.PositiveSmallIntegerField(null=True, blank=True, help_text='Maximum age on the event date')
+    min_grade = models.ForeignKey(Grade, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', help_text='Lowest grade (by rank order) allowed')
+    max_grade = models.ForeignKey(Grade, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', help_text='Highest grade (by rank order) allowed')
+    requires_medical_visa = models.BooleanField(default=False, help_text='Athletes need a medical visa valid on the event date')
+    requires_annual_visa = models.BooleanField(default=False, help_text='Athletes need an annual visa valid on the event date')
+
 
     def clean(self):
         """
@@ -1058,9 +1119,14 @@ class Category(models.Model):
             if len(set(awarded_teams)) != len(awarded_teams):
                 raise ValidationError("The same team cannot be awarded multiple times within the same category.")
 
-            # Ensure teams are enrolled before being awarded
+            # Ensure teams are enrolled before being awarded (one query for all podium places)
+            enrolled = set()
+            if self.pk and awarded_teams:
+                enrolled = set(CategoryTeam.objects.filter(
+                    category=self, team_id__in=[team.pk for team in awarded_teams]
+                ).values_list('team_id', flat=True))
             for team in awarded_teams:
-                if team and not self.teams.filter(pk=team.pk).exists():
+                if team.pk not in enrolled:
                     raise ValidationError(f"Team '{team}' must be enrolled in the category to be awarded.")
         elif self.type in ['solo', 'fight']:
             # Validate individuals
@@ -1070,9 +1136,14 @@ class Category(models.Model):
             if len(set(awarded_athletes)) != len(awarded_athletes):
                 raise ValidationError("The same athlete cannot be awarded multiple times within the same category.")
 
-            # Ensure athletes are enrolled before being awarded
+            # Ensure athletes are enrolled before being awarded (one query for all podium places)
+            enrolled = set()
+            if self.pk and awarded_athletes:
+                enrolled = set(CategoryAthlete.objects.filter(
+                    category=self, athlete_id__in=[athlete.pk for athlete in awarded_athletes]
+                ).values_list('athlete_id', flat=True))
             for athlete in awarded_athletes:
-                if athlete and not CategoryAthlete.objects.filter(category=self, athlete=athlete).exists():
+                if athlete.pk not in enrolled:
                     raise ValidationError(f"Athlete '{athlete}' must be enrolled in the category to be awarded.")
 
 
@@ -1138,8 +1209,19 @@ class Match(models.Model):
         """
         Determine the winner based on referee votes.
         """
-        red_votes = self.referee_scores.filter(winner='red').count()
-        blue_votes = self.referee_scores.filter(winner='blue').count()
+        return self._winner_from_votes(self._referee_votes())
+
+    def _referee_votes(self):
+        """Count referee score rows and red/blue votes in a single query."""
+        return self.referee_scores.aggregate(
+            total=models.Count('pk'),
+            red=models.Count('pk', filter=models.Q(winner='red')),
+            blue=models.Count('pk', filter=models.Q(winner='blue')),
+        )
+
+    def _winner_from_votes(self, votes):
+        red_votes = votes['red']
+        blue_votes = votes['blue']
         if red_votes > blue_votes:
             return self.red_corner
         elif blue_votes > red_votes:
@@ -1163,8 +1245,9 @@ class Match(models.Model):
 
         # If object exists, compute winner from referee_scores if present
         if self.pk:
-            if self.referee_scores.exists():
-                self.winner = self.calculate_winner()
+            votes = self._referee_votes()
+            if votes['total']:
+                self.winner = self._winner_from_votes(votes)
             super().save(*args, **kwargs)
             return
 
@@ -1173,8 +1256,9 @@ class Match(models.Model):
 
         # After initial save, recalc winner if referee_scores were added in the same transaction
         try:
-            if self.referee_scores.exists():
-                self.winner = self.calculate_winner()
+            votes = self._referee_votes()
+            if votes['total']:
+                self.winner = self._winner_from_votes(votes)
                 super().save(update_fields=['winner'])
         except Exception:
             # Best-effort: don't block creation if post-save adjustment fails
@@ -1191,6 +1275,13 @@ class RefereeScore(models.Model):
     blue_corner_score = models.IntegerField(default=0)
     winner = models.CharField(max_length=10, choices=[('red', 'Red Corner'), ('blue', 'Blue Corner')], null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            # One score row per referee and match; lets the aggregator upsert
+            # with bulk_create(update_conflicts=True).
+            models.UniqueConstraint(fields=['match', 'referee'], name='referee_score_unique_match_referee'),
+        ]
+
     def __str__(self):
         return f"Referee: {self.referee.first_name} {self.referee.last_name} - Match: {self.match}"
 
@@ -1214,7 +1305,7 @@ class RefereePointEvent(models.Model):
     side = models.CharField(max_length=10, choices=[('red', 'Red Corner'), ('blue', 'Blue Corner')])
     points = models.IntegerField(default=0)
     event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES, default='score')
-    processed = models.BooleanField(default=False, db_index=True)
+    processed = models.BooleanField(default=False)
     external_id = models.CharField(max_length=200, blank=True, null=True)
     metadata = models.JSONField(
         blank=True,
@@ -1227,8 +1318,24 @@ class RefereePointEvent(models.Model):
     )
     created_by = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Fields whose change affects the running totals in RefereeRoundTotal
+    SCORING_FIELDS = {'match', 'referee', 'side', 'points', 'event_type', 'metadata'}
+
     class Meta:
         ordering = ['timestamp']
+        constraints = [
+            # Clients retry buffered batches; external_id makes ingestion idempotent.
+            models.UniqueConstraint(
+                fields=['external_id'],
+                condition=models.Q(external_id__isnull=False) & ~models.Q(external_id=''),
+                name='referee_point_event_unique_external_id',
+            ),
+        ]
+        indexes = [
+            # The aggregator only scans the pending backlog; a partial index
+            # keeps that scan small however much processed history piles up.
+            models.Index(fields=['match'], condition=models.Q(processed=False), name='point_event_pending_idx'),
+        ]
 
     def __str__(self):
         return f"Event {self.pk} - Match {self.match_id} - Referee {self.referee_id} - {self.side} ({self.points})"
@@ -1246,6 +1353,114 @@ class RefereePointEvent(models.Model):
                 raise
             raise DjangoValidationError(str(e))
 
+    def save(self, *args, **kwargs):
+        """Persist the event and fold it into the match running totals atomically.
+
+        New events are added to `RefereeRoundTotal` incrementally (and may
+        trigger a score snapshot); edits to an existing event rebuild the
+        totals of its match from the log and drop the snapshots covering it.
+        """
+        from .live import hub
+        from .scoring import apply_events_to_totals, rebuild_match_totals
+        from .snapshots import invalidate_snapshots, record_events
+
+        is_new = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                apply_events_to_totals([self])
+                record_events([self])
+            elif update_fields is None or set(update_fields) & self.SCORING_FIELDS:
+                rebuild_match_totals([self.match_id])
+                invalidate_snapshots(self)
+            else:
+                return
+            hub.notify_on_commit(self.match_id)
+
+
+class RefereeRoundTotal(models.Model):
+    """Running per-referee, per-round totals of a match's RefereePointEvent log.
+
+    Maintained incrementally when events are appended (see
+    `RefereePointEvent.save` and `api.scoring.apply_events_to_totals`) so match
+    results can be derived without replaying the log. Penalties are kept apart
+    from scores, and penalties flagged `metadata['central']` apart from the
+    rest, so central penalties can be resolved against the match's current
+    central referee. `api.scoring.rebuild_match_totals` rebuilds the rows
+    from the log.
+    """
+    match = models.ForeignKey('Match', on_delete=models.CASCADE, related_name='round_totals')
+    referee = models.ForeignKey('Athlete', on_delete=models.CASCADE, related_name='+')
+    round = models.PositiveSmallIntegerField(default=1)
+    red = models.IntegerField(default=0)
+    blue = models.IntegerField(default=0)
+    score_events = models.IntegerField(default=0)
+    penalty_red = models.IntegerField(default=0)
+    penalty_blue = models.IntegerField(default=0)
+    penalty_events = models.IntegerField(default=0)
+    flagged_red = models.IntegerField(default=0)
+    flagged_blue = models.IntegerField(default=0)
+    flagged_events = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['match', 'referee', 'round']
+        constraints = [
+            models.UniqueConstraint(fields=['match', 'referee', 'round'], name='referee_round_total_unique'),
+        ]
+
+    def __str__(self):
+        return f"Match {self.match_id} - Referee {self.referee_id} - Round {self.round}: {self.red}/{self.blue}"
+
+
+class MatchEventArchive(models.Model):
+    """Compacted RefereePointEvent log of a finished match.
+
+    `data` is the zlib-compressed JSON list of the match's events; the rows
+    themselves are removed from the hot table. `summary` keeps what the match
+    serializer shows (per-referee breakdown and central penalties) so the
+    blob is only unpacked when the events themselves are needed; see
+    `api.archive`.
+    """
+    match = models.OneToOneField('Match', on_delete=models.CASCADE, related_name='event_archive')
+    event_count = models.PositiveIntegerField(default=0)
+    first_event_at = models.DateTimeField(null=True, blank=True)
+    last_event_at = models.DateTimeField(null=True, blank=True)
+    summary = models.JSONField(default=dict)
+    data = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Match {self.match_id} - {self.event_count} archived events"
+
+
+class MatchScoreSnapshot(models.Model):
+    """Checkpoint of a match's running totals at a point in its event log.
+
+    `totals` holds one `[referee_id, round, red, blue, score_events,
+    penalty_red, penalty_blue, penalty_events, flagged_red, flagged_blue,
+    flagged_events]` row per referee and round, i.e. the `RefereeRoundTotal`
+    rows as they were after the event `last_event_pk` (events ordered by
+    timestamp, then pk). Taken every `MATCH_SNAPSHOT_EVERY` events and when
+    a new round starts; see `api.snapshots`.
+    """
+    match = models.ForeignKey('Match', on_delete=models.CASCADE, related_name='score_snapshots')
+    last_event_pk = models.BigIntegerField()
+    last_event_at = models.DateTimeField()
+    round = models.PositiveSmallIntegerField(default=1)
+    event_count = models.PositiveIntegerField(default=0)
+    totals = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['match', 'last_event_at', 'last_event_pk']
+        indexes = [
+            models.Index(fields=['match', 'last_event_at', 'last_event_pk'], name='match_snapshot_position_idx'),
+        ]
+
+    def __str__(self):
+        return f"Match {self.match_id} - Snapshot after event {self.last_event_pk} ({self.event_count} events)"
+
 
 class CategoryAthleteScore(models.Model):
     """
@@ -1395,14 +1610,8 @@ class CategoryAthleteScore(models.Model):
         if not hasattr(self, '_award_team'):
             # Try to find existing team with same members for this category
             team_members = list(self.team_members.all())
-            existing_teams = Team.objects.filter(categories=self.category)
-            
-            for team in existing_teams:
-                team_member_athletes = [tm.athlete for tm in team.members.all()]
-                if set(team_member_athletes) == set(team_members):
-                    self._award_team = team
-                    break
-            else:
+            self._award_team = Team.find_by_members([m.pk for m in team_members], category=self.category)
+            if self._award_team is None:
                 # Create new team for this award
                 self._award_team = Team.objects.create(
                     name=f"Team {', '.join([f'{m.first_name} {m.last_name}' for m in team_members])}"
@@ -1492,8 +1701,12 @@ class CategoryAthleteScore(models.Model):
             self.team_name = team_name
             self.save(update_fields=['team_name'])
         
-        # Get or create the team
-        team, created = Team.objects.get_or_create(name=team_name)
+        # Reuse the team with exactly these members (preferably one already in
+        # this category), otherwise create it
+        member_ids = list(self.team_members.values_list('pk', flat=True))
+        team = Team.find_by_members(member_ids, category=self.category) or Team.find_by_members(member_ids)
+        if team is None:
+            team = Team.objects.create(name=team_name)
         
         # Add all team members to the team using the TeamMember through model
         for member in self.team_members.all():
@@ -1602,6 +1815,54 @@ class CategoryTeamScore(models.Model):
         return f"{self.team.name} - {self.category.name} - Referee: {self.referee.first_name} {self.referee.last_name}"
 
 
+class CategoryRankingVersion(models.Model):
+    """Bumped on every referee score write in a category; keys the cached rankings (`api.rankings`).
+
+    Created on the first ranking read, so categories nobody has looked at cost
+    nothing on the write path.
+    """
+    category = models.OneToOneField('Category', on_delete=models.CASCADE, primary_key=True, related_name='ranking_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Category {self.category_id} ranking v{self.version}"
+
+
+class PoolStanding(models.Model):
+    """One athlete's line in a round-robin pool table of a fight category.
+
+    Pools are the groups of athletes linked by the category's qualification
+    matches. Rows are maintained by `api.pools`: a match change recomputes
+    only the pool it belongs to, and `rank` already reflects the tiebreakers.
+    """
+    category = models.ForeignKey('Category', on_delete=models.CASCADE, related_name='pool_standings')
+    athlete = models.ForeignKey('Athlete', on_delete=models.CASCADE, related_name='pool_standings')
+    pool = models.PositiveSmallIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    played = models.PositiveSmallIntegerField(default=0)
+    wins = models.PositiveSmallIntegerField(default=0)
+    draws = models.PositiveSmallIntegerField(default=0)
+    losses = models.PositiveSmallIntegerField(default=0)
+    points_for = models.IntegerField(default=0)
+    points_against = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['category', 'pool', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'athlete'], name='pool_standing_unique_athlete'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'pool', 'rank'], name='pool_standing_table_idx'),
+        ]
+
+    @property
+    def point_difference(self):
+        return self.points_for - self.points_against
+
+    def __str__(self):
+        return f"Pool {self.pool} #{self.rank}: athlete {self.athlete_id} in {self.category_id}"
+
+
 # NOTE: CategoryTeamAthleteScore model consolidated into CategoryAthleteScore with type='teams'
 # This model is deprecated and will be removed after migration
 # 
@@ -1612,6 +1873,107 @@ class CategoryTeamScore(models.Model):
 #     pass
 
 
+class AthleteResultLink(models.Model):
+    """Athlete -> result index covering both a result's own athlete and its team members.
+
+    One row per (athlete, result); the result's type, status and submitter
+    flag are copied so the per-athlete result endpoints are a single index
+    range scan instead of an OR across `athlete` and the `team_members`
+    join. Maintained by `api.result_links` from the score write path and
+    `team_members` changes.
+    """
+    athlete = models.ForeignKey('Athlete', on_delete=models.CASCADE, related_name='result_links')
+    score = models.ForeignKey('CategoryAthleteScore', on_delete=models.CASCADE, related_name='athlete_links')
+    is_owner = models.BooleanField(default=False, help_text='The athlete is the result\'s own athlete')
+    is_member = models.BooleanField(default=False, help_text='The athlete is listed in team_members')
+    type = models.CharField(max_length=10)
+    status = models.CharField(max_length=20)
+    submitted_by_athlete = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['athlete', 'score'], name='athlete_result_link_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['athlete', '-score'], name='athlete_result_link_idx'),
+        ]
+
+    def __str__(self):
+        return f"Athlete {self.athlete_id} -> result {self.score_id}"
+
+
+class CategoryMedal(models.Model):
+    """One medal awarded in a category: the podium FKs plus approved placement claims.
+
+    Team awards give every team member a row. The club, event and season are
+    captured when the medal is recorded; `api.medals` keeps these rows and the
+    medal tables below in step with podium and result changes.
+    """
+    PLACE_CHOICES = [(1, 'Gold'), (2, 'Silver'), (3, 'Bronze')]
+
+    category = models.ForeignKey('Category', on_delete=models.CASCADE, related_name='medals')
+    athlete = models.ForeignKey('Athlete', on_delete=models.CASCADE, related_name='medals')
+    place = models.PositiveSmallIntegerField(choices=PLACE_CHOICES)
+    club = models.ForeignKey('Club', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    event = models.ForeignKey('landing.Event', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    season = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'athlete'], name='category_medal_unique_athlete'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_place_display()} - {self.athlete_id} in {self.category_id}"
+
+
+class MedalCount(models.Model):
+    gold = models.PositiveIntegerField(default=0)
+    silver = models.PositiveIntegerField(default=0)
+    bronze = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ['-gold', '-silver', '-bronze']
+
+    @property
+    def total(self):
+        return self.gold + self.silver + self.bronze
+
+
+class EventClubMedals(MedalCount):
+    """Medal table row: medals won by a club at an event (team medals count once per club)."""
+    event = models.ForeignKey('landing.Event', on_delete=models.CASCADE, related_name='club_medals')
+    club = models.ForeignKey('Club', on_delete=models.CASCADE, related_name='event_medals')
+
+    class Meta(MedalCount.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'club'], name='event_club_medals_unique'),
+        ]
+
+
+class SeasonClubMedals(MedalCount):
+    """Medal table row: medals won by a club in a season (calendar year of the event)."""
+    season = models.PositiveSmallIntegerField()
+    club = models.ForeignKey('Club', on_delete=models.CASCADE, related_name='season_medals')
+
+    class Meta(MedalCount.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'club'], name='season_club_medals_unique'),
+        ]
+
+
+class SeasonAthleteMedals(MedalCount):
+    """Medal table row: medals won by an athlete in a season."""
+    season = models.PositiveSmallIntegerField()
+    athlete = models.ForeignKey('Athlete', on_delete=models.CASCADE, related_name='season_medals')
+
+    class Meta(MedalCount.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'athlete'], name='season_athlete_medals_unique'),
+        ]
+
+
 class CategoryScoreActivity(models.Model):
     """
     Activity log for category athlete score approvals and changes.
@@ -1940,6 +2302,36 @@ def sync_referee_score_to_category_scores(sender, instance, **kwargs):
     When a RefereeScore is added or updated, trigger the match sync.
     This ensures CategoryAthleteScore is updated when referee scores change in the admin.
     """
-    if instance.match:
-        # Save the match to recalculate winner and trigger the match sync signal
-        instance.match.save()
+    if instance.match_id:
+        # Save the match to recalculate winner and trigger the match sync signal,
+        # once per match and transaction rather than once per referee row.
+        schedule_match_recompute(instance.match_id)
+
+
+_queued_recomputes = threading.local()
+
+
+def schedule_match_recompute(match_id):
+    """Re-save a match (winner + category sync) once when the transaction commits.
+
+    Saving a match's five RefereeScore inlines used to re-save the match five
+    times. Repeated calls for the same match within a transaction now share a
+    single on_commit callback; outside a transaction it runs immediately.
+    """
+    # {match_id: queued callback}, weakly held: only the on_commit queue keeps
+    # a callback alive, so when Django drops the callbacks of a rolled-back
+    # (savepoint) block the entry disappears with them.
+    queued = getattr(_queued_recomputes, 'callbacks', None)
+    if queued is None:
+        queued = _queued_recomputes.callbacks = weakref.WeakValueDictionary()
+    if queued.get(match_id) is not None:
+        return
+
+    def recompute():
+        queued.pop(match_id, None)
+        match = Match.objects.select_related('red_corner', 'blue_corner', 'category', 'central_referee').filter(pk=match_id).first()
+        if match is not None:
+            match.save()
+
+    queued[match_id] = recompute
+    transaction.on_commit(recompute)
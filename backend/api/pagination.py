@@ -0,0 +1,39 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def wants_full_list(request) -> bool:
+    """Whether a list request opted out of pagination with `?all=1`.
+
+    List endpoints return pages by default. Pickers and dashboards that still
+    need every row ask for it explicitly, so unbounded responses stay
+    visible in the callers until they move to pages or search.
+    """
+    return str(request.query_params.get('all', '')).lower() in ('1', 'true', 'yes')
+
+
+class MatchCursorPagination(CursorPagination):
+    """Cursor pagination for match lists.
+
+    Ordered by primary key so pages stay stable while matches are added
+    during a tournament, and each page is a single indexed range scan
+    instead of an OFFSET.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = 'id'
+
+
+class ResultLinkCursorPagination(CursorPagination):
+    """Keyset pagination over an athlete's `AthleteResultLink` rows, newest result first."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-score_id'
+
+
+class AthletePageNumberPagination(PageNumberPagination):
+    """Page-number pagination for the athlete list (roster tables jump to pages)."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
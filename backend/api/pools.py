@@ -0,0 +1,236 @@
+"""Round-robin pool standings for fight categories.
+
+A category's pools are the groups of athletes connected by its
+qualification matches. For each athlete the pool table counts played
+matches (a winner or at least one referee score), wins, draws (played with
+no winner), losses and the points for/against summed over the referees'
+`RefereeScore` rows. Athletes are ranked by:
+
+1. wins;
+2. head-to-head wins among the athletes level on wins;
+3. point difference;
+4. points scored.
+
+Athletes still level share a rank.
+
+Standings are stored as `PoolStanding` rows. `refresh_pools_for_matches`
+recomputes only the pools the changed matches belong to, each from one
+query, and falls back to rebuilding the category when its pool layout
+changes (new athletes, merged or split pools). `rebuild_pools` recomputes
+whole categories.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import Match, PoolStanding
+
+POOL_MATCH_TYPE = 'qualifications'
+STAT_FIELDS = ('played', 'wins', 'draws', 'losses', 'points_for', 'points_against')
+
+
+def _match_rows(category_ids: Iterable[int], athlete_ids: Optional[Iterable[int]] = None) -> List[tuple]:
+    """(category, red, blue, winner, red points, blue points, referee scores) per pool match, one query."""
+    matches = Match.objects.filter(category_id__in=list(category_ids), match_type=POOL_MATCH_TYPE)
+    if athlete_ids is not None:
+        athlete_ids = list(athlete_ids)
+        matches = matches.filter(red_corner_id__in=athlete_ids, blue_corner_id__in=athlete_ids)
+    return list(
+        matches.annotate(
+            red_points=Sum('referee_scores__red_corner_score'),
+            blue_points=Sum('referee_scores__blue_corner_score'),
+            n_scores=Count('referee_scores'),
+        ).order_by('pk').values_list(
+            'category_id', 'red_corner_id', 'blue_corner_id', 'winner_id', 'red_points', 'blue_points', 'n_scores',
+        )
+    )
+
+
+def _components(rows) -> List[List[int]]:
+    """Connected groups of athletes, in order of their first match."""
+    parent = {}
+
+    def find(a):
+        parent.setdefault(a, a)
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    order = []
+    for _, red, blue, *_ in rows:
+        for a in (red, blue):
+            if a not in parent:
+                order.append(a)
+            find(a)
+        parent[find(blue)] = find(red)
+    groups = defaultdict(list)
+    for a in order:
+        groups[find(a)].append(a)
+    return [groups[root] for root in dict.fromkeys(find(a) for a in order)]
+
+
+def rank_pool(athletes: List[int], rows) -> Dict[int, Dict[str, Any]]:
+    """Standings of one pool: {athlete_id: stats with 'rank'}."""
+    stats = {a: dict.fromkeys(STAT_FIELDS, 0) for a in athletes}
+    beat = defaultdict(set)  # winner -> athletes beaten (for head-to-head)
+    for _, red, blue, winner, red_points, blue_points, n_scores in rows:
+        if red not in stats or blue not in stats or not (winner or n_scores):
+            continue
+        for me, other, scored, conceded in ((red, blue, red_points or 0, blue_points or 0), (blue, red, blue_points or 0, red_points or 0)):
+            line = stats[me]
+            line['played'] += 1
+            line['points_for'] += scored
+            line['points_against'] += conceded
+            if winner is None:
+                line['draws'] += 1
+            elif winner == me:
+                line['wins'] += 1
+                beat[me].add(other)
+            else:
+                line['losses'] += 1
+
+    level_on_wins = defaultdict(set)
+    for a, line in stats.items():
+        level_on_wins[line['wins']].add(a)
+
+    def key(a):
+        line = stats[a]
+        head_to_head = len(beat[a] & level_on_wins[line['wins']])
+        return (line['wins'], head_to_head, line['points_for'] - line['points_against'], line['points_for'])
+
+    ordered = sorted(athletes, key=lambda a: (tuple(-k for k in key(a)), a))
+    previous = None
+    for position, a in enumerate(ordered, start=1):
+        stats[a]['rank'] = previous[1] if previous and previous[0] == key(a) else position
+        previous = (key(a), stats[a]['rank'])
+    return stats
+
+
+def compute_pools(rows) -> Dict[int, List[Dict[int, Dict[str, Any]]]]:
+    """{category_id: [pool standings, ...]} from `_match_rows` output."""
+    by_category = defaultdict(list)
+    for row in rows:
+        by_category[row[0]].append(row)
+    return {
+        category_id: [rank_pool(athletes, category_rows) for athletes in _components(category_rows)]
+        for category_id, category_rows in by_category.items()
+    }
+
+
+def rebuild_pools(category_ids: Iterable[int]) -> int:
+    """Recompute every pool of `category_ids`; returns the number of standings written."""
+    category_ids = list(category_ids)
+    pools = compute_pools(_match_rows(category_ids))
+    rows = [
+        PoolStanding(category_id=category_id, athlete_id=athlete_id, pool=number, **line)
+        for category_id, category_pools in pools.items()
+        for number, pool in enumerate(category_pools, start=1)
+        for athlete_id, line in pool.items()
+    ]
+    with transaction.atomic():
+        PoolStanding.objects.filter(category_id__in=category_ids).delete()
+        PoolStanding.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _refresh_pool(category_id: int, number: int, standings: List[PoolStanding]) -> bool:
+    """Recompute one stored pool in place; False when its membership changed."""
+    athletes = [s.athlete_id for s in standings]
+    rows = _match_rows([category_id], athletes)
+    components = _components(rows)
+    if len(components) != 1 or set(components[0]) != set(athletes):
+        return False
+    pool = rank_pool(athletes, rows)
+    changed = []
+    for standing in standings:
+        line = pool[standing.athlete_id]
+        if any(getattr(standing, name) != value for name, value in line.items()):
+            for name, value in line.items():
+                setattr(standing, name, value)
+            changed.append(standing)
+    if changed:
+        PoolStanding.objects.bulk_update(changed, [*STAT_FIELDS, 'rank'])
+    return True
+
+
+def refresh_pools_for_matches(match_ids: Iterable[int] = (), category_ids: Iterable[int] = ()) -> None:
+    """Bring the pools touched by `match_ids` up to date.
+
+    Pass `category_ids` for matches that no longer exist (deleted), which
+    may split a pool; those categories are rebuilt.
+    """
+    from .medals import deleting
+
+    rebuild = set(category_ids)
+    changed = defaultdict(list)  # category -> [(match_type, red, blue)]
+    for category_id, match_type, red, blue in Match.objects.filter(pk__in=list(match_ids)).values_list(
+        'category_id', 'match_type', 'red_corner_id', 'blue_corner_id'
+    ):
+        changed[category_id].append((match_type, red, blue))
+    if not changed and not rebuild:
+        return
+
+    stored = defaultdict(lambda: defaultdict(list))  # category -> pool -> standings
+    for standing in PoolStanding.objects.filter(category_id__in=list(set(changed) | rebuild)):
+        stored[standing.category_id][standing.pool].append(standing)
+
+    with transaction.atomic():
+        for category_id, matches in changed.items():
+            if category_id in rebuild:
+                continue
+            pools = {s.athlete_id: number for number, standings in stored[category_id].items() for s in standings}
+            numbers = set()
+            for match_type, red, blue in matches:
+                same_pool = pools.get(red) is not None and pools.get(red) == pools.get(blue)
+                if same_pool:
+                    # A non-pool match here may have just left the pool phase.
+                    numbers.add(pools[red])
+                elif match_type == POOL_MATCH_TYPE:
+                    # An athlete new to the pools, or two pools merged.
+                    numbers.add(None)
+            if None in numbers:
+                rebuild.add(category_id)
+                continue
+            for number in numbers:
+                if not _refresh_pool(category_id, number, stored[category_id][number]):
+                    rebuild.add(category_id)
+                    break
+        rebuild -= deleting('category')
+        if rebuild:
+            rebuild_pools(rebuild)
+
+
+def _stored_tables(category_ids) -> Dict[int, List[Dict[str, Any]]]:
+    tables = defaultdict(lambda: defaultdict(list))
+    standings = PoolStanding.objects.filter(category_id__in=list(category_ids)).select_related('athlete__club')
+    for s in standings.order_by('category_id', 'pool', 'rank', 'athlete_id'):
+        tables[s.category_id][s.pool].append({
+            'rank': s.rank,
+            'athlete': s.athlete_id,
+            'name': f'{s.athlete.first_name} {s.athlete.last_name}',
+            'club_name': s.athlete.club.name if s.athlete.club_id else None,
+            **{name: getattr(s, name) for name in STAT_FIELDS},
+            'point_difference': s.point_difference,
+        })
+    return {
+        category_id: [{'pool': number, 'standings': standings} for number, standings in pools.items()]
+        for category_id, pools in tables.items()
+    }
+
+
+def pool_tables(category_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Pool tables per category with athlete names, read from the stored standings.
+
+    Categories with pool matches but no standings yet (e.g. matches played
+    before the table existed) are built on first read.
+    """
+    category_ids = list(category_ids)
+    tables = _stored_tables(category_ids)
+    missing = [pk for pk in category_ids if pk not in tables]
+    if missing and Match.objects.filter(category_id__in=missing, match_type=POOL_MATCH_TYPE).exists():
+        rebuild_pools(missing)
+        tables.update(_stored_tables(missing))
+    return tables
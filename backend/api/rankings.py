@@ -0,0 +1,138 @@
+"""Rankings for form (solo and teams) categories.
+
+Each referee's score is a `CategoryAthleteScore` row (solo: approved,
+official, with a score) or a `CategoryTeamScore` row (teams). `rank_category`
+loads them with one query, and a single pass computes per competitor:
+
+- `scores`: every referee score, highest first;
+- `counted`: the scores left after dropping the `drop_highest` highest and
+  `drop_lowest` lowest (nothing is dropped when that would leave no score);
+- `total` and `average` of the counted scores.
+
+Competitors are ordered by `rank_by` ('total' or 'average') and then the
+`tiebreakers` in turn: 'total', 'average', 'highest' (best single score),
+'lowest' (best worst score) and 'count' (number of referees). Competitors
+still level share a rank (1, 2, 2, 4).
+
+Results are cached per rule set under the category's `CategoryRankingVersion`,
+which every score write bumps, so repeated reads between writes cost one
+query for the version plus one for the competitor names.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Athlete, Category, CategoryAthleteScore, CategoryRankingVersion, CategoryTeamScore, Team
+
+RANK_BY = ('total', 'average')
+TIEBREAKERS = ('total', 'average', 'highest', 'lowest', 'count')
+DEFAULT_TIEBREAKERS = ('average', 'highest', 'lowest')
+
+
+def ranking_cache_seconds() -> int:
+    return int(getattr(settings, 'CATEGORY_RANKING_CACHE_SECONDS', 300))
+
+
+def bump_ranking_version(category_id: int) -> None:
+    """Invalidate the cached rankings of a category (called on score writes)."""
+    CategoryRankingVersion.objects.filter(category_id=category_id).update(version=F('version') + 1)
+
+
+def _score_rows(category: Category) -> List[tuple]:
+    """(competitor_id, score) for every referee score of the category."""
+    if category.type == 'teams':
+        rows = CategoryTeamScore.objects.filter(category=category).values_list('team_id', 'score')
+    else:
+        rows = CategoryAthleteScore.objects.filter(
+            category=category, status='approved', submitted_by_athlete=False, score__isnull=False,
+        ).values_list('athlete_id', 'score')
+    return list(rows)
+
+
+def compute_ranking(rows: Sequence[tuple], drop_highest: int = 0, drop_lowest: int = 0,
+                    rank_by: str = 'total', tiebreakers: Sequence[str] = DEFAULT_TIEBREAKERS) -> List[Dict[str, Any]]:
+    """Rank (competitor_id, score) rows; see the module docstring for the rules."""
+    scores = defaultdict(list)
+    for competitor_id, score in rows:
+        scores[competitor_id].append(score)
+
+    entries = []
+    for competitor_id, values in scores.items():
+        values.sort(reverse=True)
+        counted = values
+        if drop_highest + drop_lowest < len(values):
+            counted = values[drop_highest:len(values) - drop_lowest]
+        total = sum(counted)
+        entries.append({
+            'id': competitor_id,
+            'scores': values,
+            'counted': counted,
+            'total': total,
+            'average': round(total / len(counted), 3),
+            'highest': values[0],
+            'lowest': values[-1],
+            'count': len(values),
+        })
+
+    keys = [rank_by, *[t for t in tiebreakers if t != rank_by]]
+    entries.sort(key=lambda e: (*[-e[k] for k in keys], e['id']))
+    previous = None
+    for position, entry in enumerate(entries, start=1):
+        signature = tuple(entry[k] for k in keys)
+        entry['rank'] = previous[1] if previous and previous[0] == signature else position
+        previous = (signature, entry['rank'])
+    return entries
+
+
+def _names(category: Category, ids) -> Dict[int, Dict[str, Any]]:
+    if category.type == 'teams':
+        return {pk: {'name': name} for pk, name in Team.objects.filter(pk__in=ids).values_list('pk', 'name')}
+    return {
+        pk: {'name': f'{first} {last}', 'club_name': club}
+        for pk, first, last, club in Athlete.objects.filter(pk__in=ids).values_list('pk', 'first_name', 'last_name', 'club__name')
+    }
+
+
+def rank_category(category: Category, drop_highest: Optional[int] = None, drop_lowest: Optional[int] = None,
+                  rank_by: str = 'total', tiebreakers: Sequence[str] = DEFAULT_TIEBREAKERS) -> Dict[str, Any]:
+    """Ranking of a solo or teams category, served from cache until the next score write."""
+    if drop_highest is None:
+        drop_highest = int(getattr(settings, 'CATEGORY_RANKING_DROP_HIGHEST', 0))
+    if drop_lowest is None:
+        drop_lowest = int(getattr(settings, 'CATEGORY_RANKING_DROP_LOWEST', 0))
+    if rank_by not in RANK_BY:
+        raise ValueError(f"rank_by must be one of: {', '.join(RANK_BY)}")
+    unknown = [t for t in tiebreakers if t not in TIEBREAKERS]
+    if unknown:
+        raise ValueError(f"Unknown tiebreaker(s): {', '.join(unknown)}")
+
+    try:
+        version = category.ranking_version.version
+    except CategoryRankingVersion.DoesNotExist:
+        version = CategoryRankingVersion.objects.get_or_create(category=category)[0].version
+
+    key = f'category-ranking:{category.pk}:{version}:{drop_highest}:{drop_lowest}:{rank_by}:{",".join(tiebreakers)}'
+    entries = cache.get(key)
+    cached = entries is not None
+    if not cached:
+        entries = compute_ranking(_score_rows(category), drop_highest, drop_lowest, rank_by, tiebreakers)
+        cache.set(key, entries, ranking_cache_seconds())
+
+    names = _names(category, [e['id'] for e in entries])
+    competitor = 'team' if category.type == 'teams' else 'athlete'
+    results = []
+    for entry in entries:
+        row = {'rank': entry['rank'], competitor: entry['id'], **names.get(entry['id'], {'name': None})}
+        row.update({k: entry[k] for k in ('total', 'average', 'scores', 'counted', 'count')})
+        results.append(row)
+    return {
+        'category': category.pk,
+        'type': category.type,
+        'version': version,
+        'cached': cached,
+        'rules': {'drop_highest': drop_highest, 'drop_lowest': drop_lowest, 'rank_by': rank_by, 'tiebreakers': list(tiebreakers)},
+        'results': results,
+    }
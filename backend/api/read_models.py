@@ -0,0 +1,151 @@
+"""Denormalized read models for list endpoints.
+
+`category_read_model` produces exactly what `CategorySerializer(many=True)`
+returns (podium athletes and teams, enrolled athletes, teams with their
+averaged referee scores, members and clubs) but from a fixed number of
+set-based queries, however many categories, teams and members there are:
+
+1. the categories with their event, competition and group;
+2. enrolled athletes (category, athlete, weight);
+3. enrolled teams (category, team);
+4. every athlete involved, with user, club, grade and approver;
+5. the teams with their memberships of any category;
+6. team members with their athlete and club;
+7. per-(team, category) score sums and counts.
+
+Each athlete and team is serialized once and reused wherever it appears.
+
+`tests/test_category_read_model.py` compares this with `CategorySerializer`
+field by field for every category type; change both together.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+from django.db.models import Count, Sum
+from rest_framework import serializers
+
+from .models import Athlete, CategoryAthlete, CategoryTeam, CategoryTeamScore, Team, TeamMember
+from .serializers import AthleteSerializer
+
+PODIUM = ('first_place', 'second_place', 'third_place')
+
+_weight_field = serializers.DecimalField(max_digits=5, decimal_places=2)
+
+
+def _competition_name(category) -> Any:
+    ent = category.event if category.event_id else category.competition
+    if not ent:
+        return None
+    return getattr(ent, 'title', None) or getattr(ent, 'name', None)
+
+
+def _athletes(athlete_ids: Iterable[int]) -> Dict[int, dict]:
+    athletes = Athlete.objects.filter(pk__in=set(athlete_ids)).select_related('user', 'club', 'current_grade', 'approved_by')
+    return {a.pk: data for a, data in zip(athletes, AthleteSerializer(athletes, many=True).data)}
+
+
+def _teams(team_ids: Iterable[int]) -> Dict[int, dict]:
+    """Team dicts shaped like `TeamSerializer` output, minus the per-category score."""
+    team_ids = set(team_ids)
+    teams = {}
+    for link in CategoryTeam.objects.filter(team_id__in=team_ids).select_related('team', 'category').order_by('pk'):
+        team = teams.setdefault(link.team_id, {'id': link.team_id, 'name': link.team.name, 'categories': [], 'members': []})
+        team['categories'].append({'id': link.category_id, 'name': link.category.name})
+    # Podium teams are not necessarily enrolled anywhere any more.
+    for team in Team.objects.filter(pk__in=team_ids - set(teams)):
+        teams[team.pk] = {'id': team.pk, 'name': team.name, 'categories': [], 'members': []}
+
+    for member in TeamMember.objects.filter(team_id__in=team_ids).select_related('athlete__club').order_by('pk'):
+        club = member.athlete.club
+        teams[member.team_id]['members'].append({
+            'id': member.pk,
+            'athlete': {
+                'id': member.athlete_id,
+                'first_name': member.athlete.first_name,
+                'last_name': member.athlete.last_name,
+                'club': {'id': club.id, 'name': club.name} if club else None,
+            },
+        })
+    for team in teams.values():
+        # `TeamSerializer.get_club_name`: the club of the first member.
+        first = team['members'][0]['athlete'] if team['members'] else None
+        team['club_name'] = first['club']['name'] if first and first['club'] else 'N/A'
+    return teams
+
+
+def _team_scores(category_ids: Iterable[int]) -> Dict[tuple, float]:
+    """Average referee score per (team, category), as `TeamSerializer.get_score` computes it."""
+    return {
+        (row['team_id'], row['category_id']): row['total'] / row['n']
+        for row in CategoryTeamScore.objects.filter(category_id__in=list(category_ids))
+        .values('team_id', 'category_id')
+        .annotate(total=Sum('score'), n=Count('pk'))
+    }
+
+
+def category_read_model(categories) -> List[Dict[str, Any]]:
+    """Serialize `categories` (a queryset or list) in `CategorySerializer` shape."""
+    if hasattr(categories, 'select_related'):
+        categories = categories.select_related('event', 'competition', 'group')
+    categories = list(categories)
+    category_ids = [c.pk for c in categories]
+
+    enrolled = defaultdict(list)
+    for category_id, athlete_id, weight in CategoryAthlete.objects.filter(category_id__in=category_ids).order_by('pk').values_list('category_id', 'athlete_id', 'weight'):
+        enrolled[category_id].append((athlete_id, weight))
+    team_links = defaultdict(list)
+    for category_id, team_id in CategoryTeam.objects.filter(category_id__in=category_ids).order_by('pk').values_list('category_id', 'team_id'):
+        team_links[category_id].append(team_id)
+
+    athlete_ids = {aid for rows in enrolled.values() for aid, _ in rows}
+    athlete_ids.update(getattr(c, f'{place}_id') for c in categories for place in PODIUM)
+    athlete_ids.discard(None)
+    team_ids = {tid for tids in team_links.values() for tid in tids}
+    team_ids.update(getattr(c, f'{place}_team_id') for c in categories for place in PODIUM)
+    team_ids.discard(None)
+
+    athletes = _athletes(athlete_ids) if athlete_ids else {}
+    teams = _teams(team_ids) if team_ids else {}
+    scores = _team_scores(category_ids) if team_ids else {}
+
+    def team_data(team_id, category_id):
+        if team_id is None:
+            return None
+        team = teams[team_id]
+        return {
+            'id': team['id'],
+            'name': team['name'],
+            'categories': team['categories'],
+            'members': team['members'],
+            'score': scores.get((team_id, category_id)),
+            'club_name': team['club_name'],
+        }
+
+    rows = []
+    for c in categories:
+        podium = {place: athletes.get(getattr(c, f'{place}_id')) for place in PODIUM}
+        row = {
+            'id': c.pk,
+            'name': c.name,
+            'competition': c.competition_id,
+            'competition_name': _competition_name(c),
+            'event': c.event_id,
+            'event_name': c.event.title if c.event_id else None,
+            'group': c.group_id,
+            'group_name': c.group.name if c.group_id else None,
+            'type': c.type,
+            'gender': c.gender,
+            'enrolled_athletes': [
+                {'athlete': athletes[aid], 'weight': _weight_field.to_representation(weight) if weight is not None else None}
+                for aid, weight in enrolled[c.pk]
+            ],
+            'teams': [team_data(tid, c.pk) for tid in team_links[c.pk]],
+            **podium,
+            **{f'{place}_name': podium[place]['first_name'] if podium[place] else None for place in PODIUM},
+            **{f'{place}_team': team_data(getattr(c, f'{place}_team_id'), c.pk) for place in PODIUM},
+        }
+        if not c.event_id:
+            # CategorySerializer.event_name is not nullable, so DRF skips it.
+            del row['event_name']
+        rows.append(row)
+    return rows
@@ -0,0 +1,89 @@
+"""Per-athlete result index (`AthleteResultLink`).
+
+`sync_result_links` recomputes the links of a few results from their
+`athlete` and `team_members` and applies the difference; it runs from the
+CategoryAthleteScore post_save and `team_members` m2m signals. The lookup
+helpers below back `all_results`, `my_results` and `my_team_results`.
+"""
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import AthleteResultLink, CategoryAthleteScore
+
+COPIED_FIELDS = ('type', 'status', 'submitted_by_athlete')
+
+
+def desired_links(scores, members) -> dict:
+    """{(athlete_id, score_id): {flags and copied fields}} for score rows and (score_id, athlete_id) members."""
+    scores = {row['pk']: row for row in scores}
+    links = {}
+    for score_id, row in scores.items():
+        copied = {name: row[name] for name in COPIED_FIELDS}
+        links[(row['athlete_id'], score_id)] = {'is_owner': True, 'is_member': False, **copied}
+    for score_id, athlete_id in members:
+        link = links.get((athlete_id, score_id))
+        if link is None:
+            copied = {name: scores[score_id][name] for name in COPIED_FIELDS}
+            links[(athlete_id, score_id)] = {'is_owner': False, 'is_member': True, **copied}
+        else:
+            link['is_member'] = True
+    return links
+
+
+def sync_result_links(score_ids: Iterable[int]) -> int:
+    """Bring the links of `score_ids` in line with the results; returns the number of rows written."""
+    score_ids = list(score_ids)
+    if not score_ids:
+        return 0
+    through = CategoryAthleteScore.team_members.through
+    scores = CategoryAthleteScore.objects.filter(pk__in=score_ids).values('pk', 'athlete_id', *COPIED_FIELDS)
+    members = through.objects.filter(categoryathletescore_id__in=score_ids).values_list('categoryathletescore_id', 'athlete_id')
+    wanted = desired_links(scores, members)
+
+    fields = ('is_owner', 'is_member', *COPIED_FIELDS)
+    with transaction.atomic():
+        existing = {(l.athlete_id, l.score_id): l for l in AthleteResultLink.objects.filter(score_id__in=score_ids)}
+        stale = [l.pk for key, l in existing.items() if key not in wanted]
+        changed = []
+        for key, values in wanted.items():
+            link = existing.get(key)
+            if link is not None and any(getattr(link, name) != values[name] for name in fields):
+                for name in fields:
+                    setattr(link, name, values[name])
+                changed.append(link)
+        new = [AthleteResultLink(athlete_id=a, score_id=s, **values) for (a, s), values in wanted.items() if (a, s) not in existing]
+        if stale:
+            AthleteResultLink.objects.filter(pk__in=stale).delete()
+        if changed:
+            AthleteResultLink.objects.bulk_update(changed, fields)
+        if new:
+            AthleteResultLink.objects.bulk_create(new, ignore_conflicts=True)
+    return len(stale) + len(changed) + len(new)
+
+
+def athlete_result_links(athlete_id: int, scope: str = 'all', status: str = None):
+    """Links of one athlete for a result endpoint.
+
+    `scope` is 'all' (own results and team results they are a member of),
+    'submitted' (own athlete submissions and team memberships) or 'teams'.
+    """
+    links = AthleteResultLink.objects.filter(athlete_id=athlete_id)
+    if scope == 'submitted':
+        links = links.filter(Q(is_owner=True, submitted_by_athlete=True) | Q(is_member=True, type='teams'))
+    elif scope == 'teams':
+        links = links.filter(type='teams')
+    else:
+        links = links.filter(Q(is_owner=True) | Q(is_member=True, type='teams'))
+    if status:
+        links = links.filter(status=status)
+    return links.order_by('-score_id')
+
+
+def results_for_links(links, queryset=None) -> List[CategoryAthleteScore]:
+    """The results behind `links` (a page or queryset), in link order."""
+    score_ids = [l.score_id for l in links] if isinstance(links, list) else list(links.values_list('score_id', flat=True))
+    queryset = queryset if queryset is not None else CategoryAthleteScore.objects.all()
+    scores = queryset.in_bulk(score_ids)
+    return [scores[pk] for pk in score_ids if pk in scores]
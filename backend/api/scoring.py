@@ -1,79 +1,149 @@
 from typing import Dict, Any, Iterable, Optional, Tuple
 from collections import defaultdict
 
-from .models import RefereePointEvent, RefereeScore, Match
+from django.db import IntegrityError, transaction
+from django.db.models import F
 
+from .models import RefereePointEvent, RefereeScore, RefereeRoundTotal, Match
 
-def compute_match_results(match: Match, events: Optional[Iterable[RefereePointEvent]] = None) -> Dict[str, Any]:
-    """
-    Compute per-referee raw and adjusted totals and determine per-referee winners and match winner.
 
-    Parameters
-    - match: Match instance
-    - events: optional iterable of RefereePointEvent; if None, will query all events for the match
+def event_round(event) -> int:
+    """Return the round an event belongs to (metadata['round'], default 1)."""
+    try:
+        metadata = getattr(event, 'metadata', None)
+        if metadata and isinstance(metadata, dict) and metadata.get('round') is not None:
+            return int(metadata.get('round', 1))
+    except Exception:
+        pass
+    return 1
 
-    Returns a dict with keys:
-    - per_ref: mapping referee_id -> {red, blue, adj_red, adj_blue, winner}
-    - central_penalties: {'red': int, 'blue': int}
-    - match_winner: Athlete instance or None
+
+def is_flagged_central(event) -> bool:
+    """True when the event carries an explicit metadata['central'] flag."""
+    try:
+        meta = event.metadata if isinstance(event.metadata, dict) else {}
+    except Exception:
+        meta = {}
+    return bool(meta.get('central'))
+
+
+def summarize_match_events(match: Match, events: Optional[Iterable[RefereePointEvent]] = None) -> Dict[str, Any]:
+    """Scan a match's events once and collect everything callers derive from them.
+
+    Returns a dict with:
+    - per_ref / central_penalties_by_round: the raw accumulators used by
+      `compute_match_results` (only 'score' events count; central penalties
+      are penalties from the central referee or flagged metadata['central']).
+    - breakdown / display_central: the public per-referee breakdown used by
+      `MatchSerializer` (flagged events and the central referee's own events
+      are left out, and every flagged event adjusts each referee's total).
+    - central_penalties: flagged central penalty/deduction events per side.
+
+    Pass `events` (or prefetch `point_events`, with `point_events__referee`
+    for `referee_score_rows`) to avoid the query.
     """
     if events is None:
-        events_qs = RefereePointEvent.objects.filter(match=match).order_by('timestamp')
-    else:
-        # If events provided as queryset or list, use as-is
-        events_qs = events
+        events = match.point_events.all()
+    central_id = getattr(match, 'central_referee_id', None)
 
     # Support per-round scoring. Round number can be stored in event.metadata['round']
     # If not present, default to round 1.
     per_ref = defaultdict(lambda: defaultdict(lambda: {'red': 0, 'blue': 0}))  # per_ref[referee_id][round] -> {red, blue}
     central_penalties_by_round = defaultdict(lambda: {'red': 0, 'blue': 0})
-    central_id = getattr(match, 'central_referee_id', None)
+    breakdown = {}
+    display_central = {'red': 0, 'blue': 0}
+    central_penalties = {'red': [], 'blue': []}
 
-    for e in events_qs:
-        try:
-            rd = 1
-            if getattr(e, 'metadata', None):
-                rd = int(e.metadata.get('round', 1)) if isinstance(e.metadata, dict) and e.metadata.get('round') is not None else 1
-        except Exception:
-            rd = 1
-        rid = e.referee_id
+    for e in events:
+        rd = event_round(e)
+        flagged = is_flagged_central(e)
         # Only treat 'score' events as raw referee contributions. Penalty events
         # should not be included in the raw totals used to proportionally
         # allocate central penalties.
-        if getattr(e, 'event_type', None) == 'score':
-            per_ref[rid][rd][e.side] = per_ref[rid][rd].get(e.side, 0) + (e.points or 0)
+        if e.event_type == 'score':
+            per_ref[e.referee_id][rd][e.side] = per_ref[e.referee_id][rd].get(e.side, 0) + (e.points or 0)
         # Treat an event as a central penalty if either:
         # - it was created by the match central_referee (existing behavior), OR
         # - it has explicit metadata flag metadata['central'] set truthy (admin convenience)
-        is_central_pen = False
-        try:
-            meta = e.metadata if isinstance(e.metadata, dict) else {}
-        except Exception:
-            meta = {}
-        if e.event_type == 'penalty':
-            if central_id and e.referee_id == central_id:
-                is_central_pen = True
-            elif meta.get('central'):
-                is_central_pen = True
-
-        if is_central_pen:
+        if e.event_type == 'penalty' and ((central_id and e.referee_id == central_id) or flagged):
             central_penalties_by_round[rd][e.side] = central_penalties_by_round[rd].get(e.side, 0) + (e.points or 0)
 
+        # Public breakdown: flagged events adjust every referee's total ...
+        side = 'red' if e.side == 'red' else 'blue'
+        if flagged:
+            display_central[side] += e.points
+            if e.event_type in ('penalty', 'deduction') and e.metadata.get('central') is True and e.side in central_penalties:
+                central_penalties[e.side].append({'points': e.points, 'metadata': e.metadata or {}})
+            continue
+        # ... and the central referee's own events are not shown as a column.
+        if e.referee_id == central_id:
+            continue
+        entry = breakdown.get(e.referee_id)
+        if entry is None:
+            entry = breakdown[e.referee_id] = {'event': e, 'rounds': defaultdict(lambda: {'red': 0, 'blue': 0}), 'red': 0, 'blue': 0}
+        display_round = e.metadata.get('round', 1) if isinstance(e.metadata, dict) and e.metadata else 1
+        entry['rounds'][display_round][side] += e.points
+        entry[side] += e.points
+
+    return {
+        'per_ref': per_ref,
+        'central_penalties_by_round': central_penalties_by_round,
+        'breakdown': breakdown,
+        'display_central': display_central,
+        'central_penalties': central_penalties,
+    }
+
+
+def referee_score_rows(summary: Dict[str, Any]) -> list:
+    """Format the public per-referee breakdown of `summarize_match_events`."""
+    pen = summary['display_central']
+    rows = []
+    for entry in summary['breakdown'].values():
+        referee = entry['event'].referee
+        rows.append({
+            'referee_name': f"{referee.first_name} {referee.last_name}",
+            'rounds': [
+                {'round': rd, 'red': entry['rounds'][rd]['red'], 'blue': entry['rounds'][rd]['blue']}
+                for rd in sorted(entry['rounds'].keys())
+            ],
+            # Negative penalty points are subtracted, positive are added
+            'total_red': entry['red'] + pen['red'],
+            'total_blue': entry['blue'] + pen['blue'],
+        })
+    return rows
+
+
+def _accumulate_totals(totals: Iterable[RefereeRoundTotal], central_id: Optional[int]):
+    """Build the scoring accumulators of `summarize_match_events` from stored running totals."""
+    per_ref = defaultdict(lambda: defaultdict(lambda: {'red': 0, 'blue': 0}))
+    central_penalties_by_round = defaultdict(lambda: {'red': 0, 'blue': 0})
+
+    for row in totals:
+        if row.score_events:
+            per_ref[row.referee_id][row.round] = {'red': row.red, 'blue': row.blue}
+        is_central_ref = bool(central_id) and row.referee_id == central_id
+        if row.flagged_events or (is_central_ref and row.penalty_events):
+            pen = central_penalties_by_round[row.round]
+            pen['red'] += row.flagged_red + (row.penalty_red if is_central_ref else 0)
+            pen['blue'] += row.flagged_blue + (row.penalty_blue if is_central_ref else 0)
+
+    return per_ref, central_penalties_by_round
+
+
+def _finalize_results(match: Match, per_ref, central_penalties_by_round) -> Dict[str, Any]:
+    """Turn raw per-referee totals into adjusted totals, votes and the match winner."""
     # If there are existing RefereeScore rows (manually entered), include their
     # raw red/blue totals for referees that have no events yet. This ensures that
     # inline RefereeScore rows (entered directly in admin) are considered when
     # computing winners even if no RefereePointEvent rows exist for them.
-    try:
-        from .models import RefereeScore
-        for rs in RefereeScore.objects.filter(match=match):
-            rid = rs.referee_id
-            if rid not in per_ref:
-                # store as round 1 values
-                per_ref[rid][1]['red'] = (rs.red_corner_score or 0)
-                per_ref[rid][1]['blue'] = (rs.blue_corner_score or 0)
-    except Exception:
-        # If the RefereeScore model can't be imported for some reason, skip this step.
-        pass
+    # Reading through the related manager lets batch callers prefetch
+    # `referee_scores` so this step costs no extra query per match.
+    for rs in match.referee_scores.all():
+        rid = rs.referee_id
+        if rid not in per_ref:
+            # store as round 1 values
+            per_ref[rid][1]['red'] = (rs.red_corner_score or 0)
+            per_ref[rid][1]['blue'] = (rs.blue_corner_score or 0)
 
     # Now compute aggregated totals per referee taking rounds into account. For
     # each referee we compute raw totals per round and adjusted totals by
@@ -86,12 +156,6 @@ def compute_match_results(match: Match, events: Optional[Iterable[RefereePointEv
     per_ref_results = {}
     referee_scores_data = []
 
-    # Pre-compute per-round totals across referees so we can allocate penalties
-    rounds_totals = defaultdict(lambda: {'red': 0, 'blue': 0})
-    for rid, rounds_map in per_ref.items():
-        for rd, sums in rounds_map.items():
-            rounds_totals[rd]['red'] += sums.get('red', 0) or 0
-            rounds_totals[rd]['blue'] += sums.get('blue', 0) or 0
     for rid, rounds_map in per_ref.items():
         total_red = 0
         total_blue = 0
@@ -168,3 +232,106 @@ def compute_match_results(match: Match, events: Optional[Iterable[RefereePointEv
         'match_winner': match_winner,
         'votes': {'red': votes_red, 'blue': votes_blue},
     }
+
+
+def compute_match_results(match: Match, events: Optional[Iterable[RefereePointEvent]] = None) -> Dict[str, Any]:
+    """
+    Compute per-referee raw and adjusted totals and determine per-referee winners and match winner.
+
+    Parameters
+    - match: Match instance
+    - events: optional iterable of RefereePointEvent; if None, will query all events for the match
+
+    Returns a dict with keys:
+    - per_ref: mapping referee_id -> {red, blue, adj_red, adj_blue, winner}
+    - central_penalties: {'red': int, 'blue': int}
+    - match_winner: Athlete instance or None
+    """
+    if events is None:
+        from .archive import load_match_events
+        events = load_match_events(match)
+    summary = summarize_match_events(match, events)
+    return _finalize_results(match, summary['per_ref'], summary['central_penalties_by_round'])
+
+
+def compute_match_results_from_totals(match: Match, totals: Optional[Iterable[RefereeRoundTotal]] = None) -> Dict[str, Any]:
+    """Same result as `compute_match_results` but read from `RefereeRoundTotal`.
+
+    The stored running totals hold one row per referee and round, so this costs
+    O(referees x rounds) instead of a replay of the whole event log. Pass
+    `totals` (or prefetch `round_totals`) to avoid the query.
+    """
+    if totals is None:
+        totals = match.round_totals.all()
+    per_ref, central_penalties_by_round = _accumulate_totals(totals, getattr(match, 'central_referee_id', None))
+    return _finalize_results(match, per_ref, central_penalties_by_round)
+
+
+def _event_deltas(events: Iterable[RefereePointEvent], sign: int = 1) -> Dict[Tuple[int, int, int], Dict[str, int]]:
+    """Group events into per-(match, referee, round) increments for RefereeRoundTotal."""
+    deltas = {}
+    for e in events:
+        if e.side not in ('red', 'blue'):
+            continue
+        key = (e.match_id, e.referee_id, event_round(e))
+        d = deltas.setdefault(key, defaultdict(int))
+        points = (e.points or 0) * sign
+        if e.event_type == 'score':
+            d[e.side] += points
+            d['score_events'] += sign
+        elif e.event_type == 'penalty':
+            if is_flagged_central(e):
+                d[f'flagged_{e.side}'] += points
+                d['flagged_events'] += sign
+            else:
+                d[f'penalty_{e.side}'] += points
+                d['penalty_events'] += sign
+    return {k: v for k, v in deltas.items() if any(v.values())}
+
+
+def apply_events_to_totals(events: Iterable[RefereePointEvent], sign: int = 1) -> None:
+    """Add (or with sign=-1 subtract) events to the stored running totals.
+
+    Runs one UPDATE per touched (match, referee, round) row and inserts the
+    row when it does not exist yet. Subtractions never insert: a missing row
+    means the totals were already removed (e.g. by a cascading delete).
+    """
+    for (match_id, referee_id, rd), delta in _event_deltas(events, sign).items():
+        updates = {name: F(name) + value for name, value in delta.items()}
+        with transaction.atomic():
+            updated = RefereeRoundTotal.objects.filter(match_id=match_id, referee_id=referee_id, round=rd).update(**updates)
+            if updated or sign < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    RefereeRoundTotal.objects.create(match_id=match_id, referee_id=referee_id, round=rd, **delta)
+            except IntegrityError:
+                # Another writer created the row in the meantime; apply as an update.
+                RefereeRoundTotal.objects.filter(match_id=match_id, referee_id=referee_id, round=rd).update(**updates)
+
+
+def rebuild_match_totals(match_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild `RefereeRoundTotal` rows from the event log (repair path).
+
+    Archived events (`api.archive`) are included. Returns the number of rows
+    written.
+    """
+    from .archive import iter_events_with_archives
+
+    events = RefereePointEvent.objects.all()
+    totals = RefereeRoundTotal.objects.all()
+    if match_ids is not None:
+        match_ids = list(match_ids)
+        events = events.filter(match_id__in=match_ids)
+        totals = totals.filter(match_id__in=match_ids)
+
+    rows = [
+        RefereeRoundTotal(match_id=match_id, referee_id=referee_id, round=rd, **delta)
+        for (match_id, referee_id, rd), delta in _event_deltas(
+            iter_events_with_archives(events.order_by('match_id', 'timestamp', 'pk'), match_ids)
+        ).items()
+    ]
+    with transaction.atomic():
+        totals.delete()
+        RefereeRoundTotal.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
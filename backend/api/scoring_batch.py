@@ -0,0 +1,214 @@
+"""Batch scoring for many matches at once (whole categories or events).
+
+`compute_results_batch` returns, for every requested match, the same dict
+`compute_match_results` would. Events for all matches are loaded with one
+query into columnar arrays (match, referee, round, side, points, central
+flag) and the per-referee totals, central penalties, votes and winners are
+computed with a handful of NumPy group-bys instead of nested dicts per match.
+
+NumPy is optional: without it the matches are scored one by one with the
+scalar helper, still from a single events query. Archived events
+(`api.archive`) are read alongside the hot table.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from .archive import archived_events, iter_events_with_archives
+from .models import Match, RefereePointEvent
+from .scoring import compute_match_results, event_round, is_flagged_central
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+def _load_matches(match_ids: Iterable[int]) -> Dict[int, Match]:
+    return {
+        m.pk: m
+        for m in Match.objects.filter(pk__in=list(match_ids))
+        .select_related('red_corner', 'blue_corner')
+        .prefetch_related('referee_scores')
+    }
+
+
+def matches_for(category_id: Optional[int] = None, event_id: Optional[int] = None) -> list:
+    """Ids of the matches of a category and/or an event, in id order."""
+    qs = Match.objects.all()
+    if category_id is not None:
+        qs = qs.filter(category_id=category_id)
+    if event_id is not None:
+        qs = qs.filter(category__event_id=event_id)
+    return list(qs.order_by('pk').values_list('pk', flat=True))
+
+
+def compute_results_batch(match_ids: Iterable[int], use_numpy: Optional[bool] = None) -> Dict[int, Dict[str, Any]]:
+    """Score every match in `match_ids`; returns {match_id: compute_match_results(...)}."""
+    matches = _load_matches(match_ids)
+    if not matches:
+        return {}
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError('NumPy is not installed')
+    if not use_numpy:
+        return _compute_scalar(matches)
+    return _compute_vectorized(matches)
+
+
+def _compute_scalar(matches: Dict[int, Match]) -> Dict[int, Dict[str, Any]]:
+    events_by_match = defaultdict(list)
+    events = RefereePointEvent.objects.filter(match_id__in=list(matches)).order_by('match_id', 'timestamp', 'pk')
+    for e in iter_events_with_archives(events, matches):
+        events_by_match[e.match_id].append(e)
+    return {mid: compute_match_results(match, events_by_match.get(mid, [])) for mid, match in matches.items()}
+
+
+def _load_columns(matches: Dict[int, Match]):
+    """Load all events of `matches` as parallel NumPy columns."""
+    match_pos = {mid: i for i, mid in enumerate(sorted(matches))}
+    central = np.array([matches[mid].central_referee_id or -1 for mid in sorted(matches)], dtype=np.int64)
+
+    rows = list(RefereePointEvent.objects.filter(match_id__in=list(matches)).values_list(
+        'match_id', 'referee_id', 'side', 'points', 'event_type', 'metadata'
+    ))
+    rows.extend(
+        (e.match_id, e.referee_id, e.side, e.points, e.event_type, e.metadata)
+        for events in archived_events(matches).values() for e in events
+    )
+    m, ref, rd, red, blue, pts, score, penalty, flagged = ([] for _ in range(9))
+    for match_id, referee_id, side, points, event_type, metadata in rows:
+        # The metadata JSON still has to be unpacked per row; everything after
+        # this loop works on whole columns.
+        probe = _MetadataProbe(metadata)
+        m.append(match_pos[match_id])
+        ref.append(referee_id)
+        rd.append(event_round(probe))
+        red.append(side == 'red')
+        blue.append(side == 'blue')
+        pts.append(points or 0)
+        score.append(event_type == 'score')
+        penalty.append(event_type == 'penalty')
+        flagged.append(is_flagged_central(probe))
+
+    cols = {
+        'm': np.array(m, dtype=np.int64),
+        'ref': np.array(ref, dtype=np.int64),
+        'rd': np.array(rd, dtype=np.int64),
+        'red': np.array(red, dtype=bool),
+        'blue': np.array(blue, dtype=bool),
+        'pts': np.array(pts, dtype=np.int64),
+        'score': np.array(score, dtype=bool),
+        'penalty': np.array(penalty, dtype=bool),
+        'flagged': np.array(flagged, dtype=bool),
+    }
+    # Central penalties: penalties by the match's central referee or flagged ones.
+    cols['central'] = cols['penalty'] & ((cols['ref'] == central[cols['m']]) | cols['flagged'])
+    return match_pos, cols
+
+
+class _MetadataProbe:
+    """Minimal stand-in exposing `.metadata` to the shared event helpers."""
+    __slots__ = ('metadata',)
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+
+
+def _group_sum(inverse, size, weights):
+    return np.bincount(inverse, weights=weights, minlength=size).astype(np.int64)
+
+
+def _compute_vectorized(matches: Dict[int, Match]) -> Dict[int, Dict[str, Any]]:
+    match_pos, c = _load_columns(matches)
+    mids = sorted(matches)
+    n_matches = len(mids)
+
+    # Central penalties per (match, round); only rounds that had one are reported.
+    cm = c['central']
+    pen_keys, pen_inv = np.unique(np.stack([c['m'][cm], c['rd'][cm]], axis=1).reshape(-1, 2), axis=0, return_inverse=True)
+    pen_inv = pen_inv.reshape(-1)
+    pen_red = _group_sum(pen_inv, len(pen_keys), np.where(c['red'][cm], c['pts'][cm], 0))
+    pen_blue = _group_sum(pen_inv, len(pen_keys), np.where(c['blue'][cm], c['pts'][cm], 0))
+
+    # Raw referee totals per (match, referee, round) from 'score' events.
+    sm = c['score']
+    keys, inv = np.unique(np.stack([c['m'][sm], c['ref'][sm], c['rd'][sm]], axis=1).reshape(-1, 3), axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    raw_red = _group_sum(inv, len(keys), np.where(c['red'][sm], c['pts'][sm], 0))
+    raw_blue = _group_sum(inv, len(keys), np.where(c['blue'][sm], c['pts'][sm], 0))
+
+    # RefereeScore rows stand in (as round 1) for referees without score events.
+    scored = set(zip(keys[:, 0].tolist(), keys[:, 1].tolist()))
+    extra = [
+        (match_pos[mid], rs.referee_id, 1, rs.red_corner_score or 0, rs.blue_corner_score or 0)
+        for mid in mids for rs in matches[mid].referee_scores.all()
+        if (match_pos[mid], rs.referee_id) not in scored
+    ]
+    if extra:
+        extra_arr = np.array(extra, dtype=np.int64)
+        keys = np.concatenate([keys, extra_arr[:, :3]])
+        raw_red = np.concatenate([raw_red, extra_arr[:, 3]])
+        raw_blue = np.concatenate([raw_blue, extra_arr[:, 4]])
+
+    # Each referee round gets the full central penalty of its round.
+    adj_red = raw_red.copy()
+    adj_blue = raw_blue.copy()
+    if len(pen_keys) and len(keys):
+        round_span = int(max(keys[:, 2].max(), pen_keys[:, 1].max())) + 1
+        pen_code = pen_keys[:, 0] * round_span + pen_keys[:, 1]
+        code = keys[:, 0] * round_span + keys[:, 2]
+        pos = np.clip(np.searchsorted(pen_code, code), 0, len(pen_code) - 1)
+        hit = pen_code[pos] == code
+        adj_red += np.where(hit, pen_red[pos], 0)
+        adj_blue += np.where(hit, pen_blue[pos], 0)
+
+    # Per-referee totals and votes.
+    ref_keys, ref_inv = np.unique(keys[:, :2].reshape(-1, 2), axis=0, return_inverse=True)
+    ref_inv = ref_inv.reshape(-1)
+    n_refs = len(ref_keys)
+    tot = {
+        'red': _group_sum(ref_inv, n_refs, raw_red),
+        'blue': _group_sum(ref_inv, n_refs, raw_blue),
+        'adj_red': _group_sum(ref_inv, n_refs, adj_red),
+        'adj_blue': _group_sum(ref_inv, n_refs, adj_blue),
+    }
+    ref_match = ref_keys[:, 0] if n_refs else np.zeros(0, dtype=np.int64)
+    votes_red = np.bincount(ref_match, weights=tot['adj_red'] > tot['adj_blue'], minlength=n_matches).astype(np.int64)
+    votes_blue = np.bincount(ref_match, weights=tot['adj_blue'] > tot['adj_red'], minlength=n_matches).astype(np.int64)
+    sum_adj_red = _group_sum(ref_match, n_matches, tot['adj_red'])
+    sum_adj_blue = _group_sum(ref_match, n_matches, tot['adj_blue'])
+
+    # Assemble the per-match dicts in the shape of compute_match_results.
+    results = {mid: {'per_ref': {}, 'referee_scores_data': [], 'central_penalties': {'red': 0, 'blue': 0}, 'central_penalties_by_round': {}} for mid in mids}
+    for (mi, rd), r, b in zip(pen_keys.tolist(), pen_red.tolist(), pen_blue.tolist()):
+        res = results[mids[mi]]
+        res['central_penalties_by_round'][rd] = {'red': r, 'blue': b}
+        res['central_penalties']['red'] += r
+        res['central_penalties']['blue'] += b
+    for i, (mi, rid) in enumerate(ref_keys.tolist()):
+        ar, ab = int(tot['adj_red'][i]), int(tot['adj_blue'][i])
+        winner = 'red' if ar > ab else 'blue' if ab > ar else None
+        results[mids[mi]]['per_ref'][rid] = {
+            'rounds': {}, 'red': int(tot['red'][i]), 'blue': int(tot['blue'][i]),
+            'adj_red': ar, 'adj_blue': ab, 'winner': winner,
+        }
+        results[mids[mi]]['referee_scores_data'].append((rid, int(tot['red'][i]), int(tot['blue'][i]), winner))
+    for (mi, rid, rd), r, b, ar, ab in zip(keys.tolist(), raw_red.tolist(), raw_blue.tolist(), adj_red.tolist(), adj_blue.tolist()):
+        results[mids[mi]]['per_ref'][rid]['rounds'][rd] = {'red': r, 'blue': b, 'adj_red': ar, 'adj_blue': ab}
+    for mi, mid in enumerate(mids):
+        match = matches[mid]
+        vr, vb = int(votes_red[mi]), int(votes_blue[mi])
+        if vr >= 3 and vr > vb:
+            winner = match.red_corner
+        elif vb >= 3 and vb > vr:
+            winner = match.blue_corner
+        elif sum_adj_red[mi] > sum_adj_blue[mi]:
+            winner = match.red_corner
+        elif sum_adj_blue[mi] > sum_adj_red[mi]:
+            winner = match.blue_corner
+        else:
+            winner = None
+        results[mid]['match_winner'] = winner
+        results[mid]['votes'] = {'red': vr, 'blue': vb}
+    return results
@@ -0,0 +1,161 @@
+"""Indexed, diacritic-insensitive athlete name search.
+
+`Athlete.search_name` holds "first last" folded to lowercase ASCII words
+(so "Ștefan", "Ştefan" and "stefan" are the same), kept up to date by
+`Athlete.save`. A query matches an athlete when every word of the query is
+the start of a word of the name, which is what autocomplete widgets need.
+
+The lookup is served by an index on each backend:
+
+- PostgreSQL: a pg_trgm GIN index on `search_name`, which the prefix
+  `LIKE` filters use; results are ordered by trigram similarity within
+  each relevance band.
+- SQLite: an FTS5 table (`api_athlete_search`, tokenizer with diacritics
+  removed) maintained by triggers on `api_athlete` and queried with prefix
+  terms.
+- anywhere else, or without those extensions: the same `LIKE` filters on
+  the indexed `search_name` column.
+
+Results are ranked exact name, then names starting with the query as whole
+words, then name prefix, then a word prefix (e.g. the last name), then the
+rest, alphabetically within each band. `search_athletes` is shared by the API list
+endpoints and the admin autocomplete.
+"""
+import re
+import unicodedata
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'api_athlete_search'
+TRGM_INDEX = 'athlete_search_name_trgm'
+_SQLITE_TRIGGERS = {
+    'api_athlete_search_ai': (
+        f"CREATE TRIGGER IF NOT EXISTS api_athlete_search_ai AFTER INSERT ON api_athlete BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.first_name || ' ' || new.last_name); END"
+    ),
+    'api_athlete_search_au': (
+        f"CREATE TRIGGER IF NOT EXISTS api_athlete_search_au AFTER UPDATE OF first_name, last_name ON api_athlete BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; "
+        f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.first_name || ' ' || new.last_name); END"
+    ),
+    'api_athlete_search_ad': (
+        f"CREATE TRIGGER IF NOT EXISTS api_athlete_search_ad AFTER DELETE ON api_athlete BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END"
+    ),
+}
+_index_available = {}  # connection alias -> bool
+
+
+def normalize_name(text) -> str:
+    """Lowercase ASCII words of `text`: diacritics stripped, punctuation turned into spaces."""
+    decomposed = unicodedata.normalize('NFKD', str(text or '').casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(re.split(r'[\W_]+', stripped)).strip()
+
+
+def install_search_index(connection, rebuild: bool = False) -> bool:
+    """Create the backend's search index if it is missing; returns whether one is in place.
+
+    Idempotent, so it is run from the migration and again after every
+    `migrate` (SQLite drops the triggers whenever a migration remakes the
+    athlete table). The FTS table is refilled when a trigger was missing
+    or `rebuild` is set.
+    """
+    _index_available.pop(connection.alias, None)
+    if connection.vendor == 'postgresql':
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON api_athlete USING gin (search_name gin_trgm_ops)')
+        except DatabaseError:
+            # No permission to install pg_trgm: the btree index on search_name still serves prefixes.
+            return False
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except DatabaseError:
+            return False  # SQLite built without FTS5
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_athlete'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(_SQLITE_TRIGGERS[name])
+        if missing or rebuild:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, name) SELECT id, first_name || ' ' || last_name FROM api_athlete")
+    return True
+
+
+def _has_index(connection) -> bool:
+    """Whether the FTS5 table (SQLite) or pg_trgm (PostgreSQL) is installed; checked once per connection alias."""
+    if connection.alias not in _index_available:
+        if connection.vendor == 'sqlite':
+            available = FTS_TABLE in connection.introspection.table_names()
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        else:
+            available = False
+        _index_available[connection.alias] = available
+    return _index_available[connection.alias]
+
+
+def search_athletes(queryset, query):
+    """Filter an Athlete queryset to names matching `query`, most relevant first."""
+    term = normalize_name(query)
+    if not term:
+        return queryset.none()
+    words = term.split()
+    connection = connections[queryset.db]
+    indexed = _has_index(connection)
+
+    if connection.vendor == 'sqlite' and indexed:
+        match = ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+        queryset = queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,)))
+    else:
+        for word in words:
+            queryset = queryset.filter(Q(search_name__startswith=word) | Q(search_name__contains=f' {word}'))
+
+    queryset = queryset.annotate(search_rank=Case(
+        When(search_name=term, then=Value(0)),
+        When(search_name__startswith=f'{term} ', then=Value(1)),
+        When(search_name__startswith=term, then=Value(2)),
+        When(search_name__contains=f' {term}', then=Value(3)),
+        default=Value(4),
+        output_field=IntegerField(),
+    ))
+    ordering = ['search_rank']
+    if connection.vendor == 'postgresql' and indexed:
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        queryset = queryset.annotate(search_similarity=TrigramSimilarity('search_name', term))
+        ordering.append('-search_similarity')
+    return queryset.order_by(*ordering, 'search_name', 'pk')
+
+
+def rebuild_athlete_search(using: str = 'default') -> int:
+    """Recompute `search_name` for athletes written around `save()` (bulk creates, `update()`) and refill the index.
+
+    Returns the number of athletes whose `search_name` changed.
+    """
+    from .models import Athlete
+
+    stale = []
+    for athlete in Athlete.objects.using(using).only('pk', 'first_name', 'last_name', 'search_name').iterator():
+        search_name = normalize_name(f'{athlete.first_name} {athlete.last_name}')
+        if athlete.search_name != search_name:
+            athlete.search_name = search_name
+            stale.append(athlete)
+    Athlete.objects.using(using).bulk_update(stale, ['search_name'], batch_size=1000)
+    install_search_index(connections[using], rebuild=True)
+    return len(stale)
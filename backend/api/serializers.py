@@ -50,6 +50,18 @@ class CompetitionSerializer(serializers.ModelSerializer):
 
 
 class AthleteSerializer(serializers.ModelSerializer):
+    """Athlete with user, club and grade details.
+
+    Pass `fields` (names to keep, including the computed
+    `current_grade_details`, `can_edit_profile` and `can_add_results`) and/or
+    `expand` (relations in `EXPANDABLE` to nest instead of returning their
+    IDs) for a sparse projection; without either the full legacy shape is
+    returned. Querysets should `select_related(*AthleteSerializer.RELATED)`.
+    """
+    RELATED = ('user', 'club', 'current_grade', 'approved_by')
+    EXPANDABLE = ('user', 'club', 'current_grade')
+    COMPUTED = ('current_grade_details', 'can_edit_profile', 'can_add_results')
+
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     city = serializers.PrimaryKeyRelatedField(queryset=City.objects.all(), allow_null=True)  # Accept city ID only
     current_grade = serializers.PrimaryKeyRelatedField(queryset=Grade.objects.all(), allow_null=True)  # Accept grade ID only
@@ -66,9 +78,50 @@ class AthleteSerializer(serializers.ModelSerializer):
             'date_of_birth': {'required': True},
         }
     
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = fields is not None or expand is not None
+        self.expand = set(expand or ())
+        self.computed = set(self.COMPUTED)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+            self.computed &= set(fields)
+
+    @classmethod
+    def field_names(cls):
+        return [*cls().fields, *cls.COMPUTED]
+
+    def _sparse_representation(self, instance, representation):
+        if 'user' in self.expand and 'user' in representation:
+            user = instance.user
+            representation['user'] = {'id': user.id, 'email': user.email, 'username': user.username} if user else None
+        if 'club' in self.expand and 'club' in representation:
+            club = instance.club
+            representation['club'] = {'id': club.id, 'name': club.name} if club else None
+        grade = instance.current_grade
+        grade_details = {
+            'id': grade.id,
+            'name': grade.name,
+            'image': grade.image.url if grade.image else None,
+        } if grade else None
+        if 'current_grade' in self.expand and 'current_grade' in representation:
+            representation['current_grade'] = grade_details
+        if 'profile_image' in representation:
+            representation['profile_image'] = instance.profile_image.url if instance.profile_image else None
+        if 'current_grade_details' in self.computed:
+            representation['current_grade_details'] = grade_details
+        if 'can_edit_profile' in self.computed:
+            representation['can_edit_profile'] = instance.can_edit_profile
+        if 'can_add_results' in self.computed:
+            representation['can_add_results'] = instance.can_add_results
+        return representation
+
     def to_representation(self, instance):
         """Customize output to include additional info"""
         representation = super().to_representation(instance)
+        if self.sparse:
+            return self._sparse_representation(instance, representation)
         
         # Add user details if available
         if instance.user:
@@ -282,125 +335,44 @@ class MatchSerializer(serializers.ModelSerializer):
             return f"{cr.first_name} {cr.last_name}"
         return None
 
+    def _event_summary(self, obj):
+        """One scoring pass per match, shared by the score fields below.
+
+        Matches whose events were archived (`api.archive`) use the stored
+        archive summary while they have no hot events; once new events arrive
+        the archived events are unpacked and scored together with them.
+        """
+        summary = getattr(obj, '_event_summary', None)
+        if summary is None:
+            from .scoring import summarize_match_events
+            events = list(obj.point_events.all())
+            archive = getattr(obj, 'event_archive', None)
+            if archive is not None and not events:
+                summary = {'rows': archive.summary.get('referee_scores', []), 'central_penalties': archive.summary.get('central_penalties', {'red': [], 'blue': []})}
+            else:
+                if archive is not None:
+                    from .archive import archived_events
+                    events += archived_events([obj.pk], with_referees=True).get(obj.pk, [])
+                    events.sort(key=lambda e: (e.timestamp, e.pk))
+                summary = summarize_match_events(obj, events)
+            obj._event_summary = summary
+        return summary
+
     def get_referee_scores(self, obj):
         """Return detailed scores from each referee for both corners, broken down by round, with central penalties subtracted."""
-        from collections import defaultdict
-        
-        # Step 1: Calculate total central penalties for the entire match
-        total_red_penalty = 0
-        total_blue_penalty = 0
-        
-        for event in obj.point_events.all():
-            # Check if this is a central penalty event
-            is_central = False
-            if event.metadata and isinstance(event.metadata, dict):
-                is_central = event.metadata.get('central', False)
-            
-            if is_central:
-                # Respect the sign: negative points are penalties, positive are additions
-                if event.side == 'red':
-                    total_red_penalty += event.points
-                else:  # blue
-                    total_blue_penalty += event.points
-        
-        # Step 2: Calculate each referee's raw score (excluding central penalties)
-        referee_data = defaultdict(lambda: {
-            'referee_name': '',
-            'rounds': defaultdict(lambda: {'red': 0, 'blue': 0}),
-            'raw_total_red': 0,
-            'raw_total_blue': 0
-        })
-        
-        # Get the central referee's ID, if one is assigned
-        central_referee_id = obj.central_referee.id if obj.central_referee else None
-
-        # Aggregate point events by referee and round (excluding central penalties)
-        for event in obj.point_events.all():
-            # Skip central penalty events
-            is_central = False
-            if event.metadata and isinstance(event.metadata, dict):
-                is_central = event.metadata.get('central', False)
-            
-            if is_central:
-                continue
-            
-            # Skip events from the central referee
-            if event.referee.id == central_referee_id:
-                continue
-
-            referee_id = event.referee.id
-            referee_name = f"{event.referee.first_name} {event.referee.last_name}"
-            referee_data[referee_id]['referee_name'] = referee_name
-            
-            # Get round from metadata, default to 1
-            round_num = 1
-            if event.metadata and isinstance(event.metadata, dict):
-                round_num = event.metadata.get('round', 1)
-            
-            # Add points to the appropriate side and round
-            if event.side == 'red':
-                referee_data[referee_id]['rounds'][round_num]['red'] += event.points
-                referee_data[referee_id]['raw_total_red'] += event.points
-            else:  # blue
-                referee_data[referee_id]['rounds'][round_num]['blue'] += event.points
-                referee_data[referee_id]['raw_total_blue'] += event.points
-        
-        # Convert to list format for JSON serialization
-        scores = []
-        for ref_id, data in referee_data.items():
-            rounds_list = []
-            for round_num in sorted(data['rounds'].keys()):
-                rounds_list.append({
-                    'round': round_num,
-                    'red': data['rounds'][round_num]['red'],
-                    'blue': data['rounds'][round_num]['blue']
-                })
-            
-            # Step 3: Calculate final totals by applying central adjustments
-            # Negative penalty points are subtracted, positive are added
-            final_total_red = data['raw_total_red'] + total_red_penalty
-            final_total_blue = data['raw_total_blue'] + total_blue_penalty
-            
-            scores.append({
-                'referee_name': data['referee_name'],
-                'rounds': rounds_list,
-                'total_red': final_total_red,
-                'total_blue': final_total_blue
-            })
-        
-        return scores
+        from .scoring import referee_score_rows
+        summary = self._event_summary(obj)
+        if 'rows' in summary:
+            return summary['rows']
+        return referee_score_rows(summary)
 
     def get_central_penalties_red(self, obj):
         """Return detailed central penalties for the red corner."""
-        penalties = []
-        # Filter for central penalties for the red corner
-        penalty_events = obj.point_events.filter(
-            side='red',
-            event_type__in=['penalty', 'deduction'],
-            metadata__central=True
-        )
-        for event in penalty_events:
-            penalties.append({
-                'points': event.points,
-                'metadata': event.metadata or {}
-            })
-        return penalties
+        return self._event_summary(obj)['central_penalties']['red']
 
     def get_central_penalties_blue(self, obj):
         """Return detailed central penalties for the blue corner."""
-        penalties = []
-        # Filter for central penalties for the blue corner
-        penalty_events = obj.point_events.filter(
-            side='blue',
-            event_type__in=['penalty', 'deduction'],
-            metadata__central=True
-        )
-        for event in penalty_events:
-            penalties.append({
-                'points': event.points,
-                'metadata': event.metadata or {}
-            })
-        return penalties
+        return self._event_summary(obj)['central_penalties']['blue']
 
     def validate(self, data):
         """
@@ -410,9 +382,16 @@ class MatchSerializer(serializers.ModelSerializer):
         red_corner = data.get('red_corner')
         blue_corner = data.get('blue_corner')
 
-        if category and red_corner and not category.athletes.filter(pk=red_corner.pk).exists():
+        corners = [athlete for athlete in (red_corner, blue_corner) if athlete]
+        if not category or not corners:
+            return data
+        # One query for both corners.
+        enrolled = set(CategoryAthlete.objects.filter(
+            category=category, athlete_id__in=[athlete.pk for athlete in corners]
+        ).values_list('athlete_id', flat=True))
+        if red_corner and red_corner.pk not in enrolled:
             raise serializers.ValidationError(f"Red corner athlete '{red_corner}' must be enrolled in the category.")
-        if category and blue_corner and not category.athletes.filter(pk=blue_corner.pk).exists():
+        if blue_corner and blue_corner.pk not in enrolled:
             raise serializers.ValidationError(f"Blue corner athlete '{blue_corner}' must be enrolled in the category.")
 
         return data
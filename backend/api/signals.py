@@ -1,4 +1,4 @@
-from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.db.models.signals import m2m_changed, post_migrate, post_save, pre_delete, post_delete, pre_save
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from .models import *
@@ -112,3 +112,219 @@ def update_team_name(sender, instance, **kwargs):
     
 
 
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+def update_team_fingerprint(sender, instance, raw=False, **kwargs):
+    """
+    Keep Team.member_fingerprint in step with the team's members.
+    """
+    if raw:
+        return
+    team = Team.objects.filter(pk=instance.team_id).first()
+    if team is not None:  # gone when the team itself is being deleted
+        team.refresh_member_fingerprint()
+
+
+@receiver(post_delete, sender=RefereePointEvent)
+def subtract_deleted_point_event(sender, instance, **kwargs):
+    """
+    Keep RefereeRoundTotal and the score snapshots in step with the event log
+    when an event is deleted.
+    """
+    from .live import hub
+    from .scoring import apply_events_to_totals
+    from .snapshots import invalidate_snapshots
+    apply_events_to_totals([instance], sign=-1)
+    invalidate_snapshots(instance)
+    hub.notify_on_commit(instance.match_id)
+
+
+def _podium_categories(team_id):
+    return list(Category.objects.filter(
+        models.Q(first_place_team_id=team_id) | models.Q(second_place_team_id=team_id) | models.Q(third_place_team_id=team_id)
+    ).values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_medal_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Note whether a save touches the podium, event or competition of an existing category.
+    """
+    if raw or instance.pk is None:
+        return
+    from .medals import CATEGORY_FIELDS
+    if update_fields is not None:
+        instance._medals_changed = bool(set(CATEGORY_FIELDS) & set(update_fields))
+        return
+    columns = [f'{name}_id' for name in CATEGORY_FIELDS]
+    stored = Category.objects.filter(pk=instance.pk).values(*columns).first()
+    instance._medals_changed = stored is None or any(stored[column] != getattr(instance, column) for column in columns)
+
+
+@receiver(post_save, sender=Category)
+def refresh_medals_for_category(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Apply podium changes to the medal tables; saves that leave them alone cost nothing.
+    """
+    changed = instance.__dict__.pop('_medals_changed', True)
+    if raw or not (created or changed):
+        return
+    from .medals import refresh_category_medals
+    refresh_category_medals([instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def retract_medals_for_category(sender, instance, **kwargs):
+    """
+    Withdraw the category's medals before its results cascade away.
+    """
+    from .medals import deleting, refresh_category_medals
+    refresh_category_medals([instance.pk], deleted=True)
+    deleting('category').add(instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def forget_deleted_category(sender, instance, **kwargs):
+    from .medals import deleting
+    deleting('category').discard(instance.pk)
+
+
+@receiver(pre_delete, sender=Athlete)
+def retract_medals_for_athlete(sender, instance, **kwargs):
+    from .medals import deleting, refresh_category_medals
+    deleting('athlete').add(instance.pk)
+    refresh_category_medals(set(CategoryMedal.objects.filter(athlete=instance).values_list('category_id', flat=True)))
+
+
+@receiver(post_delete, sender=Athlete)
+def forget_deleted_athlete(sender, instance, **kwargs):
+    from .medals import deleting
+    deleting('athlete').discard(instance.pk)
+
+
+@receiver(pre_delete, sender=Team)
+def remember_team_podiums(sender, instance, **kwargs):
+    # The podium FKs are nulled with a plain UPDATE, which sends no signal.
+    instance._medal_categories = _podium_categories(instance.pk)
+
+
+@receiver(post_delete, sender=Team)
+def refresh_medals_for_team(sender, instance, **kwargs):
+    category_ids = getattr(instance, '_medal_categories', None)
+    if category_ids:
+        from .medals import refresh_category_medals
+        refresh_category_medals(category_ids)
+
+
+@receiver(post_save, sender=CategoryAthleteScore)
+@receiver(post_delete, sender=CategoryAthleteScore)
+def refresh_medals_for_result(sender, instance, raw=False, **kwargs):
+    """
+    Approving, un-approving or deleting a result with a placement claim moves medals.
+    """
+    if raw or not (instance.placement_claimed or CategoryMedal.objects.filter(category_id=instance.category_id).exists()):
+        return
+    from .medals import refresh_category_medals
+    refresh_category_medals([instance.category_id])
+
+
+@receiver(m2m_changed, sender=CategoryAthleteScore.team_members.through)
+def refresh_medals_for_result_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from .medals import refresh_category_medals
+    if reverse:
+        category_ids = CategoryAthleteScore.objects.filter(pk__in=pk_set or []).values_list('category_id', flat=True)
+    else:
+        category_ids = [instance.category_id]
+    refresh_category_medals(set(category_ids))
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+def refresh_medals_for_team_member(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    category_ids = _podium_categories(instance.team_id)
+    if category_ids:
+        from .medals import refresh_category_medals
+        refresh_category_medals(category_ids)
+
+
+@receiver(post_save, sender=CategoryAthleteScore)
+def sync_links_for_result(sender, instance, raw=False, **kwargs):
+    """
+    Keep the athlete -> result index in step with the result's athlete, type and status.
+    """
+    if raw:
+        return
+    from .result_links import sync_result_links
+    sync_result_links([instance.pk])
+
+
+@receiver(m2m_changed, sender=CategoryAthleteScore.team_members.through)
+def sync_links_for_result_members(sender, instance, action, reverse, pk_set, **kwargs):
+    from .result_links import sync_result_links
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            sync_result_links([instance.pk])
+    elif action == 'pre_clear':
+        # The cleared results are only known before the clear.
+        instance._cleared_results = list(instance.team_results.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        sync_result_links(getattr(instance, '_cleared_results', []))
+    elif action in ('post_add', 'post_remove'):
+        sync_result_links(pk_set or [])
+
+
+@receiver(post_save, sender=CategoryAthleteScore)
+@receiver(post_delete, sender=CategoryAthleteScore)
+@receiver(post_save, sender=CategoryTeamScore)
+@receiver(post_delete, sender=CategoryTeamScore)
+def invalidate_category_ranking(sender, instance, **kwargs):
+    """
+    A score write makes the cached rankings of its category stale.
+    """
+    from .rankings import bump_ranking_version
+    bump_ranking_version(instance.category_id)
+
+
+@receiver(post_save, sender=Match)
+def refresh_pools_for_match(sender, instance, raw=False, **kwargs):
+    """
+    Keep the pool tables of fight categories current as winners and scores change.
+    """
+    if raw:
+        return
+    from .pools import refresh_pools_for_matches
+    refresh_pools_for_matches([instance.pk])
+
+
+@receiver(post_delete, sender=Match)
+def refresh_pools_for_deleted_match(sender, instance, **kwargs):
+    from .pools import refresh_pools_for_matches
+    refresh_pools_for_matches(category_ids=[instance.category_id])
+
+
+@receiver(post_delete, sender=RefereeScore)
+def recompute_match_for_deleted_referee_score(sender, instance, **kwargs):
+    """
+    Re-save the match once on commit, like a RefereeScore save does; the
+    match save refreshes its pool.
+    """
+    if instance.match_id:
+        schedule_match_recompute(instance.match_id)
+
+
+@receiver(post_migrate)
+def ensure_athlete_search_index(sender, using='default', **kwargs):
+    """
+    Re-create the athlete search triggers after migrations; SQLite drops them
+    whenever a migration rebuilds the athlete table.
+    """
+    if getattr(sender, 'name', None) != 'api':
+        return
+    from django.db import connections
+    from .search import install_search_index
+    install_search_index(connections[using])
@@ -0,0 +1,235 @@
+"""Score snapshots of the match event log and point-in-time replay.
+
+`MatchScoreSnapshot` rows checkpoint a match's running totals every
+`MATCH_SNAPSHOT_EVERY` events (default 50) and whenever a later round starts.
+`score_at` answers "what was the score at time T" by loading the nearest
+snapshot at or before T and folding only the events between it and T, so the
+cost is bounded by the snapshot interval instead of the length of the log.
+
+Events are positioned by (timestamp, pk). A snapshot covers every event up
+to and including its position; editing or deleting an event drops the
+snapshots that cover it (`invalidate_snapshots`), and they are taken again
+as new events arrive or by `rebuild_snapshots`.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .archive import archived_events, iter_events_with_archives
+from .models import Match, MatchScoreSnapshot, RefereePointEvent, RefereeRoundTotal
+from .scoring import _event_deltas, compute_match_results_from_totals, event_round
+
+TOTAL_FIELDS = (
+    'red', 'blue', 'score_events',
+    'penalty_red', 'penalty_blue', 'penalty_events',
+    'flagged_red', 'flagged_blue', 'flagged_events',
+)
+
+
+def snapshot_every() -> int:
+    return max(1, int(getattr(settings, 'MATCH_SNAPSHOT_EVERY', 50)))
+
+
+def _after(at, pk) -> Q:
+    """Events positioned strictly after (at, pk)."""
+    return Q(timestamp__gt=at) | Q(timestamp=at, pk__gt=pk)
+
+
+def _upto(at, pk) -> Q:
+    """Events positioned at or before (at, pk)."""
+    return Q(timestamp__lt=at) | Q(timestamp=at, pk__lte=pk)
+
+
+def _load_state(snapshot: Optional[MatchScoreSnapshot]) -> Dict[tuple, Dict[str, int]]:
+    state = defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+    for row in (snapshot.totals if snapshot else []):
+        state[(row[0], row[1])] = dict(zip(TOTAL_FIELDS, row[2:]))
+    return state
+
+
+def _fold(state, events: Iterable[RefereePointEvent]) -> None:
+    for (_, referee_id, rd), delta in _event_deltas(events).items():
+        row = state[(referee_id, rd)]
+        for name, value in delta.items():
+            row[name] += value
+
+
+def _dump_state(state) -> list:
+    return [
+        [referee_id, rd] + [row[name] for name in TOTAL_FIELDS]
+        for (referee_id, rd), row in sorted(state.items())
+        if any(row.values())
+    ]
+
+
+def _latest_snapshot(match_id: int, at: Optional[datetime] = None) -> Optional[MatchScoreSnapshot]:
+    qs = MatchScoreSnapshot.objects.filter(match_id=match_id)
+    if at is not None:
+        qs = qs.filter(last_event_at__lte=at)
+    return qs.order_by('-last_event_at', '-last_event_pk').first()
+
+
+def _events_between(match_id: int, after: Optional[MatchScoreSnapshot] = None, upto=None, until: Optional[datetime] = None) -> List[RefereePointEvent]:
+    """Events of a match after the `after` snapshot and up to the `upto` event or time `until`.
+
+    Archived events (`api.archive`) are merged in, so replay also works for
+    matches whose log was compacted.
+    """
+    events = RefereePointEvent.objects.filter(match_id=match_id)
+    keep = []
+    if after is not None:
+        events = events.filter(_after(after.last_event_at, after.last_event_pk))
+        keep.append(lambda e: (e.timestamp, e.pk) > (after.last_event_at, after.last_event_pk))
+    if upto is not None:
+        events = events.filter(_upto(upto.timestamp, upto.pk))
+        keep.append(lambda e: (e.timestamp, e.pk) <= (upto.timestamp, upto.pk))
+    if until is not None:
+        events = events.filter(timestamp__lte=until)
+        keep.append(lambda e: e.timestamp <= until)
+    archived = [e for e in archived_events([match_id]).get(match_id, []) if all(k(e) for k in keep)]
+    return sorted(list(events) + archived, key=lambda e: (e.timestamp, e.pk))
+
+
+def _take_snapshot(match_id: int, base: Optional[MatchScoreSnapshot], event: RefereePointEvent) -> MatchScoreSnapshot:
+    """Snapshot the totals after `event`, starting from the `base` snapshot."""
+    tail = _events_between(match_id, after=base, upto=event)
+    state = _load_state(base)
+    _fold(state, tail)
+    return MatchScoreSnapshot.objects.create(
+        match_id=match_id,
+        last_event_pk=event.pk,
+        last_event_at=event.timestamp,
+        # The furthest round reached; late events of an earlier round don't move it back.
+        round=max([base.round if base else 1] + [event_round(e) for e in tail]),
+        event_count=(base.event_count if base else 0) + len(tail),
+        totals=_dump_state(state),
+    )
+
+
+def _latest_with_pending(match_id: int):
+    """(latest snapshot, events after it) in one query; two before the first snapshot."""
+    after = RefereePointEvent.objects.filter(match_id=OuterRef('match_id')).filter(
+        Q(timestamp__gt=OuterRef('last_event_at')) | Q(timestamp=OuterRef('last_event_at'), pk__gt=OuterRef('last_event_pk'))
+    ).order_by().values('match_id').annotate(n=Count('pk')).values('n')
+    latest = (
+        MatchScoreSnapshot.objects.filter(match_id=match_id)
+        .annotate(pending=Coalesce(Subquery(after), 0))
+        .order_by('-last_event_at', '-last_event_pk')
+        .first()
+    )
+    if latest is None:
+        return None, RefereePointEvent.objects.filter(match_id=match_id).count()
+    return latest, latest.pending
+
+
+def record_events(events: Iterable[RefereePointEvent]) -> int:
+    """Take the snapshots due after appending `events`; returns how many were taken.
+
+    Called for every new event (`RefereePointEvent.save`, batch ingestion).
+    Per match this costs one query for the latest snapshot and the number of
+    events after it; a snapshot is taken once `MATCH_SNAPSHOT_EVERY` events
+    have accumulated or an event of a later round than the latest snapshot
+    arrives (late events of earlier rounds just count towards the interval).
+    """
+    by_match = defaultdict(list)
+    for e in events:
+        by_match[e.match_id].append(e)
+
+    every = snapshot_every()
+    taken = 0
+    for match_id, new in by_match.items():
+        new.sort(key=lambda e: (e.timestamp, e.pk))
+        first, last = new[0], new[-1]
+        latest, pending = _latest_with_pending(match_id)
+        if latest is not None and (latest.last_event_at, latest.last_event_pk) > (first.timestamp, first.pk):
+            # An event landed before existing snapshots (clock skew or a late
+            # commit); they no longer match the log.
+            invalidate_snapshots(first)
+            latest, pending = _latest_with_pending(match_id)
+
+        new_round = any(event_round(e) > (latest.round if latest else 1) for e in new)
+        if new_round or pending >= every:
+            _take_snapshot(match_id, latest, last)
+            taken += 1
+    return taken
+
+
+def invalidate_snapshots(event: RefereePointEvent) -> int:
+    """Delete the snapshots of the event's match that include it."""
+    deleted, _ = MatchScoreSnapshot.objects.filter(match_id=event.match_id).filter(
+        Q(last_event_at__gt=event.timestamp) | Q(last_event_at=event.timestamp, last_event_pk__gte=event.pk)
+    ).delete()
+    return deleted
+
+
+def rebuild_snapshots(match_ids: Optional[Iterable[int]] = None) -> int:
+    """Recreate the snapshots of `match_ids` (all matches by default) from the log.
+
+    Applies the same cadence as `record_events`. Returns the number of
+    snapshots written.
+    """
+    events = RefereePointEvent.objects.all()
+    snapshots = MatchScoreSnapshot.objects.all()
+    if match_ids is not None:
+        match_ids = list(match_ids)
+        events = events.filter(match_id__in=match_ids)
+        snapshots = snapshots.filter(match_id__in=match_ids)
+
+    every = snapshot_every()
+    rows = []
+    match_id = state = None
+    count = since = rd = 0
+    for e in iter_events_with_archives(events.order_by('match_id', 'timestamp', 'pk'), match_ids):
+        if e.match_id != match_id:
+            match_id, state, count, since, rd = e.match_id, _load_state(None), 0, 0, 1
+        _fold(state, [e])
+        count += 1
+        since += 1
+        if since >= every or event_round(e) > rd:
+            rd = max(rd, event_round(e))
+            rows.append(MatchScoreSnapshot(
+                match_id=match_id, last_event_pk=e.pk, last_event_at=e.timestamp,
+                round=rd, event_count=count, totals=_dump_state(state),
+            ))
+            since = 0
+    with transaction.atomic():
+        snapshots.delete()
+        MatchScoreSnapshot.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def round_started_at(match: Match, rd: int) -> Optional[datetime]:
+    """Timestamp of the first event of round `rd` (events without a round are round 1)."""
+    events = match.point_events.order_by('timestamp', 'pk')
+    if rd != 1:
+        events = events.filter(metadata__round=rd)
+    started = events.values_list('timestamp', flat=True).first()
+    archived = [e.timestamp for e in archived_events([match.pk]).get(match.pk, []) if event_round(e) == rd]
+    return min([started] + archived if started else archived, default=None)
+
+
+def score_at(match: Match, at: datetime) -> Dict[str, Any]:
+    """Match results as they stood at `at`, replayed from the nearest snapshot.
+
+    Returns the `compute_match_results` dict plus `snapshot` (the snapshot
+    used, or None) and `replayed` (events folded on top of it). Manually
+    entered RefereeScore rows are applied as they are now.
+    """
+    snapshot = _latest_snapshot(match.pk, at)
+    tail = _events_between(match.pk, after=snapshot, until=at)
+
+    state = _load_state(snapshot)
+    _fold(state, tail)
+    totals = [
+        RefereeRoundTotal(match_id=match.pk, referee_id=referee_id, round=rd, **row)
+        for (referee_id, rd), row in state.items()
+    ]
+    results = compute_match_results_from_totals(match, totals)
+    results['snapshot'] = snapshot
+    results['replayed'] = len(tail)
+    return results
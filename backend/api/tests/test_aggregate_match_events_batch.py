@@ -0,0 +1,52 @@
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from api.models import Athlete, Match, Category, RefereePointEvent, RefereeScore
+
+
+class AggregateMatchEventsBatchTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(5)]
+        cat = Category.objects.create(name='BatchCat')
+        self.matches = []
+        for i in range(3):
+            red = Athlete.objects.create(first_name=f'Red{i}', last_name='R')
+            blue = Athlete.objects.create(first_name=f'Blue{i}', last_name='B')
+            match = Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue)
+            match.referees.add(*self.refs)
+            self.matches.append(match)
+            # three referees vote blue, two vote red
+            for j, ref in enumerate(self.refs):
+                RefereePointEvent.objects.create(match=match, referee=ref, side='blue' if j < 3 else 'red', points=2, event_type='score')
+
+    def test_batches_write_scores_and_winners(self):
+        out = StringIO()
+        call_command('aggregate_match_events', batch_size=2, stdout=out)
+
+        self.assertIn('Processed 3 matches', out.getvalue())
+        self.assertIn('in 2 chunks', out.getvalue())
+        self.assertEqual(RefereeScore.objects.count(), 15)
+        self.assertFalse(RefereePointEvent.objects.filter(processed=False).exists())
+        for match in self.matches:
+            match.refresh_from_db()
+            self.assertEqual(match.winner, match.blue_corner)
+
+    def test_rerun_upserts_existing_scores(self):
+        call_command('aggregate_match_events', stdout=StringIO())
+        match = self.matches[0]
+        RefereePointEvent.objects.create(match=match, referee=self.refs[0], side='red', points=1, event_type='score')
+
+        call_command('aggregate_match_events', stdout=StringIO())
+
+        self.assertEqual(RefereeScore.objects.filter(match=match, referee=self.refs[0]).count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command('aggregate_match_events', dry_run=True, stdout=out)
+
+        self.assertIn('[dry-run] Processed 3 matches', out.getvalue())
+        self.assertEqual(RefereeScore.objects.count(), 0)
+        self.assertEqual(RefereePointEvent.objects.filter(processed=False).count(), 15)
+        for match in self.matches:
+            match.refresh_from_db()
+            self.assertIsNone(match.winner)
@@ -0,0 +1,55 @@
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from api.aggregation import AggregationStats, _claim_with_conditional_update, backlog_stats, claim_and_aggregate
+from api.models import Athlete, Match, Category, RefereePointEvent, RefereeScore
+
+
+class AggregationWorkerTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(3)]
+        cat = Category.objects.create(name='WorkerCat')
+        self.matches = []
+        for i in range(3):
+            red = Athlete.objects.create(first_name=f'Red{i}', last_name='R')
+            blue = Athlete.objects.create(first_name=f'Blue{i}', last_name='B')
+            match = Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue)
+            match.referees.add(*self.refs)
+            self.matches.append(match)
+            for ref in self.refs:
+                RefereePointEvent.objects.create(match=match, referee=ref, side='red', points=1, event_type='score')
+
+    def test_worker_drains_backlog(self):
+        out = StringIO()
+        call_command('aggregate_match_events', worker=True, batch_size=2, poll_interval=0, max_loops=3, stdout=out)
+
+        self.assertIn('Worker stopped: processed 3 matches (9 events', out.getvalue())
+        self.assertIn('backlog 0 events in 0 matches', out.getvalue())
+        self.assertEqual(RefereeScore.objects.count(), 9)
+        for match in self.matches:
+            match.refresh_from_db()
+            self.assertEqual(match.winner, match.red_corner)
+
+    def test_worker_threads_are_refused_on_sqlite(self):
+        with self.assertRaisesRegex(CommandError, 'SQLite'):
+            call_command('aggregate_match_events', worker=True, workers=2, max_loops=1, stdout=StringIO())
+        self.assertEqual(RefereeScore.objects.count(), 0)
+
+    def test_claimed_matches_are_not_processed_twice(self):
+        stats = AggregationStats()
+        self.assertEqual(claim_and_aggregate(10, stats), 3)
+        self.assertEqual(claim_and_aggregate(10, stats), 0)
+        self.assertEqual(stats.events, 9)
+        self.assertEqual(backlog_stats(), {'events': 0, 'matches': 0})
+
+    def test_conditional_claim_picks_up_new_events(self):
+        stats = AggregationStats()
+        self.assertEqual(_claim_with_conditional_update(10, stats), 3)
+
+        RefereePointEvent.objects.create(match=self.matches[0], referee=self.refs[0], side='blue', points=5, event_type='score')
+        self.assertEqual(_claim_with_conditional_update(10, stats), 1)
+
+        score = RefereeScore.objects.get(match=self.matches[0], referee=self.refs[0])
+        self.assertEqual((score.red_corner_score, score.blue_corner_score), (1, 5))
+        self.assertEqual(stats.events, 10)
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Athlete, Club, Grade
+
+User = get_user_model()
+
+
+class AthleteListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.club = Club.objects.create(name='Club')
+        self.grade = Grade.objects.create(name='Blue belt')
+        self.reviewer = User.objects.create_user(username='reviewer', email='reviewer@example.com', password='x')
+        for i in range(5):
+            self.add_athlete(i)
+
+    def add_athlete(self, i):
+        user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+        return Athlete.objects.create(
+            first_name=f'A{i}', last_name=f'L{i}', user=user, club=self.club, current_grade=self.grade,
+            approved_by=self.reviewer,
+        )
+
+    def get(self, **params):
+        resp = self.client.get('/api/athletes/', params)
+        self.assertEqual(resp.status_code, 200, resp.data)
+        return resp.data
+
+    def test_query_count_does_not_grow_with_the_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(all=1)
+        for i in range(5, 10):
+            self.add_athlete(i)
+        with CaptureQueriesContext(connection) as more_queries:
+            self.assertEqual(len(self.get(all=1)), 10)
+        self.assertEqual(len(queries), len(more_queries))
+        self.assertEqual(len(queries), 1)
+
+        # The row shape without `fields`/`expand` is unchanged.
+        self.assertEqual(data[0]['club'], {'id': self.club.pk, 'name': 'Club'})
+        self.assertEqual(data[0]['user']['username'], 'user0')
+        self.assertEqual(data[0]['current_grade'], self.grade.pk)
+        self.assertEqual(data[0]['current_grade_details']['name'], 'Blue belt')
+        self.assertTrue(data[0]['can_edit_profile'])
+        self.assertIn('reviewer@example.com', data[0]['approved_by'])
+
+    def test_sparse_fields_and_expand(self):
+        data = self.get(fields='id,first_name,last_name,club,current_grade', expand='club,current_grade')['results']
+        self.assertEqual(set(data[0]), {'id', 'first_name', 'last_name', 'club', 'current_grade'})
+        self.assertEqual(data[0]['club'], {'id': self.club.pk, 'name': 'Club'})
+        self.assertEqual(data[0]['current_grade'], {'id': self.grade.pk, 'name': 'Blue belt', 'image': None})
+
+        data = self.get(fields='id,club,can_add_results')['results']
+        self.assertEqual(data[0], {'id': data[0]['id'], 'club': self.club.pk, 'can_add_results': False})
+
+        self.assertEqual(self.client.get('/api/athletes/', {'fields': 'id,password'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/athletes/', {'expand': 'city'}).status_code, 400)
+
+    def test_list_is_paginated_by_default(self):
+        data = self.get()
+        self.assertEqual((data['count'], len(data['results'])), (5, 5))
+        for i in range(5, 55):
+            self.add_athlete(i)
+        self.assertEqual(len(self.get()['results']), 50)
+        self.assertEqual(len(self.get(all='true')), 55)
+
+    def test_page_numbers(self):
+        data = self.get(page_size=2, fields='id,last_name')
+        self.assertEqual(data['count'], 5)
+        self.assertEqual([a['last_name'] for a in data['results']], ['L0', 'L1'])
+        self.assertIsNotNone(data['next'])
+
+        data = self.get(page=3, page_size=2, fields='last_name')
+        self.assertEqual(data['results'], [{'last_name': 'L4'}])
+        self.assertIsNone(data['next'])
+
+        data = self.get(page=1)
+        self.assertEqual(len(data['results']), 5)
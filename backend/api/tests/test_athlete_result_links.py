@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Athlete, AthleteResultLink, Category, CategoryAthleteScore
+from api.result_links import sync_result_links
+
+User = get_user_model()
+
+
+class AthleteResultLinkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='me', password='x')
+        self.me = Athlete.objects.create(first_name='Me', last_name='A', user=self.user)
+        self.mate = Athlete.objects.create(first_name='Mate', last_name='B')
+        self.other = Athlete.objects.create(first_name='Other', last_name='C')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.categories = [Category.objects.create(name=f'Cat{i}') for i in range(8)]
+
+        self.solo = CategoryAthleteScore.objects.create(category=self.categories[0], athlete=self.me, submitted_by_athlete=True, placement_claimed='1st')
+        self.official = CategoryAthleteScore.objects.create(category=self.categories[1], athlete=self.me, score=9)
+        self.team = CategoryAthleteScore.objects.create(category=self.categories[2], athlete=self.mate, type='teams')
+        self.team.team_members.add(self.me, self.mate)
+        self.own_team = CategoryAthleteScore.objects.create(category=self.categories[3], athlete=self.me, type='teams', submitted_by_athlete=True)
+        self.own_team.team_members.add(self.me, self.other)
+        CategoryAthleteScore.objects.create(category=self.categories[4], athlete=self.other, score=5)
+
+    def ids(self, resp):
+        self.assertEqual(resp.status_code, 200)
+        rows = resp.data['results'] if isinstance(resp.data, dict) else resp.data
+        return [row['id'] for row in rows]
+
+    def reference(self, athlete, **extra):
+        """The OR/distinct query the endpoints used to run."""
+        return sorted(CategoryAthleteScore.objects.filter(
+            models.Q(athlete=athlete) | models.Q(team_members=athlete, type='teams'), **extra
+        ).distinct().values_list('pk', flat=True), reverse=True)
+
+    def test_endpoints_match_previous_queries(self):
+        self.assertEqual(self.ids(self.client.get('/api/category-athlete-score/all_results/')), self.reference(self.me))
+        self.assertEqual(
+            self.ids(self.client.get('/api/category-athlete-score/my_results/')),
+            [self.own_team.pk, self.team.pk, self.solo.pk],
+        )
+        self.assertEqual(
+            self.ids(self.client.get('/api/category-athlete-score/my_team_results/')),
+            [self.own_team.pk, self.team.pk],
+        )
+        # Someone else's profile only shows approved results.
+        resp = APIClient().get('/api/category-athlete-score/all_results/', {'athlete_id': self.other.pk})
+        self.assertEqual(self.ids(resp), self.reference(self.other, status='approved'))
+        self.assertNotIn(self.own_team.pk, self.ids(resp))
+
+    def test_links_follow_membership_and_status_changes(self):
+        self.own_team.status = 'approved'
+        self.own_team.save()
+        self.assertIn(self.own_team.pk, self.ids(APIClient().get('/api/category-athlete-score/all_results/', {'athlete_id': self.other.pk})))
+
+        self.team.team_members.remove(self.me)
+        self.assertNotIn(self.team.pk, self.ids(self.client.get('/api/category-athlete-score/all_results/')))
+        self.team.team_members.add(self.me)
+        self.assertIn(self.team.pk, self.ids(self.client.get('/api/category-athlete-score/all_results/')))
+        self.team.team_members.clear()
+        self.own_team.team_members.clear()
+        self.assertEqual(AthleteResultLink.objects.filter(athlete=self.me, is_member=True).count(), 0)
+        self.assertEqual(self.ids(self.client.get('/api/category-athlete-score/all_results/')), self.reference(self.me))
+
+        links = sorted(AthleteResultLink.objects.values_list('athlete_id', 'score_id', 'is_owner', 'is_member', 'status'))
+        AthleteResultLink.objects.all().delete()
+        sync_result_links(CategoryAthleteScore.objects.values_list('pk', flat=True))
+        self.assertEqual(sorted(AthleteResultLink.objects.values_list('athlete_id', 'score_id', 'is_owner', 'is_member', 'status')), links)
+
+    def test_keyset_pagination(self):
+        for category in self.categories[5:]:
+            CategoryAthleteScore.objects.create(category=category, athlete=self.me, score=1)
+        expected = self.reference(self.me)
+
+        seen, url, pages = [], '/api/category-athlete-score/all_results/?page_size=2', []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.get(url)
+            pages.append(len(queries))
+            seen += self.ids(resp)
+            url = resp.data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(set(pages)), 1)
@@ -0,0 +1,90 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+
+from api.models import Athlete
+from api.search import FTS_TABLE, normalize_name, search_athletes
+
+User = get_user_model()
+
+
+class AthleteSearchTests(TestCase):
+    def setUp(self):
+        self.stefan = Athlete.objects.create(first_name='Ștefan', last_name='Țurcanu')
+        self.stefania = Athlete.objects.create(first_name='Ştefania', last_name='Popescu-Ionescu', is_coach=True)
+        self.ana = Athlete.objects.create(first_name='Ana', last_name='Stefănescu')
+        self.other = Athlete.objects.create(first_name='Ion', last_name='Băsescu')
+
+    def names(self, query, queryset=None):
+        return [a.first_name for a in search_athletes(queryset or Athlete.objects.all(), query)]
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name('  Ștefan-Ţurcanu  Âîă '), 'stefan turcanu aia')
+        self.assertEqual(self.stefan.search_name, 'stefan turcanu')
+
+    def test_matches_word_prefixes_without_diacritics(self):
+        # Either comma-below or cedilla spelling, with or without diacritics.
+        self.assertEqual(self.names('stef'), ['Ștefan', 'Ştefania', 'Ana'])
+        self.assertEqual(self.names('ŞTEFANI'), ['Ştefania'])
+        self.assertEqual(self.names('turc'), ['Ștefan'])
+        self.assertEqual(self.names('stef ion'), ['Ştefania'])
+        self.assertEqual(self.names('efan'), [])
+        self.assertEqual(self.names('!!'), [])
+
+    def test_exact_name_ranks_first(self):
+        twin = Athlete.objects.create(first_name='Stefan', last_name='Aaron')
+        self.assertEqual(self.names('stefan turcanu'), ['Ștefan'])
+        self.assertEqual(self.names('stefan'), ['Stefan', 'Ștefan', 'Ştefania', 'Ana'])  # whole first name before prefixes
+        self.assertEqual(self.names('stefanescu'), ['Ana'])
+        twin.first_name = 'Maria'
+        twin.save(update_fields=['first_name'])
+        self.assertEqual(self.names('maria'), ['Maria'])
+
+    def test_index_follows_writes(self):
+        self.assertEqual(connection.vendor, 'sqlite')
+        self.stefan.last_name = 'Radu'
+        self.stefan.save()
+        self.assertEqual(self.names('turc'), [])
+        self.assertEqual(self.names('radu'), ['Ștefan'])
+        self.other.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    def test_rebuild_command_fixes_rows_written_around_save(self):
+        Athlete.objects.filter(pk=self.ana.pk).update(last_name='Dumitrescu', search_name='')
+        out = StringIO()
+        call_command('rebuild_athlete_search', stdout=out)
+        self.assertIn('(1 search names updated)', out.getvalue())
+        self.assertEqual(self.names('dumi'), ['Ana'])
+
+    def test_api_and_admin_autocomplete_share_the_search(self):
+        client = APIClient()
+        resp = client.get('/api/athletes/', {'q': 'stef'})
+        self.assertEqual([a['first_name'] for a in resp.data['results']], ['Ștefan', 'Ştefania', 'Ana'])
+        resp = client.get('/api/coaches/', {'q': 'ionescu'})
+        self.assertEqual([a['id'] for a in resp.data], [self.stefania.pk])
+
+        admin = site._registry[Athlete]
+        request = RequestFactory().get('/admin/autocomplete/')
+        request.user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        queryset, distinct = admin.get_search_results(request, Athlete.objects.all(), 'stef')
+        self.assertEqual(list(queryset), [self.stefan, self.stefania, self.ana])
+        self.assertFalse(distinct)
+
+        request = RequestFactory().get('/admin/api/athlete/')
+        queryset, _ = admin.get_search_results(request, Athlete.objects.all(), 'basescu')
+        self.assertEqual(list(queryset), [self.other])
+
+    def test_like_fallback_without_the_index(self):
+        from api import search
+        with mock.patch.dict(search._index_available, {connection.alias: False}):
+            self.assertEqual(self.names('stef'), ['Ștefan', 'Ştefania', 'Ana'])
+            self.assertEqual(self.names('stef ion'), ['Ştefania'])
+            self.assertEqual(self.names('efan'), [])
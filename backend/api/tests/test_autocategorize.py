@@ -0,0 +1,142 @@
+from datetime import date, datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.autocategorize import autocategorize, parse_rules
+from api.models import Athlete, Category, CategoryAthlete, Grade, TrainingSeminar, TrainingSeminarParticipation
+from landing.models import Event
+
+User = get_user_model()
+RULES = {
+    'type': 'fight',
+    'age_brackets': [[6, 11], [12, 17], [18, None]],
+    'grade_ranges': [{'label': 'Beginners', 'max': 1}, {'label': 'Advanced', 'min': 2}],
+}
+
+
+class AutoCategorizeTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(title='Cup', slug='cup', start_date=timezone.make_aware(datetime(2026, 6, 1, 10)))
+        self.seminar = TrainingSeminar.objects.create(name='Cup', place='Cluj')
+        self.yellow = Grade.objects.create(name='Yellow', rank_order=1)
+        self.blue = Grade.objects.create(name='Blue', rank_order=2)
+        self.red = Grade.objects.create(name='Red', rank_order=3)
+
+    def register(self, name, born, grade, gender='male', status='approved'):
+        athlete = Athlete.objects.create(
+            first_name=name, last_name='L', date_of_birth=born, current_grade=grade, gender=gender, status='approved',
+        )
+        TrainingSeminarParticipation.objects.create(
+            athlete=athlete, seminar=self.seminar, event=self.event, submitted_by_athlete=status == 'pending',
+        )
+        return athlete
+
+    def test_preview_then_commit(self):
+        kid = self.register('Kid', date(2016, 1, 1), self.yellow)
+        junior = self.register('Junior', date(2010, 6, 1), self.blue)           # 16 on the event day
+        senior = self.register('Senior', date(2008, 6, 1), self.red)            # 18 on the event day
+        girl = self.register('Girl', date(2010, 6, 2), self.blue, gender='female')  # 15
+        self.register('Pending', date(2010, 1, 1), self.blue, status='pending')
+        existing = Category.objects.create(name='Fight Male 12-17 Advanced', event=self.event, type='fight', gender='male')
+        CategoryAthlete.objects.create(category=existing, athlete=junior)
+
+        plan = autocategorize(self.event, parse_rules(RULES))
+        self.assertFalse(plan['committed'])
+        self.assertEqual(plan['event_date'], date(2026, 6, 1))
+        by_name = {c['name']: c for c in plan['categories']}
+        self.assertEqual(set(by_name), {
+            'Fight Male 6-11 Beginners', 'Fight Male 12-17 Advanced', 'Fight Male 18+ Advanced', 'Fight Female 12-17 Advanced',
+        })
+        self.assertEqual(by_name['Fight Male 6-11 Beginners']['add'], [kid.pk])
+        self.assertEqual((by_name['Fight Male 12-17 Advanced']['action'], by_name['Fight Male 12-17 Advanced']['already_enrolled']), ('existing', [junior.pk]))
+        self.assertEqual(by_name['Fight Female 12-17 Advanced']['add'], [girl.pk])
+        self.assertEqual(
+            {k: by_name['Fight Male 18+ Advanced'][k] for k in ('min_age', 'max_age', 'min_grade_id', 'max_grade_id')},
+            {'min_age': 18, 'max_age': None, 'min_grade_id': self.blue.pk, 'max_grade_id': self.red.pk},
+        )
+        self.assertEqual(plan['summary'], {
+            'athletes': 4, 'categories_to_create': 3, 'enrollments_to_add': 3, 'already_enrolled': 1, 'unplaced': 0,
+        })
+        self.assertEqual(Category.objects.count(), 1)  # nothing written
+
+        autocategorize(self.event, parse_rules(RULES), commit=True)
+        senior_category = Category.objects.get(event=self.event, name='Fight Male 18+ Advanced')
+        self.assertEqual((senior_category.min_age, senior_category.min_grade, senior_category.gender), (18, self.blue, 'male'))
+        self.assertTrue(CategoryAthlete.objects.filter(category=senior_category, athlete=senior).exists())
+        self.assertEqual(CategoryAthlete.objects.filter(category__event=self.event).count(), 4)
+
+        again = autocategorize(self.event, parse_rules(RULES))
+        self.assertEqual(again['summary']['categories_to_create'], 0)
+        self.assertEqual(again['summary']['enrollments_to_add'], 0)
+        self.assertEqual(again['summary']['already_enrolled'], 4)
+
+    def test_unplaced_reasons(self):
+        rules = parse_rules({**RULES, 'genders': ['male'], 'grade_ranges': [{'label': 'Advanced', 'min': 2, 'max': 2}]})
+        rows = [
+            self.register('Girl', date(2010, 1, 1), self.blue, gender='female'),
+            self.register('Unknown', None, self.blue),
+            self.register('Toddler', date(2023, 1, 1), self.blue),
+            self.register('White', date(2010, 1, 1), None),
+            self.register('Yellow', date(2010, 1, 1), self.yellow),
+        ]
+        Athlete.objects.filter(pk=rows[0].pk).update(status='pending')
+        reasons = {row['athlete']: row['reason'] for row in autocategorize(self.event, rules)['unplaced']}
+        self.assertEqual([reasons[a.pk] for a in rows], ['not_approved', 'no_birth_date', 'age_out_of_range', 'no_grade', 'grade_out_of_range'])
+
+    def test_query_count_does_not_grow_with_athletes(self):
+        def run(count, commit):
+            for i in range(count):
+                self.register(f'A{i}', date(2000 + i % 20, 1, 1), (self.yellow, self.blue)[i % 2], gender=('male', 'female')[i % 3 % 2])
+            with CaptureQueriesContext(connection) as queries:
+                plan = autocategorize(self.event, parse_rules(RULES), commit=commit)
+            return len(queries), plan
+
+        small, _ = run(10, commit=False)
+        large, _ = run(60, commit=False)
+        self.assertEqual(small, large)
+        committed, plan = run(0, commit=True)
+        self.assertEqual(plan['summary']['enrollments_to_add'], 70)
+        self.assertLessEqual(committed, large + 6)  # savepoint plus one INSERT per model
+
+    def test_rules_validation(self):
+        for rules, message in [
+            ({'age_brackets': []}, 'age_brackets'),
+            ({'age_brackets': [[12, 6]]}, 'min above max'),
+            ({'age_brackets': [[6, 12]], 'type': 'teams'}, 'type'),
+            ({'age_brackets': [[6, 12]], 'genders': ['mixt', 'male']}, 'mixt'),
+            ({'age_brackets': [[6, 12]], 'grade_ranges': [{'min': 1}]}, 'label'),
+            ({'age_brackets': [[6, 12]], 'name': '{club} {age}'}, 'placeholders'),
+            ({'age_brackets': [[6, 12]], 'name': '{0} {age}'}, 'placeholders'),
+            ({'age_brackets': [[6, 12]], 'name': '{age'}, 'placeholders'),
+            ({'age_brackets': [[6, 12], [13, 15]], 'name': '{gender}'}, 'same name'),
+        ]:
+            with self.assertRaisesRegex(ValueError, message):
+                parse_rules(rules)
+
+    def test_endpoint_and_command(self):
+        kid = self.register('Kid', date(2016, 1, 1), self.yellow)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='staff', email='staff@example.com', password='x', is_staff=True))
+        body = {'event': self.event.pk, 'rules': {'genders': ['mixt'], 'age_brackets': [[6, 11]]}}
+
+        response = client.post('/api/categories/auto-categorize/', body, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(c['name'], c['add']) for c in response.data['categories']], [('Solo Mixt 6-11', [kid.pk])])
+        self.assertFalse(Category.objects.exists())
+        self.assertEqual(client.post('/api/categories/auto-categorize/', {**body, 'rules': {}}, format='json').status_code, 400)
+        self.assertEqual(client.post('/api/categories/auto-categorize/', {**body, 'event': 0}, format='json').status_code, 400)
+        response = client.post('/api/categories/auto-categorize/', {**body, 'rules': {**body['rules'], 'name': '{club} {age}'}}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        out = StringIO()
+        call_command('autocategorize_event', self.event.pk, '--rules', '{"genders": ["mixt"], "age_brackets": [[6, 11]]}', '--commit', stdout=out)
+        self.assertIn('Created 1 categories and 1 enrollments for 1 athletes', out.getvalue())
+        self.assertEqual(Category.objects.get().gender, 'mixt')
+        self.assertEqual(client.post('/api/categories/auto-categorize/', body, format='json').data['summary']['already_enrolled'], 1)
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from api.models import Match, RefereePointEvent
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_small_suite_writes_report_and_rolls_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.json')
+            out = StringIO()
+            call_command('benchmark_suite', categories=1, matches=2, events=1, repeat=3, output=path, stdout=out)
+            with open(path) as fh:
+                report = json.load(fh)
+
+        self.assertEqual(report['matches'], 2)
+        self.assertEqual(report['events'], 2 * 5 * 3)
+        self.assertEqual(
+            set(report['results']),
+            {'compute_match_results', 'aggregate_match_events', 'match_serializer_list', 'admin_recompute_view'},
+        )
+        for result in report['results'].values():
+            self.assertGreater(result['queries'], 0)
+            self.assertEqual(len(result['wall_ms_runs']), 3)
+            self.assertEqual(result['wall_ms'], sorted(result['wall_ms_runs'])[1])
+        self.assertFalse(Match.objects.exists())
+        self.assertFalse(RefereePointEvent.objects.exists())
+
+    def test_baseline_checks_time_and_queries_separately(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.json')
+            call_command('benchmark_suite', categories=1, matches=1, events=1, repeat=1, output=path, stdout=StringIO())
+            with open(path) as fh:
+                report = json.load(fh)
+
+            def compare(edit, check):
+                baseline = json.loads(json.dumps(report))
+                for result in baseline['results'].values():
+                    edit(result)
+                baseline_path = os.path.join(tmp, 'baseline.json')
+                with open(baseline_path, 'w') as fh:
+                    json.dump(baseline, fh)
+                call_command('benchmark_suite', categories=1, matches=1, events=1, repeat=1, baseline=baseline_path, check=check, stdout=StringIO())
+
+            def fewer_queries(result):
+                result['queries'] -= 1
+                result['wall_ms'] = 1e9
+
+            def faster(result):
+                result['wall_ms'] = 1e-6
+
+            compare(fewer_queries, 'time')
+            with self.assertRaisesRegex(CommandError, 'compute_match_results.queries'):
+                compare(fewer_queries, 'all')
+            compare(faster, 'queries')
+            with self.assertRaisesRegex(CommandError, 'wall_ms'):
+                compare(faster, 'time')
@@ -0,0 +1,166 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.test import APIClient
+
+from api import enrollment
+from api.enrollment import enroll
+from api.models import Athlete, Category, CategoryAthlete, CategoryTeam, Competition, Team, TeamMember
+from api.serializers import MatchSerializer
+
+User = get_user_model()
+
+
+class BulkEnrollmentTests(TestCase):
+    def setUp(self):
+        self.competition = Competition.objects.create(name='Cup')
+        self.male_fight = Category.objects.create(name='Fight M', type='fight', gender='male', competition=self.competition)
+        self.mixt_solo = Category.objects.create(name='Solo', type='solo', competition=self.competition)
+        self.female_teams = Category.objects.create(name='Teams F', type='teams', gender='female', competition=self.competition)
+        self.men = [Athlete.objects.create(first_name=f'M{i}', last_name='L', gender='male', status='approved') for i in range(3)]
+        self.woman = Athlete.objects.create(first_name='W', last_name='L', gender='female', status='approved')
+        self.pending = Athlete.objects.create(first_name='P', last_name='L', gender='male', status='pending')
+
+    def make_team(self, athletes):
+        team = Team.objects.create(name='')
+        for athlete in athletes:
+            TeamMember.objects.create(team=team, athlete=athlete)
+        return team
+
+    def test_statuses_and_reasons(self):
+        CategoryAthlete.objects.create(category=self.male_fight, athlete=self.men[0])
+        women = self.make_team([self.woman])
+        mixed = self.make_team([self.woman, self.men[0]])
+        results = enroll([
+            {'category': self.male_fight.pk, 'athlete': self.men[0].pk},               # already enrolled
+            {'category': self.male_fight.pk, 'athlete': self.men[1].pk, 'weight': '59.5'},
+            {'category': self.male_fight.pk, 'athlete': self.men[1].pk},               # repeated
+            {'category': self.male_fight.pk, 'athlete': self.woman.pk},                # gender
+            {'category': self.male_fight.pk, 'athlete': self.pending.pk},              # not approved
+            {'category': self.mixt_solo.pk, 'athlete': self.woman.pk},
+            {'category': self.female_teams.pk, 'team': women.pk},
+            {'category': self.female_teams.pk, 'team': mixed.pk},                      # member gender
+            {'category': self.female_teams.pk, 'athlete': self.woman.pk},              # wrong kind
+            {'category': 999999, 'athlete': self.men[2].pk},
+            {'category': self.male_fight.pk, 'athlete': self.men[2].pk, 'weight': 'heavy'},
+            {'category': self.male_fight.pk},
+            'nope',
+        ])
+        self.assertEqual([r['status'] for r in results], [
+            'duplicate', 'created', 'duplicate', 'invalid', 'invalid', 'created', 'created',
+            'invalid', 'invalid', 'invalid', 'invalid', 'invalid', 'invalid',
+        ])
+        self.assertEqual(results[2]['duplicate_of'], 1)
+        self.assertIn('does not match category gender', results[3]['errors']['athlete'][0])
+        self.assertIn('approved', results[4]['errors']['athlete'][0])
+        self.assertIn('(male)', results[7]['errors']['team'][0])
+        self.assertIn('takes teams', results[8]['errors']['athlete'][0])
+        self.assertIn('category', results[9]['errors'])
+        self.assertIn('weight', results[10]['errors'])
+
+        self.assertEqual(str(CategoryAthlete.objects.get(category=self.male_fight, athlete=self.men[1]).weight), '59.50')
+        self.assertEqual(CategoryAthlete.objects.get(pk=results[5]['id']).athlete, self.woman)
+        self.assertTrue(CategoryTeam.objects.filter(category=self.female_teams, team=women).exists())
+
+    def test_team_members_must_meet_category_limits(self):
+        adult = date(2000, 1, 1)
+        teams_18 = Category.objects.create(name='Teams 18+', type='teams', min_age=18, competition=self.competition)
+        Athlete.objects.filter(pk__in=[a.pk for a in self.men]).update(date_of_birth=adult)
+        Athlete.objects.filter(pk=self.woman.pk).update(date_of_birth=date.today().replace(year=date.today().year - 10))
+        adults = self.make_team(self.men[:2])
+        with_child = self.make_team([self.men[2], self.woman])
+        results = enroll([{'category': teams_18.pk, 'team': adults.pk}, {'category': teams_18.pk, 'team': with_child.pk}])
+        self.assertEqual([r['status'] for r in results], ['created', 'invalid'])
+        self.assertEqual(results[1]['errors']['team'], ['W L: Below the minimum age on the event date.'])
+        self.assertFalse(CategoryTeam.objects.filter(team=with_child).exists())
+
+    def test_concurrent_enrollment_is_reported_as_duplicate(self):
+        women = self.make_team([self.woman])
+        real_has_limits = enrollment.has_limits
+        concurrent = []
+
+        def has_limits(category):
+            # Another request enrolls the same athlete after our duplicate check.
+            if not concurrent:
+                concurrent.append(CategoryAthlete.objects.create(category=self.male_fight, athlete=self.men[1]))
+            return real_has_limits(category)
+
+        with mock.patch.object(enrollment, 'has_limits', side_effect=has_limits):
+            results = enroll([
+                {'category': self.male_fight.pk, 'athlete': self.men[1].pk},
+                {'category': self.male_fight.pk, 'athlete': self.men[2].pk},
+                {'category': self.female_teams.pk, 'team': women.pk},
+            ])
+
+        self.assertEqual([r['status'] for r in results], ['duplicate', 'created', 'created'])
+        self.assertEqual(CategoryAthlete.objects.get(category=self.male_fight, athlete=self.men[1]).pk, concurrent[0].pk)
+        self.assertEqual(CategoryAthlete.objects.get(pk=results[1]['id']).athlete, self.men[2])
+        self.assertEqual(CategoryTeam.objects.get(pk=results[2]['id']).team, women)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        athletes = [Athlete.objects.create(first_name=f'X{i}', last_name='L', gender='male', status='approved') for i in range(30)]
+        teams = [self.make_team([self.woman]) for _ in range(5)]
+        items = [{'category': c.pk, 'athlete': a.pk} for c in (self.male_fight, self.mixt_solo) for a in athletes]
+        items += [{'category': self.female_teams.pk, 'team': t.pk} for t in teams]
+        with CaptureQueriesContext(connection) as queries:
+            results = enroll(items)
+        self.assertEqual({r['status'] for r in results}, {'created'})
+        # categories, athletes, teams, team members, enrolled athletes/teams, two inserts (+ savepoint)
+        self.assertLessEqual(len(queries), 10)
+
+    def test_dry_run_writes_nothing(self):
+        results = enroll([{'category': self.male_fight.pk, 'athlete': self.men[1].pk}], dry_run=True)
+        self.assertEqual(results[0]['status'], 'valid')
+        self.assertFalse(CategoryAthlete.objects.exists())
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True))
+        resp = client.post('/api/category-athletes/bulk/', {
+            'categories': [self.male_fight.pk, self.mixt_solo.pk],
+            'athletes': [self.men[0].pk, self.woman.pk],
+        }, format='json')
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual((resp.data['created'], resp.data['invalid']), (3, 1))
+        self.assertEqual(CategoryAthlete.objects.count(), 3)
+
+        self.assertEqual(client.post('/api/category-athletes/bulk/', {'items': 'x'}, format='json').status_code, 400)
+
+        viewer = APIClient()
+        viewer.force_authenticate(User.objects.create_user(username='viewer', email='viewer@example.com', password='x'))
+        self.assertEqual(viewer.post('/api/category-athletes/bulk/', [], format='json').status_code, 403)
+
+
+class EnrollmentCheckTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Fight', type='fight', competition=Competition.objects.create(name='Cup'))
+        self.athletes = [Athlete.objects.create(first_name=f'A{i}', last_name='L') for i in range(3)]
+        for athlete in self.athletes[:2]:
+            CategoryAthlete.objects.create(category=self.category, athlete=athlete)
+
+    def test_category_clean_checks_podium_in_one_query(self):
+        a = self.athletes
+        self.category.first_place, self.category.second_place = a[0], a[1]
+        with CaptureQueriesContext(connection) as queries:
+            self.category.clean()
+        self.assertEqual(len(queries), 1)
+
+        self.category.third_place = a[2]
+        with self.assertRaisesMessage(ValidationError, "must be enrolled in the category to be awarded"):
+            self.category.clean()
+
+    def test_match_serializer_checks_both_corners_in_one_query(self):
+        a = self.athletes
+        serializer = MatchSerializer()
+        with CaptureQueriesContext(connection) as queries:
+            serializer.validate({'category': self.category, 'red_corner': a[0], 'blue_corner': a[1]})
+        self.assertEqual(len(queries), 1)
+
+        with self.assertRaisesMessage(DRFValidationError, 'Blue corner athlete'):
+            serializer.validate({'category': self.category, 'red_corner': a[0], 'blue_corner': a[2]})
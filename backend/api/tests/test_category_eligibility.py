@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.eligibility import evaluate
+from api.enrollment import enroll
+from api.models import Athlete, Category, CategoryAthlete, Competition, Grade, Visa
+
+User = get_user_model()
+EVENT = date(2026, 6, 1)
+
+
+class CategoryEligibilityTests(TestCase):
+    def setUp(self):
+        self.yellow = Grade.objects.create(name='Yellow', rank_order=1)
+        self.blue = Grade.objects.create(name='Blue', rank_order=2)
+        self.red = Grade.objects.create(name='Red', rank_order=3)
+        self.category = Category.objects.create(
+            name='Juniors', type='fight', gender='male', competition=Competition.objects.create(name='Cup', start_date=EVENT),
+            min_age=14, max_age=17, min_grade=self.blue, requires_medical_visa=True,
+        )
+
+    def athlete(self, name, born, grade=None, medical=True, **kwargs):
+        athlete = Athlete.objects.create(
+            first_name=name, last_name='L', date_of_birth=born, current_grade=grade,
+            gender=kwargs.pop('gender', 'male'), status=kwargs.pop('status', 'approved'), **kwargs,
+        )
+        if medical:
+            Visa.objects.create(athlete=athlete, visa_type='medical', issued_date=EVENT - timedelta(days=30))
+        return athlete
+
+    def test_reasons_for_each_rule(self):
+        ok = self.athlete('Ok', date(2010, 6, 1), self.blue)               # turns 16 on the event day
+        young = self.athlete('Young', date(2012, 6, 2), self.blue)         # 13 until the day after
+        old = self.athlete('Old', date(2008, 6, 1), self.red)              # 18 on the event day
+        unknown = self.athlete('Unknown', None, None)
+        visa = self.athlete('NoVisa', date(2010, 1, 1), self.blue, medical=False)
+        expired = self.athlete('Expired', date(2010, 1, 1), self.blue, medical=False)
+        Visa.objects.create(athlete=expired, visa_type='medical', issued_date=EVENT - timedelta(days=200))
+        girl = self.athlete('Girl', date(2010, 1, 1), self.yellow, gender='female', status='pending')
+        enrolled = self.athlete('Enrolled', date(2010, 1, 1), self.blue)
+        CategoryAthlete.objects.create(category=self.category, athlete=enrolled)
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = {row['name']: row for row in evaluate(self.category)}
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(rows['Ok L']['reasons'], [])
+        self.assertEqual((rows['Ok L']['age'], rows['Ok L']['grade']), (16, 'Blue'))
+        self.assertEqual(rows['Young L']['reasons'], ['too_young'])
+        self.assertEqual(rows['Old L']['reasons'], ['too_old'])
+        self.assertEqual(rows['Unknown L']['reasons'], ['no_birth_date', 'no_grade'])
+        self.assertEqual(rows['NoVisa L']['reasons'], ['medical_visa'])
+        self.assertEqual(rows['Expired L']['reasons'], ['medical_visa'])
+        self.assertEqual(rows['Girl L']['reasons'], ['not_approved', 'gender', 'grade_too_low'])
+        self.assertEqual(rows['Enrolled L']['reasons'], ['already_enrolled'])
+
+        self.assertEqual([row['id'] for row in evaluate(self.category, only_eligible=True)], [ok.pk])
+        self.assertEqual([row['id'] for row in evaluate(self.category, [young.pk, old.pk])], [old.pk, young.pk])
+
+    def test_bulk_enrollment_applies_the_limits(self):
+        ok = self.athlete('Ok', date(2010, 1, 1), self.blue)
+        young = self.athlete('Young', date(2015, 1, 1), self.blue)
+        results = enroll([
+            {'category': self.category.pk, 'athlete': ok.pk},
+            {'category': self.category.pk, 'athlete': young.pk},
+        ])
+        self.assertEqual([r['status'] for r in results], ['created', 'invalid'])
+        self.assertIn('minimum age', results[1]['errors']['athlete'][0])
+
+    def test_endpoint(self):
+        ok = self.athlete('Ok', date(2010, 1, 1), self.blue)
+        young = self.athlete('Young', date(2015, 1, 1), self.blue)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='desk', email='desk@example.com', password='x'))
+        url = f'/api/categories/{self.category.pk}/eligible_athletes/'
+
+        data = client.get(url).data
+        self.assertEqual(data['category']['event_date'], EVENT)
+        self.assertEqual([row['id'] for row in data['eligible_athletes']], [ok.pk])
+        self.assertEqual(data['count'], 1)
+        self.assertNotIn('ineligible_athletes', data)
+
+        data = client.get(url, {'athletes': f'{young.pk}', 'include_ineligible': '1'}).data
+        self.assertEqual(data['eligible_athletes'], [])
+        self.assertEqual([(row['id'], row['reasons']) for row in data['ineligible_athletes']], [(young.pk, ['too_young'])])
+        self.assertIn('too_young', data['reasons'])
+
+        self.assertEqual(client.get(url, {'athletes': 'x'}).status_code, 400)
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Athlete, Category, CategoryAthleteScore, CategoryTeamScore, Club, Team
+from api.rankings import compute_ranking
+
+User = get_user_model()
+
+
+class ComputeRankingTests(TestCase):
+    def test_drop_rules_and_tiebreakers(self):
+        rows = [
+            (1, 9), (1, 6), (1, 8),   # total 23, drop both ends -> 8
+            (2, 7), (2, 8), (2, 8),   # total 23, drop both ends -> 8
+            (3, 10), (3, 7), (3, 5),  # total 22, drop both ends -> 7
+            (4, 5),                   # too few scores to drop anything
+        ]
+        ranked = compute_ranking(rows)
+        # 1 and 2 tie on total and average; 1 has the higher best score.
+        self.assertEqual([(e['id'], e['rank'], e['total']) for e in ranked], [(1, 1, 23), (2, 2, 23), (3, 3, 22), (4, 4, 5)])
+
+        ranked = compute_ranking(rows, drop_highest=1, drop_lowest=1, tiebreakers=['count'])
+        self.assertEqual([(e['id'], e['rank'], e['counted']) for e in ranked], [(1, 1, [8]), (2, 1, [8]), (3, 3, [7]), (4, 4, [5])])
+
+        ranked = compute_ranking(rows, rank_by='average', tiebreakers=['lowest'])
+        self.assertEqual([e['id'] for e in ranked], [2, 1, 3, 4])
+
+
+class CategoryRankingEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='R', is_referee=True) for i in range(3)]
+        club = Club.objects.create(name='Club')
+        self.solo = Category.objects.create(name='Solo', type='solo')
+        self.athletes = [Athlete.objects.create(first_name=f'A{i}', last_name='L', club=club) for i in range(3)]
+        for athlete, scores in zip(self.athletes, [(8, 9, 7), (9, 9, 9), (6, 10, 6)]):
+            for ref, score in zip(self.refs, scores):
+                CategoryAthleteScore.objects.create(category=self.solo, athlete=athlete, referee=ref, score=score)
+        # Athlete self-submissions are not referee scores.
+        CategoryAthleteScore.objects.create(category=self.solo, athlete=self.athletes[2], submitted_by_athlete=True, placement_claimed='1st')
+
+    def get(self, category, **params):
+        resp = self.client.get(f'/api/categories/{category.pk}/ranking/', params)
+        self.assertEqual(resp.status_code, 200, resp.data)
+        return resp.data
+
+    def test_solo_ranking_is_cached_until_next_write(self):
+        data = self.get(self.solo)
+        self.assertFalse(data['cached'])
+        self.assertEqual([(r['name'], r['rank'], r['total']) for r in data['results']], [('A1 L', 1, 27), ('A0 L', 2, 24), ('A2 L', 3, 22)])
+        self.assertEqual(data['results'][0]['club_name'], 'Club')
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(self.solo)
+        self.assertTrue(data['cached'])
+        self.assertEqual(len(queries), 2)  # category with its version + names
+
+        score = CategoryAthleteScore.objects.get(athlete=self.athletes[2], referee=self.refs[0])
+        score.score = 10
+        score.save()
+        data = self.get(self.solo)
+        self.assertFalse(data['cached'])
+        self.assertEqual([r['name'] for r in data['results']], ['A1 L', 'A2 L', 'A0 L'])
+
+        data = self.get(self.solo, drop_highest=1, drop_lowest=1)
+        self.assertEqual([(r['name'], r['counted']) for r in data['results']], [('A2 L', [10]), ('A1 L', [9]), ('A0 L', [8])])
+
+    def test_teams_ranking_and_validation(self):
+        teams_cat = Category.objects.create(name='Teams', type='teams')
+        teams = [Team.objects.create(name=f'T{i}') for i in range(2)]
+        for team, scores in zip(teams, [(7, 7), (8, 6)]):
+            for ref, score in zip(self.refs, scores):
+                CategoryTeamScore.objects.create(category=teams_cat, team=team, referee=ref, score=score)
+        data = self.get(teams_cat, tiebreakers='lowest')
+        self.assertEqual([(r['team'], r['rank']) for r in data['results']], [(teams[0].pk, 1), (teams[1].pk, 2)])
+
+        self.get(teams_cat)
+        CategoryTeamScore.objects.filter(team=teams[1]).first().delete()
+        self.assertFalse(self.get(teams_cat)['cached'])
+
+        url = f'/api/categories/{self.solo.pk}/ranking/'
+        self.assertEqual(self.client.get(url, {'rank_by': 'median'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'drop_lowest': '-1'}).status_code, 400)
+        fight = Category.objects.create(name='Fight', type='fight')
+        self.assertEqual(self.client.get(f'/api/categories/{fight.pk}/ranking/').status_code, 400)
@@ -0,0 +1,120 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import (
+    Athlete, Category, CategoryAthlete, CategoryTeam, CategoryTeamScore, Club, Competition, Group, Team, TeamMember,
+)
+from api.read_models import category_read_model
+from api.serializers import CategorySerializer
+from landing.models import Event
+
+User = get_user_model()
+
+
+def _plain(data):
+    return json.loads(json.dumps(data, default=str))
+
+
+class CategoryReadModelTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+        self.competition = Competition.objects.create(name='Cup')
+        self.event = Event.objects.create(title='Open', slug='open', start_date=timezone.now())
+        self.group = Group.objects.create(name='Seniors', competition=self.competition)
+        self.clubs = [Club.objects.create(name=f'Club{i}') for i in range(2)]
+        self.referee = Athlete.objects.create(first_name='Ref', last_name='R', is_referee=True)
+        self.counter = 0
+        self.add_categories(2)
+
+    def athlete(self):
+        self.counter += 1
+        return Athlete.objects.create(
+            first_name=f'A{self.counter}', last_name='L', gender='male', club=self.clubs[self.counter % 2] if self.counter % 3 else None,
+        )
+
+    def add_categories(self, n):
+        for _ in range(n):
+            self.counter += 1
+            solo = Category.objects.create(
+                name=f'Solo{self.counter}', event=self.event, type='solo', gender='male', group=self.group,
+            )
+            enrolled = [self.athlete() for _ in range(4)]
+            for i, athlete in enumerate(enrolled):
+                CategoryAthlete.objects.create(category=solo, athlete=athlete, weight='70.5' if i % 2 else None)
+            solo.first_place, solo.second_place, solo.third_place = enrolled[:3]
+            solo.save()
+
+            teams_cat = Category.objects.create(name=f'Teams{self.counter}', competition=self.competition, type='teams')
+            teams = []
+            for t in range(3):
+                team = Team.objects.create(name='')
+                for _ in range(2):
+                    TeamMember.objects.create(team=team, athlete=self.athlete())
+                CategoryTeam.objects.create(category=teams_cat, team=team)
+                if t < 2:
+                    CategoryTeamScore.objects.create(category=teams_cat, team=team, referee=self.referee, score=7 + t)
+                teams.append(team)
+            CategoryTeamScore.objects.create(
+                category=teams_cat, team=teams[0],
+                referee=Athlete.objects.create(first_name='Ref2', last_name='R', is_referee=True), score=8,
+            )
+            # A team with no members still serializes with club 'N/A'.
+            empty = Team.objects.create(name='Empty')
+            CategoryTeam.objects.create(category=teams_cat, team=empty)
+            teams_cat.first_place_team, teams_cat.second_place_team = teams[1], empty
+            teams_cat.save()
+
+    def test_matches_category_serializer(self):
+        categories = Category.objects.order_by('pk')
+        expected = _plain(CategorySerializer(categories, many=True).data)
+        self.assertEqual(_plain(category_read_model(categories)), expected)
+
+        resp = self.client.get(f'/api/categories/{categories[1].pk}/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(_plain(resp.data), expected[1])
+
+    def test_every_category_type_matches_field_by_field(self):
+        podium = [self.athlete() for _ in range(3)]
+        stray_team = Team.objects.create(name='Stray')
+        TeamMember.objects.create(team=stray_team, athlete=self.athlete())
+        for category_type, _ in Category.CATEGORY_TYPE_CHOICES:
+            full = Category.objects.create(name=f'Full {category_type}', event=self.event, type=category_type, group=self.group)
+            CategoryAthlete.objects.create(category=full, athlete=podium[0], weight='60')
+            team = Team.objects.create(name=f'Team {category_type}')
+            TeamMember.objects.create(team=team, athlete=podium[1])
+            CategoryTeam.objects.create(category=full, team=team)
+            CategoryTeamScore.objects.create(category=full, team=team, referee=self.referee, score=6)
+            full.first_place, full.third_place = podium[0], podium[2]
+            full.first_place_team, full.third_place_team = team, stray_team
+            full.save()
+            Category.objects.create(name=f'Bare {category_type}', competition=self.competition, type=category_type, gender='female')
+
+        categories = Category.objects.order_by('pk')
+        expected = _plain(CategorySerializer(categories, many=True).data)
+        rows = _plain(category_read_model(categories))
+        self.assertEqual({c.type for c in categories}, {t for t, _ in Category.CATEGORY_TYPE_CHOICES})
+        self.assertEqual(len(rows), len(expected))
+        for category, row, serialized in zip(categories, rows, expected):
+            with self.subTest(category=category.name, type=category.type):
+                self.assertEqual(set(row), set(serialized))
+                for field in CategorySerializer.Meta.fields:
+                    self.assertEqual(row.get(field), serialized.get(field), field)
+
+    def test_list_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            resp = self.client.get('/api/categories/')
+        self.assertEqual(len(resp.data), 4)
+
+        self.add_categories(3)
+        with CaptureQueriesContext(connection) as large:
+            resp = self.client.get('/api/categories/')
+        self.assertEqual(len(resp.data), 10)
+        self.assertEqual(len(large), len(small))
+        self.assertLessEqual(len(large), 10)
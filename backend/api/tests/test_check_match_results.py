@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.aggregation import aggregate_pending_events
+from api.consistency import check_matches
+from api.models import Athlete, Match, Category, RefereePointEvent, RefereeRoundTotal, RefereeScore
+
+
+class CheckMatchResultsTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(3)]
+        cat = Category.objects.create(name='ConsistencyCat')
+        self.matches = []
+        for i in range(4):
+            red = Athlete.objects.create(first_name=f'Red{i}', last_name='R')
+            blue = Athlete.objects.create(first_name=f'Blue{i}', last_name='B')
+            match = Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue)
+            for ref in self.refs:
+                RefereePointEvent.objects.create(match=match, referee=ref, side='red', points=3 + i % 2, event_type='score')
+                RefereePointEvent.objects.create(match=match, referee=ref, side='blue', points=2, event_type='score')
+            self.matches.append(match)
+        # A match whose winner was picked by hand and that has no events.
+        self.manual = Match.objects.create(
+            category=cat, match_type='qualifications', red_corner=self.refs[1], blue_corner=self.refs[2], winner=self.refs[1],
+        )
+        aggregate_pending_events()
+        self.ids = [m.pk for m in self.matches] + [self.manual.pk]
+
+    def tamper(self):
+        target = self.matches[1]
+        RefereeScore.objects.filter(match=target, referee=self.refs[0]).update(red_corner_score=0, winner='blue')
+        Match.objects.filter(pk=self.matches[2].pk).update(winner=self.matches[2].blue_corner)
+        return target
+
+    def test_consistent_results_have_no_mismatches(self):
+        result = check_matches(self.ids)
+        self.assertEqual(result['checked'], 5)
+        self.assertEqual(result['mismatches'], [])
+
+    def test_reports_and_repairs_mismatches(self):
+        target = self.tamper()
+        result = check_matches(self.ids)
+        fields = sorted((m['match'], m['field']) for m in result['mismatches'])
+        self.assertEqual(fields, [(target.pk, 'referee_score'), (self.matches[2].pk, 'winner')])
+        self.assertEqual(RefereeScore.objects.get(match=target, referee=self.refs[0]).red_corner_score, 0)
+
+        repaired = check_matches(self.ids, repair=True)
+        self.assertEqual(repaired['repaired'], 2)
+        score = RefereeScore.objects.get(match=target, referee=self.refs[0])
+        self.assertEqual((score.red_corner_score, score.winner), (4, 'red'))
+        self.assertEqual(Match.objects.get(pk=self.matches[2].pk).winner_id, self.matches[2].red_corner_id)
+        self.assertEqual(Match.objects.get(pk=self.manual.pk).winner_id, self.refs[1].pk)
+        self.assertEqual(check_matches(self.ids)['mismatches'], [])
+
+    def test_repair_deletes_stale_scores_and_rebuilds_round_totals(self):
+        target = self.matches[0]
+        stray = Athlete.objects.create(first_name='Stray', last_name='Ref', is_referee=True)
+        RefereeScore.objects.create(match=target, referee=stray, red_corner_score=9, blue_corner_score=0, winner='red')
+        RefereeRoundTotal.objects.filter(match=target, referee=self.refs[1]).update(red=99)
+        expected_totals = sorted(RefereeRoundTotal.objects.filter(match=self.matches[1]).values_list('referee_id', 'round', 'red', 'blue'))
+
+        mismatches = check_matches(self.ids)['mismatches']
+        self.assertEqual([(m['referee'], m['expected']) for m in mismatches], [(stray.pk, None)])
+
+        self.assertEqual(check_matches(self.ids, repair=True)['repaired'], 1)
+        self.assertFalse(RefereeScore.objects.filter(referee=stray).exists())
+        self.assertEqual(RefereeRoundTotal.objects.get(match=target, referee=self.refs[1]).red, 3)
+        self.assertEqual(sorted(RefereeRoundTotal.objects.filter(match=self.matches[1]).values_list('referee_id', 'round', 'red', 'blue')), expected_totals)
+        self.assertEqual(check_matches(self.ids)['mismatches'], [])
+
+    def test_command_checkpoint_resumes(self):
+        self.tamper()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'check.json')
+            out = StringIO()
+            call_command('check_match_results', '--shard-size', '2', '--processes', '1', '--checkpoint', path, stdout=out)
+            self.assertIn('Checked: 5 matches, 2 mismatches', out.getvalue())
+            with open(path) as fh:
+                state = json.load(fh)
+            self.assertEqual(sorted(state['done']), [[a, b] for a, b in zip(self.ids[::2], self.ids[1::2] + self.ids[-1:])])
+
+            # Drop the last shard from the checkpoint as if the run had been interrupted.
+            state['done'] = state['done'][:2]
+            state['checked'] = 4
+            with open(path, 'w') as fh:
+                json.dump(state, fh)
+            out = StringIO()
+            call_command('check_match_results', '--shard-size', '2', '--processes', '1', '--checkpoint', path, stdout=out)
+            self.assertIn('Resuming: 2 of 3 shards already checked', out.getvalue())
+            self.assertIn('1 matches in', out.getvalue())
+
+            with self.assertRaises(CommandError):
+                call_command('check_match_results', '--shard-size', '3', '--checkpoint', path, stdout=StringIO())
+
+    def test_command_repair(self):
+        self.tamper()
+        out = StringIO()
+        call_command('check_match_results', '--repair', '--processes', '1', stdout=out)
+        self.assertIn('2 matches repaired', out.getvalue())
+        self.assertEqual(check_matches(self.ids)['mismatches'], [])
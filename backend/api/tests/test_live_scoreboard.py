@@ -0,0 +1,109 @@
+import threading
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from api import live
+from api.live import ScoreboardHub, diff_snapshots
+from api.models import Athlete, Match, Category, RefereePointEvent
+
+User = get_user_model()
+
+
+@override_settings(LIVE_SCORE_POLL_SECONDS=0.01, LIVE_SCORE_KEEPALIVE_SECONDS=60)
+class LiveScoreboardTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(3)]
+        red = Athlete.objects.create(first_name='Red', last_name='R')
+        blue = Athlete.objects.create(first_name='Blue', last_name='B')
+        cat = Category.objects.create(name='LiveCat')
+        self.match = Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue)
+        self.match.referees.add(*self.refs)
+
+    def test_snapshot_then_delta(self):
+        RefereePointEvent.objects.create(match=self.match, referee=self.refs[0], side='red', points=2, event_type='score')
+        hub = ScoreboardHub()
+        messages = hub.messages(self.match.pk, max_seconds=5)
+
+        kind, version, snapshot = next(messages)
+        self.assertEqual(kind, 'snapshot')
+        self.assertEqual(snapshot['referees'][str(self.refs[0].pk)]['total'], [2, 0])
+        self.assertEqual(snapshot['winner'], 'red')
+
+        RefereePointEvent.objects.create(match=self.match, referee=self.refs[1], side='blue', points=1, event_type='score')
+        hub.notify(self.match.pk)
+        kind, next_version, delta = next(messages)
+        self.assertEqual((kind, next_version), ('delta', version + 1))
+        self.assertEqual(list(delta['referees']), [str(self.refs[1].pk)])
+        self.assertNotIn('winner', delta)
+        messages.close()
+
+    def test_viewers_share_one_channel(self):
+        hub = ScoreboardHub()
+        first = hub.messages(self.match.pk, max_seconds=5)
+        second = hub.messages(self.match.pk, max_seconds=5)
+        next(first)
+        next(second)
+        self.assertEqual(len(hub._channels), 1)
+        self.assertEqual(hub._channels[self.match.pk].subscribers, 2)
+        first.close()
+        second.close()
+        self.assertEqual(hub._channels, {})
+
+    def test_diff_reports_removed_keys(self):
+        self.assertEqual(diff_snapshots({'a': 1, 'b': {'x': 1}}, {'b': {'x': 2}}), {'a': None, 'b': {'x': 2}})
+
+    @override_settings(LIVE_SCORE_STREAMING=True)
+    def test_stream_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='pw'))
+        response = client.get(f'/api/matches/{self.match.pk}/stream/')
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = iter(response.streaming_content)
+        self.assertEqual(next(chunks), b'retry: 1000\n\n')
+        self.assertIn(b'event: snapshot', next(chunks))
+        response.close()
+
+        self.assertEqual(client.get('/api/matches/999999/stream/').status_code, 404)
+
+    @override_settings(LIVE_SCORE_STREAMING=False, LIVE_SCORE_FALLBACK_POLL_SECONDS=5)
+    def test_sync_workers_get_a_single_snapshot(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='poller', email='poller@example.com', password='pw'))
+        response = client.get(f'/api/matches/{self.match.pk}/stream/')
+        chunks = list(response.streaming_content)
+        self.assertEqual(chunks[0], b'retry: 5000\n\n')
+        self.assertTrue(chunks[1].startswith(b'event: snapshot\ndata: '))
+        self.assertEqual(len(chunks), 2)
+
+    def test_refresh_queries_outside_the_lock(self):
+        hub = ScoreboardHub()
+        messages = hub.messages(self.match.pk, max_seconds=5)
+        next(messages)
+        channel = hub._channels[self.match.pk]
+        held = []
+        original = live.load_snapshot
+
+        def try_acquire():
+            acquired = channel.condition.acquire(blocking=False)
+            held.append(acquired)
+            if acquired:
+                channel.condition.release()
+
+        def load(match_id):
+            # Another viewer's thread can take the condition while the query runs.
+            viewer = threading.Thread(target=try_acquire)
+            viewer.start()
+            viewer.join()
+            return original(match_id)
+
+        live.load_snapshot = load
+        try:
+            channel.dirty = True
+            channel.refresh()
+        finally:
+            live.load_snapshot = original
+        self.assertEqual(held, [True])
+        self.assertFalse(channel.loading)
+        messages.close()
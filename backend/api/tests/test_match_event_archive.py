@@ -0,0 +1,149 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.aggregation import aggregate_pending_events
+from api.archive import archivable_match_ids, archive_matches, load_match_events, restore_match_events
+from api.consistency import check_matches
+from api.models import Athlete, Match, Category, MatchEventArchive, RefereePointEvent, RefereeRoundTotal, RefereeScore
+from api.scoring import compute_match_results, rebuild_match_totals, referee_score_rows, summarize_match_events
+from api.snapshots import score_at
+
+User = get_user_model()
+
+
+@override_settings(MATCH_SNAPSHOT_EVERY=4)
+class MatchEventArchiveTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(3)]
+        cat = Category.objects.create(name='ArchiveCat')
+        self.old = self.make_match(cat, 'Old', timezone.now() - timedelta(days=200))
+        self.recent = self.make_match(cat, 'Recent', timezone.now() - timedelta(days=1))
+        aggregate_pending_events()
+        self.pending = self.make_match(cat, 'Pending', timezone.now() - timedelta(days=200))
+
+    def make_match(self, cat, name, start):
+        red = Athlete.objects.create(first_name=f'{name}Red', last_name='R')
+        blue = Athlete.objects.create(first_name=f'{name}Blue', last_name='B')
+        match = Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue, central_referee=self.refs[0])
+        for i, (ref, side, points, kind) in enumerate([
+            (self.refs[1], 'red', 3, 'score'), (self.refs[2], 'red', 2, 'score'), (self.refs[1], 'blue', 1, 'score'),
+            (self.refs[0], 'red', -1, 'penalty'), (self.refs[2], 'blue', 4, 'score'), (self.refs[1], 'red', 2, 'score'),
+        ]):
+            with mock.patch('django.utils.timezone.now', return_value=start + timedelta(seconds=i)):
+                RefereePointEvent.objects.create(
+                    match=match, referee=ref, side=side, points=points, event_type=kind, metadata={'round': 1 + i // 3},
+                )
+        return match
+
+    def totals(self, match):
+        return list(RefereeRoundTotal.objects.filter(match=match).values_list('referee_id', 'round', 'red', 'blue', 'flagged_events', 'penalty_red'))
+
+    def test_only_old_fully_processed_matches_are_archivable(self):
+        self.assertEqual(archivable_match_ids(timedelta(days=30)), [self.old.pk])
+        self.assertEqual(archivable_match_ids(timedelta(hours=1)), [self.old.pk, self.recent.pk])
+
+    def test_archive_keeps_results_and_replay(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+        before_api = client.get(f'/api/matches/{self.old.pk}/').data
+        before = compute_match_results(self.old)
+        before_events = [(e.pk, e.timestamp, e.points) for e in self.old.point_events.order_by('timestamp', 'pk')]
+        middle = before_events[3][1]
+        before_at = score_at(self.old, middle)
+        before_totals = self.totals(self.old)
+
+        stats = archive_matches([self.old.pk])
+        self.assertEqual(stats['events'], 6)
+        self.assertFalse(RefereePointEvent.objects.filter(match=self.old).exists())
+        self.assertEqual(MatchEventArchive.objects.get(match=self.old).event_count, 6)
+        self.assertEqual(self.totals(self.old), before_totals)
+
+        self.assertEqual([(e.pk, e.timestamp, e.points) for e in load_match_events(self.old)], before_events)
+        after = compute_match_results(self.old)
+        self.assertEqual((after['per_ref'], after['match_winner']), (before['per_ref'], before['match_winner']))
+        after_at = score_at(self.old, middle)
+        self.assertEqual(after_at['per_ref'], before_at['per_ref'])
+
+        after_api = client.get(f'/api/matches/{self.old.pk}/').data
+        for field in ('referee_scores', 'central_penalties_red', 'central_penalties_blue', 'winner'):
+            self.assertEqual(after_api[field], before_api[field], field)
+
+        # Repair paths see the archived history.
+        rebuild_match_totals([self.old.pk])
+        self.assertEqual(self.totals(self.old), before_totals)
+        self.assertEqual(check_matches([self.old.pk])['mismatches'], [])
+
+    def test_consistency_check_covers_archived_matches(self):
+        archive_matches([self.old.pk])
+        right = Match.objects.get(pk=self.old.pk).winner_id
+        wrong = self.old.blue_corner_id if right == self.old.red_corner_id else self.old.red_corner_id
+        Match.objects.filter(pk=self.old.pk).update(winner_id=wrong)
+        stray = Athlete.objects.create(first_name='Stray', last_name='Ref', is_referee=True)
+        RefereeScore.objects.create(match=self.old, referee=stray, red_corner_score=9, blue_corner_score=0, winner='red')
+
+        mismatches = check_matches([self.old.pk])['mismatches']
+        self.assertEqual(
+            sorted((m['field'], m['referee'], m['expected']) for m in mismatches),
+            [('referee_score', stray.pk, None), ('winner', None, right)],
+        )
+        self.assertEqual(check_matches([self.old.pk], repair=True)['repaired'], 1)
+        self.assertEqual(Match.objects.get(pk=self.old.pk).winner_id, right)
+        self.assertFalse(RefereeScore.objects.filter(referee=stray).exists())
+        self.assertEqual(check_matches([self.old.pk])['mismatches'], [])
+
+    def test_restore_puts_events_back_unchanged(self):
+        before_events = [(e.pk, e.timestamp, e.side, e.points, e.metadata) for e in self.old.point_events.order_by('timestamp', 'pk')]
+        before_totals = self.totals(self.old)
+        archive_matches([self.old.pk])
+        self.assertEqual(restore_match_events([self.old.pk]), 6)
+        after_events = [(e.pk, e.timestamp, e.side, e.points, e.metadata) for e in self.old.point_events.order_by('timestamp', 'pk')]
+        self.assertEqual(after_events, before_events)
+        self.assertEqual(self.totals(self.old), before_totals)
+        self.assertFalse(MatchEventArchive.objects.filter(match=self.old).exists())
+
+    def test_admin_restores_archived_events_only_on_request(self):
+        archive_matches([self.old.pk])
+        admin = User.objects.create_superuser(username='admin', password='x')
+        self.client.force_login(admin)
+        resp = self.client.get(f'/admin/api/match/{self.old.pk}/change/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(RefereePointEvent.objects.filter(match=self.old).exists())
+
+        resp = self.client.post('/admin/api/match/', {'action': 'restore_archived_events', '_selected_action': [self.old.pk]})
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(RefereePointEvent.objects.filter(match=self.old).count(), 6)
+        self.assertFalse(MatchEventArchive.objects.filter(match=self.old).exists())
+
+    def test_new_events_do_not_hide_the_archived_history(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+        archive_matches([self.old.pk])
+        RefereePointEvent.objects.create(match=self.old, referee=self.refs[1], side='blue', points=5, event_type='score', metadata={'round': 2})
+        expected = referee_score_rows(summarize_match_events(self.old, load_match_events(self.old, with_referees=True)))
+        rows = client.get(f'/api/matches/{self.old.pk}/').data['referee_scores']
+        self.assertEqual(rows, expected)
+        ref = next(row for row in rows if row['referee_name'] == 'Ref1 Ref')
+        self.assertEqual((ref['total_red'], ref['total_blue']), (5, 6))  # archived 3 + 2 red, 1 blue; new 5 blue
+
+    def test_command(self):
+        out = StringIO()
+        call_command('archive_match_events', '--older-than', '30', '--dry-run', stdout=out)
+        self.assertIn('[dry-run] Archived 6 events from 1 matches', out.getvalue())
+        self.assertFalse(MatchEventArchive.objects.exists())
+
+        out = StringIO()
+        call_command('archive_match_events', '--older-than', '30', stdout=out)
+        self.assertIn('Archived 6 events from 1 matches', out.getvalue())
+        self.assertEqual(RefereePointEvent.objects.filter(match=self.old).count(), 0)
+        self.assertEqual(RefereePointEvent.objects.filter(match=self.pending).count(), 6)
+
+        out = StringIO()
+        call_command('archive_match_events', '--restore', '--match', str(self.old.pk), stdout=out)
+        self.assertIn('Restored 6 events', out.getvalue())
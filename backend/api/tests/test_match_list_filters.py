@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from api.models import Athlete, Match, Category, RefereePointEvent
+
+User = get_user_model()
+
+
+class MatchListFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='viewer', password='pw'))
+        self.ref = Athlete.objects.create(first_name='Ref', last_name='One', is_referee=True)
+        self.central = Athlete.objects.create(first_name='Ref', last_name='Central', is_referee=True)
+        self.athlete = Athlete.objects.create(first_name='Ana', last_name='A')
+        self.cat_a = Category.objects.create(name='CatA')
+        self.cat_b = Category.objects.create(name='CatB')
+        self.matches = []
+        for i in range(5):
+            other = Athlete.objects.create(first_name=f'Opp{i}', last_name='O')
+            match = Match.objects.create(
+                category=self.cat_a if i < 3 else self.cat_b,
+                match_type='finals' if i == 0 else 'qualifications',
+                red_corner=self.athlete if i % 2 == 0 else other,
+                blue_corner=other if i % 2 == 0 else Athlete.objects.create(first_name=f'Blue{i}', last_name='B'),
+                central_referee=self.central if i == 4 else None,
+            )
+            if i < 2:
+                match.referees.add(self.ref, self.central)
+            RefereePointEvent.objects.create(match=match, referee=self.ref, side='red', points=1)
+            self.matches.append(match)
+
+    def ids(self, response):
+        data = response.json()
+        rows = data['results'] if isinstance(data, dict) else data
+        return [row['id'] for row in rows]
+
+    def test_filters(self):
+        m = [match.pk for match in self.matches]
+        self.assertEqual(self.ids(self.client.get('/api/matches/', {'category': self.cat_a.pk})), m[:3])
+        self.assertEqual(self.ids(self.client.get('/api/matches/', {'match_type': 'finals'})), m[:1])
+        self.assertEqual(self.ids(self.client.get('/api/matches/', {'athlete': self.athlete.pk})), [m[0], m[2], m[4]])
+        self.assertEqual(self.ids(self.client.get('/api/matches/', {'athlete_id': self.athlete.pk})), [m[0], m[2], m[4]])
+        self.assertEqual(self.ids(self.client.get('/api/matches/', {'referee': self.central.pk})), [m[0], m[1], m[4]])
+        self.assertEqual(self.client.get('/api/matches/', {'referee': 'x'}).status_code, 400)
+
+    def test_list_is_paginated_by_default(self):
+        data = self.client.get('/api/matches/').json()
+        self.assertEqual([row['id'] for row in data['results']], [match.pk for match in self.matches])
+        self.assertIsNone(data['next'])
+        self.assertEqual(self.client.get('/api/matches/', {'all': 1}).json(), data['results'])
+
+    def test_cursor_pagination(self):
+        first = self.client.get('/api/matches/', {'page_size': 2}).json()
+        self.assertEqual([row['id'] for row in first['results']], [self.matches[0].pk, self.matches[1].pk])
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], [self.matches[2].pk, self.matches[3].pk])
+
+    def test_page_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/matches/', {'page_size': 1})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get('/api/matches/', {'page_size': 5})
+        self.assertEqual(len(small), len(large))
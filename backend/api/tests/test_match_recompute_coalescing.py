@@ -0,0 +1,54 @@
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from api.models import Athlete, Match, Category, CategoryAthleteScore, RefereeScore
+
+
+class MatchRecomputeCoalescingTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(5)]
+        self.red = Athlete.objects.create(first_name='Red', last_name='R')
+        self.blue = Athlete.objects.create(first_name='Blue', last_name='B')
+        self.category = Category.objects.create(name='CoalesceCat')
+        self.match = Match.objects.create(category=self.category, match_type='qualifications', red_corner=self.red, blue_corner=self.blue, central_referee=self.refs[0])
+        self.match.referees.add(*self.refs)
+
+    def test_score_saves_share_one_recompute(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for i, ref in enumerate(self.refs):
+                RefereeScore.objects.create(match=self.match, referee=ref, red_corner_score=3 if i < 3 else 1, blue_corner_score=2, winner='red' if i < 3 else 'blue')
+
+        self.assertEqual(len(callbacks), 1)
+        self.match.refresh_from_db()
+        self.assertIsNone(self.match.winner)
+
+        for callback in callbacks:
+            callback()
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.winner, self.red)
+        self.assertTrue(CategoryAthleteScore.objects.filter(category=self.category, athlete=self.red).exists())
+
+    def test_rolled_back_recompute_does_not_block_later_ones(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    RefereeScore.objects.create(match=self.match, referee=self.refs[0], winner='red')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            RefereeScore.objects.create(match=self.match, referee=self.refs[1], winner='blue')
+
+        self.assertEqual(len(callbacks), 1)
+
+    def test_recompute_that_ran_does_not_block_the_next_one(self):
+        with self.captureOnCommitCallbacks(execute=True) as first:
+            RefereeScore.objects.create(match=self.match, referee=self.refs[1], winner='red')
+        with self.captureOnCommitCallbacks() as second:
+            RefereeScore.objects.create(match=self.match, referee=self.refs[2], winner='blue')
+        self.assertEqual((len(first), len(second)), (1, 1))
+
+    def test_winner_votes_use_one_query(self):
+        RefereeScore.objects.create(match=self.match, referee=self.refs[1], winner='blue')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.match.calculate_winner(), self.blue)
+        self.assertEqual(len(queries), 1)
@@ -0,0 +1,140 @@
+import random
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import Athlete, Match, Category, MatchScoreSnapshot, RefereePointEvent
+from api.scoring import compute_match_results
+from api.snapshots import rebuild_snapshots, record_events, score_at
+
+User = get_user_model()
+
+
+@override_settings(MATCH_SNAPSHOT_EVERY=5)
+class MatchScoreSnapshotTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(3)]
+        red = Athlete.objects.create(first_name='Red', last_name='R')
+        blue = Athlete.objects.create(first_name='Blue', last_name='B')
+        cat = Category.objects.create(name='SnapshotCat')
+        self.match = Match.objects.create(
+            category=cat, match_type='qualifications', red_corner=red, blue_corner=blue, central_referee=self.refs[0],
+        )
+        self.match.referees.add(*self.refs)
+        self.start = timezone.now().replace(microsecond=0)
+        rng = random.Random(3)
+        self.times = []
+        for i in range(30):
+            at = self.start + timedelta(seconds=10 * i)
+            penalty = rng.random() < 0.2
+            self.add_event(at, rng.choice(self.refs[1:]) if not penalty else self.refs[0], rng.choice(['red', 'blue']),
+                           -1 if penalty else rng.randint(1, 3), 'penalty' if penalty else 'score', i // 10 + 1)
+
+    def add_event(self, at, referee, side, points, event_type, rd):
+        with mock.patch('django.utils.timezone.now', return_value=at):
+            event = RefereePointEvent.objects.create(
+                match=self.match, referee=referee, side=side, points=points,
+                event_type=event_type, metadata={'round': rd},
+            )
+        self.times.append(at)
+        return event
+
+    def expected_at(self, at):
+        events = self.match.point_events.filter(timestamp__lte=at).order_by('timestamp', 'pk')
+        return compute_match_results(self.match, events)
+
+    def assert_same(self, at):
+        actual = score_at(self.match, at)
+        expected = self.expected_at(at)
+        for key in ('per_ref', 'central_penalties_by_round', 'match_winner', 'votes'):
+            self.assertEqual(actual[key], expected[key], f'{key} at {at}')
+        return actual
+
+    def test_snapshots_are_taken_every_n_events_and_on_round_change(self):
+        snapshots = list(self.match.score_snapshots.order_by('last_event_at'))
+        self.assertTrue(snapshots)
+        # Rounds start at events 10 and 20; otherwise one snapshot per 5 events.
+        self.assertEqual([s.event_count for s in snapshots], [5, 10, 11, 16, 21, 26])
+        self.assertEqual(snapshots[-1].round, 3)
+
+    def test_late_events_of_earlier_rounds_do_not_snapshot(self):
+        at = self.times[-1]
+        # Events 27-30 are pending; the 31st fills the interval.
+        self.add_event(at + timedelta(seconds=1), self.refs[1], 'red', 1, 'score', 3)
+        count = self.match.score_snapshots.count()
+        # Round 2 and 3 events interleave after round 3 started: no snapshot
+        # until the interval fills up again.
+        for i, rd in enumerate([2, 3, 2, 3]):
+            self.add_event(at + timedelta(seconds=i + 2), self.refs[1], 'red', 1, 'score', rd)
+        self.assertEqual(self.match.score_snapshots.count(), count)
+        self.add_event(at + timedelta(seconds=9), self.refs[1], 'red', 1, 'score', 2)
+        latest = self.match.score_snapshots.order_by('-last_event_at').first()
+        self.assertEqual((self.match.score_snapshots.count(), latest.round), (count + 1, 3))
+        self.add_event(at + timedelta(seconds=10), self.refs[1], 'red', 1, 'score', 4)
+        self.assertEqual(self.match.score_snapshots.count(), count + 2)
+        self.assertEqual(rebuild_snapshots([self.match.pk]), count + 2)
+
+    def test_recording_an_event_costs_one_query(self):
+        event = self.add_event(self.times[-1] + timedelta(seconds=1), self.refs[1], 'red', 1, 'score', 3)
+        with CaptureQueriesContext(connection) as queries:
+            record_events([event])
+        self.assertEqual(len(queries), 1)
+
+    def test_score_at_matches_full_replay(self):
+        for i in (0, 3, 4, 9, 10, 17, 29):
+            result = self.assert_same(self.times[i] + timedelta(seconds=1))
+            self.assertLess(result['replayed'], 5)
+        before = score_at(self.match, self.start - timedelta(seconds=1))
+        self.assertEqual(before['per_ref'], {})
+        self.assertIsNone(before['snapshot'])
+
+    def test_delete_and_edit_invalidate_covering_snapshots(self):
+        events = list(self.match.point_events.order_by('timestamp', 'pk'))
+        events[12].delete()
+        self.assertFalse(self.match.score_snapshots.filter(last_event_at__gte=events[12].timestamp).exists())
+        self.assert_same(self.times[20])
+
+        event = events[3]
+        event.points = 9
+        event.save()
+        self.assertFalse(self.match.score_snapshots.exists())
+        self.assert_same(self.times[29])
+
+        # New events take snapshots again from the log.
+        self.add_event(self.times[-1] + timedelta(seconds=5), self.refs[1], 'red', 1, 'score', 3)
+        self.assertTrue(self.match.score_snapshots.exists())
+        self.assert_same(self.times[-1])
+
+    def test_rebuild_reproduces_snapshots(self):
+        before = list(MatchScoreSnapshot.objects.order_by('last_event_at').values_list('event_count', 'round', 'totals'))
+        self.assertEqual(rebuild_snapshots([self.match.pk]), len(before))
+        after = list(MatchScoreSnapshot.objects.order_by('last_event_at').values_list('event_count', 'round', 'totals'))
+        self.assertEqual(after, before)
+
+    def test_score_at_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+        url = f'/api/matches/{self.match.pk}/score-at/'
+
+        at = self.times[14] + timedelta(seconds=1)
+        resp = client.get(url, {'at': at.isoformat()})
+        self.assertEqual(resp.status_code, 200)
+        expected = self.expected_at(at)
+        for rid, data in expected['per_ref'].items():
+            self.assertEqual(resp.data['referees'][str(rid)]['total'], [data['adj_red'], data['adj_blue']])
+        self.assertIsNotNone(resp.data['snapshot'])
+
+        # Round 2 started with event 10; 00:40 into it is just after event 14.
+        resp = client.get(url, {'round': 2, 'elapsed': '00:41'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['referees'], client.get(url, {'at': at.isoformat()}).data['referees'])
+
+        self.assertEqual(client.get(url).status_code, 400)
+        self.assertEqual(client.get(url, {'at': 'yesterday'}).status_code, 400)
+        self.assertEqual(client.get(url, {'round': 7}).status_code, 400)
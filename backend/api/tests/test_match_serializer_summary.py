@@ -0,0 +1,56 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from api.models import Athlete, Club, Match, Category, RefereePointEvent
+from api.serializers import MatchSerializer
+
+User = get_user_model()
+
+
+class MatchSerializerSummaryTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(4)]
+        club = Club.objects.create(name='Club A')
+        self.category = Category.objects.create(name='SummaryCat')
+        self.matches = [self._make_match(i, club) for i in range(3)]
+
+    def _make_match(self, i, club):
+        red = Athlete.objects.create(first_name=f'Red{i}', last_name='R', club=club)
+        blue = Athlete.objects.create(first_name=f'Blue{i}', last_name='B', club=club)
+        match = Match.objects.create(category=self.category, match_type='qualifications', red_corner=red, blue_corner=blue, central_referee=self.refs[0])
+        match.referees.add(*self.refs)
+        ev = RefereePointEvent.objects.create
+        ev(match=match, referee=self.refs[1], side='red', points=3, event_type='score')
+        ev(match=match, referee=self.refs[1], side='blue', points=1, event_type='score', metadata={'round': 2})
+        ev(match=match, referee=self.refs[2], side='blue', points=2, event_type='score')
+        ev(match=match, referee=self.refs[2], side='red', points=-1, event_type='penalty')
+        ev(match=match, referee=self.refs[0], side='red', points=5, event_type='score')
+        ev(match=match, referee=self.refs[0], side='blue', points=-2, event_type='penalty', metadata={'central': True, 'reason': 'contact'})
+        ev(match=match, referee=self.refs[3], side='red', points=-1, event_type='deduction', metadata={'central': True})
+        return match
+
+    def test_referee_breakdown_and_central_penalties(self):
+        data = MatchSerializer(self.matches[0]).data
+
+        self.assertEqual(list(data['referee_scores']), [
+            {'referee_name': 'Ref1 Ref', 'rounds': [{'round': 1, 'red': 3, 'blue': 0}, {'round': 2, 'red': 0, 'blue': 1}], 'total_red': 2, 'total_blue': -1},
+            {'referee_name': 'Ref2 Ref', 'rounds': [{'round': 1, 'red': -1, 'blue': 2}], 'total_red': -2, 'total_blue': 0},
+        ])
+        self.assertEqual(data['central_penalties_red'], [{'points': -1, 'metadata': {'central': True}}])
+        self.assertEqual(data['central_penalties_blue'], [{'points': -2, 'metadata': {'central': True, 'reason': 'contact'}}])
+
+    def test_list_query_count_does_not_grow_with_matches(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='pw'))
+
+        with CaptureQueriesContext(connection) as few:
+            client.get('/api/matches/', {'all': 1})
+        for i in range(3, 6):
+            self._make_match(i, Club.objects.first())
+        with CaptureQueriesContext(connection) as many:
+            response = client.get('/api/matches/', {'all': 1})
+
+        self.assertEqual(len(response.json()), 6)
+        self.assertEqual(len(many), len(few))
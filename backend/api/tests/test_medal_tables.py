@@ -0,0 +1,161 @@
+import importlib
+from datetime import datetime
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.medals import rebuild_medal_tables
+from api.models import (
+    Athlete, Category, CategoryAthleteScore, CategoryMedal, Club, EventClubMedals, SeasonAthleteMedals, SeasonClubMedals,
+    Team, TeamMember,
+)
+from landing.models import Event
+
+User = get_user_model()
+
+
+def _tables():
+    return {
+        'event_club': sorted(EventClubMedals.objects.values_list('event_id', 'club_id', 'gold', 'silver', 'bronze')),
+        'season_club': sorted(SeasonClubMedals.objects.values_list('season', 'club_id', 'gold', 'silver', 'bronze')),
+        'season_athlete': sorted(SeasonAthleteMedals.objects.values_list('season', 'athlete_id', 'gold', 'silver', 'bronze')),
+        'medals': sorted(CategoryMedal.objects.values_list('category_id', 'athlete_id', 'place', 'club_id')),
+    }
+
+
+class MedalTableTests(TestCase):
+    def setUp(self):
+        start = timezone.make_aware(datetime(2025, 5, 10))
+        self.event = Event.objects.create(title='Open', slug='open', start_date=start)
+        self.clubs = [Club.objects.create(name=f'Club{i}') for i in range(2)]
+        self.athletes = [
+            Athlete.objects.create(first_name=f'A{i}', last_name='L', gender='male', club=self.clubs[i % 2])
+            for i in range(6)
+        ]
+        self.solo = Category.objects.create(name='Solo', event=self.event, type='solo', gender='male')
+
+    def assertConsistent(self):
+        """The incrementally maintained tables equal a full rebuild."""
+        incremental = _tables()
+        rebuild_medal_tables()
+        self.assertEqual(_tables(), incremental)
+
+    def set_podium(self, category, *athletes):
+        category.first_place, category.second_place, category.third_place = athletes
+        category.save()
+
+    def test_podium_changes_move_medals(self):
+        a = self.athletes
+        self.set_podium(self.solo, a[0], a[1], a[2])
+        self.assertEqual(
+            list(SeasonClubMedals.objects.values_list('season', 'club_id', 'gold', 'silver', 'bronze')),
+            [(2025, self.clubs[0].pk, 1, 0, 1), (2025, self.clubs[1].pk, 0, 1, 0)],
+        )
+        self.assertConsistent()
+
+        self.set_podium(self.solo, a[1], a[0], None)
+        self.assertEqual(SeasonAthleteMedals.objects.get(athlete=a[1]).gold, 1)
+        self.assertFalse(SeasonAthleteMedals.objects.filter(athlete=a[2]).exists())
+        self.assertEqual(EventClubMedals.objects.get(club=self.clubs[1]).gold, 1)
+        self.assertConsistent()
+
+        self.solo.delete()
+        self.assertEqual(_tables(), {'event_club': [], 'season_club': [], 'season_athlete': [], 'medals': []})
+
+    def test_team_medal_counts_once_per_club(self):
+        teams_cat = Category.objects.create(name='Teams', event=self.event, type='teams')
+        team = Team.objects.create(name='')
+        for athlete in (self.athletes[0], self.athletes[2]):
+            TeamMember.objects.create(team=team, athlete=athlete)
+        teams_cat.first_place_team = team
+        teams_cat.save()
+
+        self.assertEqual(EventClubMedals.objects.get(club=self.clubs[0]).gold, 1)
+        self.assertEqual(SeasonAthleteMedals.objects.filter(gold=1).count(), 2)
+
+        # A member from another club adds a medal for that club only.
+        TeamMember.objects.create(team=team, athlete=self.athletes[1])
+        self.assertEqual(EventClubMedals.objects.get(club=self.clubs[1]).gold, 1)
+        self.assertEqual(EventClubMedals.objects.get(club=self.clubs[0]).gold, 1)
+        self.assertConsistent()
+
+        team.delete()
+        self.assertFalse(EventClubMedals.objects.exists())
+
+    def test_approved_results_award_medals(self):
+        claim = CategoryAthleteScore.objects.create(
+            category=self.solo, athlete=self.athletes[3], submitted_by_athlete=True, placement_claimed='2nd',
+        )
+        self.assertFalse(CategoryMedal.objects.exists())
+
+        claim.status = 'approved'
+        claim.save()
+        self.assertEqual(SeasonAthleteMedals.objects.get(athlete=self.athletes[3]).silver, 1)
+        self.assertConsistent()
+
+        referee_result = CategoryAthleteScore.objects.create(
+            category=self.solo, athlete=self.athletes[4], placement_claimed='3rd',
+        )
+        self.assertEqual(SeasonAthleteMedals.objects.get(athlete=self.athletes[4]).bronze, 1)
+        referee_result.delete()
+        self.assertFalse(SeasonAthleteMedals.objects.filter(athlete=self.athletes[4]).exists())
+        self.assertConsistent()
+
+        self.athletes[3].delete()
+        self.assertFalse(CategoryMedal.objects.exists())
+        self.assertFalse(SeasonClubMedals.objects.exists())
+
+    def test_endpoint_and_command(self):
+        a = self.athletes
+        self.set_podium(self.solo, a[0], a[1], a[2])
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+
+        resp = client.get('/api/medals/', {'scope': 'event_club', 'event': self.event.pk})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [(r['club_name'], r['gold'], r['silver'], r['bronze'], r['total']) for r in resp.data['results']],
+            [('Club0', 1, 0, 1, 2), ('Club1', 0, 1, 0, 1)],
+        )
+        resp = client.get('/api/medals/', {'scope': 'season_athlete', 'season': 2025, 'limit': 1})
+        self.assertEqual([r['athlete_name'] for r in resp.data['results']], ['A0 L'])
+        self.assertEqual(client.get('/api/medals/', {'scope': 'nope'}).status_code, 400)
+
+        SeasonClubMedals.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_medal_tables', stdout=out)
+        self.assertIn('Rebuilt 3 medals: 2 event/club, 2 season/club and 3 season/athlete rows', out.getvalue())
+        self.assertEqual(SeasonClubMedals.objects.count(), 2)
+
+    def test_saves_that_keep_the_podium_skip_the_recompute(self):
+        self.set_podium(self.solo, *self.athletes[:3])
+        self.solo.name = 'Solo renamed'
+        with CaptureQueriesContext(connection) as queries:
+            self.solo.save()
+        self.assertFalse([q for q in queries if 'categorymedal' in q['sql'].lower()])
+        with CaptureQueriesContext(connection) as queries:
+            self.solo.save(update_fields=['name'])
+        self.assertFalse([q for q in queries if 'categorymedal' in q['sql'].lower()])
+
+        self.solo.third_place = self.athletes[3]
+        self.solo.save()
+        self.assertEqual(SeasonAthleteMedals.objects.get(athlete=self.athletes[3]).bronze, 1)
+        self.assertConsistent()
+
+    def test_migration_backfills_existing_podiums(self):
+        self.set_podium(self.solo, *self.athletes[:3])
+        CategoryAthleteScore.objects.create(category=self.solo, athlete=self.athletes[4], placement_claimed='3rd')
+        expected = _tables()
+        for model in (CategoryMedal, EventClubMedals, SeasonClubMedals, SeasonAthleteMedals):
+            model.objects.all().delete()
+
+        migration = importlib.import_module('api.migrations.0051_backfill_medal_tables')
+        migration.backfill_medal_tables(apps, None)
+        self.assertEqual(_tables(), expected)
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from api import ingestion
+from api.models import Athlete, Match, Category, RefereePointEvent, RefereeRoundTotal
+
+User = get_user_model()
+
+
+class PointEventsBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = User.objects.create_user(username='admin', password='pw', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(admin)
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(2)]
+        cat = Category.objects.create(name='BatchCat')
+        self.matches = []
+        for i in range(2):
+            red = Athlete.objects.create(first_name=f'Red{i}', last_name='R')
+            blue = Athlete.objects.create(first_name=f'Blue{i}', last_name='B')
+            self.matches.append(Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue))
+
+    def post(self, events):
+        return self.client.post('/api/matches/point-events/batch/', events, format='json')
+
+    def test_batch_creates_events_for_several_matches(self):
+        response = self.post([
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 2, 'external_id': 'a-1'},
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 1, 'external_id': 'a-2', 'metadata': {'round': 2}},
+            {'match': self.matches[1].pk, 'referee': self.refs[1].pk, 'side': 'blue', 'points': 3, 'external_id': 'b-1'},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(RefereePointEvent.objects.filter(processed=False).count(), 3)
+        totals = RefereeRoundTotal.objects.get(match=self.matches[0], referee=self.refs[0], round=1)
+        self.assertEqual((totals.red, totals.score_events), (2, 1))
+
+    def test_resent_batch_is_idempotent(self):
+        events = [
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 2, 'external_id': 'x-1'},
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 2, 'external_id': 'x-1'},
+        ]
+        first = self.post(events).json()
+        second = self.post(events).json()
+
+        self.assertEqual([r['status'] for r in first['results']], ['created', 'duplicate'])
+        self.assertEqual([r['status'] for r in second['results']], ['duplicate', 'duplicate'])
+        self.assertEqual(RefereePointEvent.objects.count(), 1)
+        totals = RefereeRoundTotal.objects.get(match=self.matches[0], referee=self.refs[0], round=1)
+        self.assertEqual(totals.red, 2)
+
+    def test_retry_after_a_concurrent_insert_starts_from_clean_results(self):
+        events = [
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 2, 'external_id': 'c-1'},
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 2, 'external_id': 'c-1'},
+        ]
+        real_insert = ingestion._insert_new
+        attempts = []
+
+        def insert(valid, results, created_by):
+            attempts.append(1)
+            if len(attempts) == 1:
+                # Our insert loses the race: it is rolled back by the unique index.
+                real_insert(valid, results, created_by)
+                raise IntegrityError('duplicate external_id')
+            self.concurrent = RefereePointEvent.objects.create(
+                match=self.matches[0], referee=self.refs[0], side='red', points=2, external_id='c-1',
+            )
+            real_insert(valid, results, created_by)
+
+        with mock.patch.object(ingestion, '_insert_new', side_effect=insert):
+            results = self.post(events).json()['results']
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(results, [
+            {'index': 0, 'status': 'duplicate', 'id': self.concurrent.pk, 'external_id': 'c-1'},
+            {'index': 1, 'status': 'duplicate', 'id': self.concurrent.pk, 'external_id': 'c-1'},
+        ])
+        self.assertEqual(RefereePointEvent.objects.count(), 1)
+
+    def test_invalid_items_are_reported_per_item(self):
+        response = self.post({'events': [
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'green', 'points': 1},
+            {'match': 999999, 'referee': self.refs[0].pk, 'side': 'red', 'points': 1},
+            {'match': self.matches[0].pk, 'referee': self.refs[0].pk, 'side': 'red', 'points': 1, 'metadata': {'round': 0}},
+            {'match': self.matches[0].pk, 'referee': self.refs[1].pk, 'side': 'blue', 'points': 1},
+        ]})
+
+        body = response.json()
+        self.assertEqual([r['status'] for r in body['results']], ['invalid', 'invalid', 'invalid', 'created'])
+        self.assertIn('side', body['results'][0]['errors'])
+        self.assertIn('match', body['results'][1]['errors'])
+        self.assertIn('metadata', body['results'][2]['errors'])
+        self.assertEqual(RefereePointEvent.objects.count(), 1)
+
+    def test_rejects_non_list_payload(self):
+        response = self.post({'match': self.matches[0].pk})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,145 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Athlete, Category, Competition, Group, Match, PoolStanding, RefereeScore
+from api.pools import rank_pool, rebuild_pools
+
+User = get_user_model()
+
+
+def _standings(category):
+    return list(PoolStanding.objects.filter(category=category).order_by('pool', 'rank', 'athlete_id').values_list(
+        'pool', 'rank', 'athlete_id', 'played', 'wins', 'draws', 'losses', 'points_for', 'points_against',
+    ))
+
+
+class PoolStandingTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.create(name='Juniors', competition=Competition.objects.create(name='Cup'))
+        self.category = Category.objects.create(name='Fight -60', type='fight', group=self.group)
+        self.ref = Athlete.objects.create(first_name='Ref', last_name='R', is_referee=True)
+        self.a = [Athlete.objects.create(first_name=f'P{i}', last_name='L') for i in range(6)]
+        a = self.a
+        # Pool 1: a0 > a1, a1 > a2, a2 > a0 (a cycle, decided on points).
+        self.m01 = self.match(a[0], a[1], 5, 3)
+        self.m12 = self.match(a[1], a[2], 6, 2)
+        self.m20 = self.match(a[2], a[0], 4, 3)
+        # Pool 2: a3 beats both, a4 and a5 not played yet.
+        self.match(a[3], a[4], 7, 1)
+        self.match(a[3], a[5], 5, 4)
+        self.m45 = Match.objects.create(category=self.category, red_corner=a[4], blue_corner=a[5])
+
+    def match(self, red, blue, red_points, blue_points):
+        match = Match.objects.create(category=self.category, red_corner=red, blue_corner=blue)
+        RefereeScore.objects.create(
+            match=match, referee=self.ref, red_corner_score=red_points, blue_corner_score=blue_points,
+            winner='red' if red_points > blue_points else 'blue',
+        )
+        match.save()  # recompute the winner from the referee score
+        return match
+
+    def assertConsistent(self):
+        incremental = _standings(self.category)
+        rebuild_pools([self.category.pk])
+        self.assertEqual(_standings(self.category), incremental)
+
+    def test_tables_and_tiebreakers(self):
+        a = self.a
+        self.assertEqual(_standings(self.category), [
+            # A cycle in pool 1: level on wins and head-to-head, point difference decides.
+            (1, 1, a[1].pk, 2, 1, 0, 1, 9, 7),
+            (1, 2, a[0].pk, 2, 1, 0, 1, 8, 7),
+            (1, 3, a[2].pk, 2, 1, 0, 1, 6, 9),
+            (2, 1, a[3].pk, 2, 2, 0, 0, 12, 5),
+            (2, 2, a[5].pk, 1, 0, 0, 1, 4, 5),
+            (2, 3, a[4].pk, 1, 0, 0, 1, 1, 7),
+        ])
+
+        self.m45.winner = a[4]
+        self.m45.save()
+        self.assertEqual([row[2] for row in _standings(self.category) if row[0] == 2], [a[3].pk, a[4].pk, a[5].pk])
+        self.assertConsistent()
+
+    def test_head_to_head_beats_point_difference(self):
+        # 1 and 2 have two wins each, 3 and 4 one each; 1 beat 2 and 4 beat 3.
+        rows = [
+            (0, 1, 2, 1, 1, 0, 1), (0, 1, 4, 1, 1, 0, 1), (0, 3, 1, 3, 1, 0, 1),
+            (0, 2, 3, 2, 10, 0, 1), (0, 2, 4, 2, 10, 0, 1), (0, 3, 4, 4, 0, 1, 1),
+        ]
+        pool = rank_pool([1, 2, 3, 4], rows)
+        self.assertEqual(sorted(pool, key=lambda athlete: pool[athlete]['rank']), [1, 2, 4, 3])
+
+    def test_winner_change_only_touches_its_pool(self):
+        a = self.a
+        pool2_before = [row for row in _standings(self.category) if row[0] == 2]
+        with CaptureQueriesContext(connection) as queries:
+            RefereeScore.objects.filter(match=self.m01).update(red_corner_score=1, blue_corner_score=5, winner='blue')
+            self.m01.save()
+        self.assertFalse([q for q in queries if q['sql'].startswith('DELETE')])
+        pool1 = [row for row in _standings(self.category) if row[0] == 1]
+        self.assertEqual([(row[1], row[2], row[4]) for row in pool1][0], (1, a[1].pk, 2))
+        self.assertEqual([row for row in _standings(self.category) if row[0] == 2], pool2_before)
+        self.assertConsistent()
+
+    def test_referee_score_inlines_refresh_the_pool_once(self):
+        ref2 = Athlete.objects.create(first_name='Ref2', last_name='R', is_referee=True)
+        with mock.patch('api.pools.refresh_pools_for_matches') as refresh, self.captureOnCommitCallbacks(execute=True):
+            for referee in (self.ref, ref2):
+                RefereeScore.objects.create(match=self.m45, referee=referee, red_corner_score=3, blue_corner_score=1, winner='red')
+        self.assertEqual(refresh.call_count, 1)
+
+        with mock.patch('api.pools.refresh_pools_for_matches') as refresh, self.captureOnCommitCallbacks(execute=True):
+            RefereeScore.objects.filter(match=self.m45).delete()
+        self.assertEqual(refresh.call_count, 1)
+
+    def test_layout_changes_rebuild_the_category(self):
+        a = self.a
+        # A match across pools merges them.
+        self.match(a[0], a[3], 3, 2)
+        self.assertEqual({row[0] for row in _standings(self.category)}, {1})
+        self.assertEqual(len(_standings(self.category)), 6)
+        self.assertConsistent()
+
+        Match.objects.filter(red_corner=a[0], blue_corner=a[3]).delete()
+        self.assertEqual({row[0] for row in _standings(self.category)}, {1, 2})
+
+        # Moving a pool match to the finals splits the pool.
+        self.m12.match_type = 'finals'
+        self.m12.save()
+        self.m20.delete()
+        self.assertEqual(
+            [(row[0], row[2]) for row in _standings(self.category)][:2],
+            [(1, a[0].pk), (1, a[1].pk)],
+        )
+        self.assertFalse(PoolStanding.objects.filter(athlete=a[2]).exists())
+        self.assertConsistent()
+
+        self.category.delete()
+        self.assertFalse(PoolStanding.objects.exists())
+
+    def test_endpoints_and_command(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='viewer', password='x'))
+        resp = client.get(f'/api/categories/{self.category.pk}/pools/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p['pool'] for p in resp.data['pools']], [1, 2])
+        self.assertEqual(resp.data['pools'][0]['standings'][0]['name'], 'P1 L')
+        self.assertEqual(resp.data['pools'][0]['standings'][0]['point_difference'], 2)
+
+        # Categories with matches from before the table existed are built on read.
+        PoolStanding.objects.all().delete()
+        resp = client.get(f'/api/groups/{self.group.pk}/pools/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([c['category'] for c in resp.data['categories']], [self.category.pk])
+        self.assertEqual(len(resp.data['categories'][0]['pools']), 2)
+
+        out = StringIO()
+        call_command('rebuild_pool_standings', stdout=out)
+        self.assertIn('Rebuilt pool tables of 1 categories (6 standings)', out.getvalue())
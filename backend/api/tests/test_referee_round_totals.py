@@ -0,0 +1,96 @@
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from api.models import Athlete, Match, Category, RefereePointEvent, RefereeRoundTotal, RefereeScore
+from api.scoring import compute_match_results, compute_match_results_from_totals, rebuild_match_totals
+
+
+def _snapshot(match):
+    return sorted(
+        RefereeRoundTotal.objects.filter(match=match).values_list(
+            'referee_id', 'round', 'red', 'blue', 'score_events',
+            'penalty_red', 'penalty_blue', 'penalty_events',
+            'flagged_red', 'flagged_blue', 'flagged_events',
+        )
+    )
+
+
+class RefereeRoundTotalTests(TestCase):
+    def setUp(self):
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(5)]
+        red = Athlete.objects.create(first_name='Red', last_name='R')
+        blue = Athlete.objects.create(first_name='Blue', last_name='B')
+        cat = Category.objects.create(name='TotalsCat')
+        self.match = Match.objects.create(category=cat, match_type='qualifications', red_corner=red, blue_corner=blue)
+        self.match.referees.add(*self.refs)
+        self.match.central_referee = self.refs[0]
+        self.match.save()
+
+    def _mixed_events(self):
+        ev = RefereePointEvent.objects.create
+        ev(match=self.match, referee=self.refs[1], side='red', points=3, event_type='score')
+        ev(match=self.match, referee=self.refs[2], side='blue', points=2, event_type='score', metadata={'round': 2})
+        ev(match=self.match, referee=self.refs[3], side='blue', points=4, event_type='score')
+        ev(match=self.match, referee=self.refs[4], side='red', points=1, event_type='score', metadata={'round': 2})
+        ev(match=self.match, referee=self.refs[0], side='red', points=-2, event_type='penalty')
+        ev(match=self.match, referee=self.refs[1], side='blue', points=-1, event_type='penalty', metadata={'central': True, 'round': 2})
+        ev(match=self.match, referee=self.refs[2], side='red', points=-1, event_type='penalty')
+
+    def test_incremental_totals_match_rebuild(self):
+        self._mixed_events()
+        incremental = _snapshot(self.match)
+
+        rebuild_match_totals([self.match.pk])
+
+        self.assertEqual(_snapshot(self.match), incremental)
+
+    def test_results_from_totals_match_event_replay(self):
+        self._mixed_events()
+        RefereeScore.objects.create(match=self.match, referee=self.refs[0], red_corner_score=1, blue_corner_score=5)
+
+        from_events = compute_match_results(self.match)
+        from_totals = compute_match_results_from_totals(self.match)
+
+        self.assertEqual(from_totals['per_ref'], from_events['per_ref'])
+        self.assertEqual(from_totals['central_penalties'], from_events['central_penalties'])
+        self.assertEqual(from_totals['central_penalties_by_round'], from_events['central_penalties_by_round'])
+        self.assertEqual(from_totals['match_winner'], from_events['match_winner'])
+
+    def test_delete_and_edit_update_totals(self):
+        event = RefereePointEvent.objects.create(match=self.match, referee=self.refs[1], side='red', points=3, event_type='score')
+        RefereePointEvent.objects.create(match=self.match, referee=self.refs[1], side='red', points=2, event_type='score')
+
+        event.points = 5
+        event.save()
+        row = RefereeRoundTotal.objects.get(match=self.match, referee=self.refs[1], round=1)
+        self.assertEqual((row.red, row.score_events), (7, 2))
+
+        event.delete()
+        row.refresh_from_db()
+        self.assertEqual((row.red, row.score_events), (2, 1))
+
+    def test_rerun_folds_processed_events(self):
+        for ref in self.refs[1:4]:
+            RefereePointEvent.objects.create(match=self.match, referee=ref, side='red', points=2, event_type='score')
+        call_command('aggregate_match_events', stdout=StringIO())
+
+        # A later event only arrives for one referee; the earlier, already
+        # processed events must still count towards that referee's total.
+        RefereePointEvent.objects.create(match=self.match, referee=self.refs[1], side='blue', points=1, event_type='score')
+        call_command('aggregate_match_events', stdout=StringIO())
+
+        score = RefereeScore.objects.get(match=self.match, referee=self.refs[1])
+        self.assertEqual((score.red_corner_score, score.blue_corner_score, score.winner), (2, 1, 'red'))
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.winner, self.match.red_corner)
+
+    def test_rebuild_command_repairs_totals(self):
+        self._mixed_events()
+        expected = _snapshot(self.match)
+        RefereeRoundTotal.objects.filter(match=self.match).update(red=0, blue=0)
+
+        out = StringIO()
+        call_command('rebuild_match_totals', match=[self.match.pk], stdout=out)
+
+        self.assertIn('Rebuilt', out.getvalue())
+        self.assertEqual(_snapshot(self.match), expected)
@@ -0,0 +1,73 @@
+import random
+from unittest import skipIf
+from django.test import TestCase
+from api.models import Athlete, Match, Category, RefereePointEvent, RefereeScore
+from api.scoring import compute_match_results
+from api.scoring_batch import compute_results_batch, np
+
+
+def _normalized(result):
+    return {
+        'per_ref': result['per_ref'],
+        'referee_scores_data': sorted(result['referee_scores_data'], key=lambda row: row[0]),
+        'central_penalties': result['central_penalties'],
+        'central_penalties_by_round': dict(result['central_penalties_by_round']),
+        'match_winner': result['match_winner'],
+        'votes': result['votes'],
+    }
+
+
+class BatchScoringEquivalenceTests(TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.refs = [Athlete.objects.create(first_name=f'Ref{i}', last_name='Ref', is_referee=True) for i in range(6)]
+        cat = Category.objects.create(name='BatchScoringCat')
+        self.match_ids = []
+        for i in range(12):
+            red = Athlete.objects.create(first_name=f'Red{i}', last_name='R')
+            blue = Athlete.objects.create(first_name=f'Blue{i}', last_name='B')
+            match = Match.objects.create(
+                category=cat, match_type='qualifications', red_corner=red, blue_corner=blue,
+                central_referee=self.refs[0] if i % 3 else None,
+            )
+            panel = self.refs[:5]
+            for _ in range(rng.randint(0, 40)):
+                metadata = {}
+                if rng.random() < 0.7:
+                    metadata['round'] = rng.randint(1, 3)
+                if rng.random() < 0.1:
+                    metadata['central'] = True
+                RefereePointEvent.objects.create(
+                    match=match,
+                    referee=rng.choice(panel),
+                    side=rng.choice(['red', 'blue']),
+                    points=rng.randint(-3, 5),
+                    event_type=rng.choice(['score', 'score', 'score', 'penalty', 'deduction']),
+                    metadata=metadata or None,
+                )
+            if i % 4 == 0:
+                # manual score for a referee without events, plus one that is shadowed by events
+                RefereeScore.objects.create(match=match, referee=self.refs[5], red_corner_score=rng.randint(0, 9), blue_corner_score=rng.randint(0, 9))
+                RefereeScore.objects.create(match=match, referee=self.refs[1], red_corner_score=99, blue_corner_score=0)
+            self.match_ids.append(match.pk)
+
+    def assert_equivalent(self, use_numpy):
+        batch = compute_results_batch(self.match_ids, use_numpy=use_numpy)
+        self.assertEqual(set(batch), set(self.match_ids))
+        for match in Match.objects.filter(pk__in=self.match_ids):
+            self.assertEqual(_normalized(batch[match.pk]), _normalized(compute_match_results(match)), f'match {match.pk}')
+
+    @skipIf(np is None, 'NumPy is not installed')
+    def test_vectorized_matches_scalar(self):
+        self.assert_equivalent(use_numpy=True)
+
+    def test_scalar_fallback_matches_scalar(self):
+        self.assert_equivalent(use_numpy=False)
+
+    @skipIf(np is None, 'NumPy is not installed')
+    def test_matches_without_events(self):
+        cat = Category.objects.create(name='Empty')
+        match = Match.objects.create(category=cat, red_corner=self.refs[1], blue_corner=self.refs[2])
+        result = compute_results_batch([match.pk], use_numpy=True)[match.pk]
+        self.assertEqual(result['per_ref'], {})
+        self.assertIsNone(result['match_winner'])
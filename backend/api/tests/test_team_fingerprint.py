@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Athlete, Category, CategoryAthleteScore, CategoryTeam, Competition, Team, TeamMember
+
+
+class TeamFingerprintTests(TestCase):
+    def setUp(self):
+        self.athletes = [Athlete.objects.create(first_name=f'A{i}', last_name='L') for i in range(4)]
+        self.category = Category.objects.create(name='Teams', type='teams', competition=Competition.objects.create(name='Cup'))
+
+    def make_team(self, athletes, category=None):
+        team = Team.objects.create(name='')
+        for athlete in athletes:
+            TeamMember.objects.create(team=team, athlete=athlete)
+        if category is not None:
+            CategoryTeam.objects.create(category=category, team=team)
+        return team
+
+    def test_fingerprint_follows_members(self):
+        a = self.athletes
+        team = self.make_team([a[1], a[0]])
+        team.refresh_from_db()
+        self.assertEqual(team.member_fingerprint, Team.fingerprint_for([a[0].pk, a[1].pk]))
+
+        TeamMember.objects.create(team=team, athlete=a[2])
+        team.refresh_from_db()
+        self.assertEqual(team.member_fingerprint, Team.fingerprint_for([a[2].pk, a[1].pk, a[0].pk]))
+
+        TeamMember.objects.filter(team=team).delete()
+        team.refresh_from_db()
+        self.assertEqual(team.member_fingerprint, '')
+
+    def test_find_by_members(self):
+        a = self.athletes
+        elsewhere = self.make_team([a[0], a[1]])
+        enrolled = self.make_team([a[0], a[1]], category=self.category)
+        self.make_team([a[0], a[1], a[2]], category=self.category)
+
+        self.assertEqual(Team.find_by_members([a[1].pk, a[0].pk], category=self.category), enrolled)
+        self.assertEqual(Team.find_by_members([a[0].pk, a[1].pk]), elsewhere)
+        self.assertIsNone(Team.find_by_members([a[3].pk], category=self.category))
+        self.assertIsNone(Team.find_by_members([]))
+
+    def test_award_reuses_team_with_one_lookup(self):
+        a = self.athletes
+        existing = self.make_team([a[0], a[1]], category=self.category)
+        for i in range(5):
+            self.make_team([a[2], a[i % 2]], category=self.category)
+
+        result = CategoryAthleteScore.objects.create(category=self.category, athlete=a[0], type='teams', placement_claimed='1st')
+        result.team_members.add(a[0], a[1])
+        with CaptureQueriesContext(connection) as queries:
+            team = result._create_or_get_team_for_award()
+        self.assertEqual(team, existing)
+        self.assertEqual(len(queries), 2)  # team_members + the fingerprint lookup
+
+        # The approval path (`approve` -> `_update_category_awards`) reuses it too.
+        teams_before = Team.objects.count()
+        CategoryAthleteScore.objects.get(pk=result.pk)._update_category_awards()
+        self.assertEqual(Team.objects.count(), teams_before)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.first_place_team, existing)
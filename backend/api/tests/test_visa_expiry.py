@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Athlete, Visa
+from api.visas import athletes_with_expiring_visa, expiring_visas, refresh_visa_statuses
+
+
+class VisaExpiryTests(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.athletes = [Athlete.objects.create(first_name=f'A{i}', last_name='L') for i in range(4)]
+
+    def visa(self, athlete, visa_type, days_ago, **kwargs):
+        issued = self.today - timedelta(days=days_ago) if days_ago is not None else None
+        return Visa.objects.create(athlete=athlete, visa_type=visa_type, issued_date=issued, **kwargs)
+
+    def test_expires_on_is_stored_on_save(self):
+        medical = self.visa(self.athletes[0], 'medical', 10)
+        annual = self.visa(self.athletes[0], 'annual', 10)
+        self.assertEqual(medical.expires_on, medical.issued_date + timedelta(days=180))
+        self.assertEqual(annual.expires_on, annual.issued_date + timedelta(days=365))
+        self.assertTrue(medical.is_valid())
+        self.assertIsNone(self.visa(self.athletes[1], 'annual', None).expires_on)
+
+    def test_refresh_updates_only_stale_rows_in_one_statement_per_type(self):
+        a = self.athletes
+        medical = self.visa(a[0], 'medical', 175)
+        cleared = self.visa(a[1], 'medical', 400, health_status='approved')
+        annual = self.visa(a[2], 'annual', 360)
+        missing = self.visa(a[3], 'annual', None)
+        self.assertEqual(medical.visa_status, 'Valid')
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = refresh_visa_statuses(self.today)
+        self.assertEqual(updated, {'medical': 0, 'annual': 0})
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE')]), 2)
+
+        later = self.today + timedelta(days=10)
+        self.assertEqual(refresh_visa_statuses(later), {'medical': 1, 'annual': 1})
+        statuses = dict(Visa.objects.values_list('pk', 'visa_status'))
+        self.assertEqual(statuses, {medical.pk: 'Expired', cleared.pk: 'Valid', annual.pk: 'Expired', missing.pk: 'Not available'})
+
+        # Rows written around save() get their expiry filled in first.
+        Visa.objects.filter(pk=missing.pk).update(issued_date=self.today, expires_on=None)
+        out = StringIO()
+        call_command('refresh_visa_statuses', '--date', later.isoformat(), stdout=out)
+        self.assertIn('(0 medical, 1 annual updated)', out.getvalue())
+        self.assertEqual(Visa.objects.get(pk=missing.pk).visa_status, 'Valid')
+
+    def test_expiring_queries(self):
+        a = self.athletes
+        soon = self.visa(a[0], 'medical', 170)      # expires in 10 days
+        self.visa(a[1], 'medical', 170)             # expires in 10 days, but renewed
+        self.visa(a[1], 'medical', 0)
+        self.visa(a[2], 'medical', 100)             # expires in 80 days
+        self.visa(a[3], 'annual', 355)              # other type
+        self.visa(a[3], 'medical', 200)             # already expired
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([v.pk for v in expiring_visas('medical', within_days=30)][:1], [soon.pk])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(expiring_visas('medical', within_days=30)), 2)
+        self.assertEqual(list(athletes_with_expiring_visa('medical', within_days=30)), [a[0]])
+        self.assertEqual(set(athletes_with_expiring_visa('medical', within_days=90)), {a[0], a[2]})
+        self.assertEqual(list(athletes_with_expiring_visa('annual')), [a[3]])
@@ -19,6 +19,7 @@ router.register('teams', TeamViewSet, basename='team')
 router.register('matches', MatchViewSet, basename='match')
 router.register('annual-visas', AnnualVisaViewSet, basename='annual-visa')
 router.register('categories', CategoryViewSet, basename='category')
+router.register('medals', MedalTableViewSet, basename='medal')
 router.register('category-athletes', CategoryAthleteViewSet, basename='category-athlete')
 router.register('grade-histories', GradeHistoryViewSet, basename='grade-history')
 router.register('medical-visas', MedicalVisaViewSet, basename='medical-visa')
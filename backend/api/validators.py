@@ -8,6 +8,25 @@ except Exception:
     jsonschema = None
     JSONSchemaValidationError = Exception
 
+_metadata_validator = None
+
+
+def get_metadata_validator():
+    """Return a compiled jsonschema validator for event metadata (built once).
+
+    `jsonschema.validate` re-checks the schema and rebuilds a validator on
+    every call; batch ingestion validates hundreds of payloads per request.
+    Returns None when jsonschema isn't installed.
+    """
+    global _metadata_validator
+    if jsonschema is None:
+        return None
+    if _metadata_validator is None:
+        cls = jsonschema.validators.validator_for(REFEREE_POINT_EVENT_METADATA_SCHEMA)
+        cls.check_schema(REFEREE_POINT_EVENT_METADATA_SCHEMA)
+        _metadata_validator = cls(REFEREE_POINT_EVENT_METADATA_SCHEMA)
+    return _metadata_validator
+
 
 def validate_referee_point_event_metadata(data):
     """Validate the metadata JSON for a RefereePointEvent.
@@ -21,7 +40,8 @@ def validate_referee_point_event_metadata(data):
     if not isinstance(data, dict):
         raise ValidationError('metadata must be a JSON object')
 
-    if jsonschema is None:
+    validator = get_metadata_validator()
+    if validator is None:
         # Fallback lightweight checks when jsonschema isn't installed.
         # Best-effort validation of common keys.
         rd = data.get('round')
@@ -36,8 +56,7 @@ def validate_referee_point_event_metadata(data):
             raise ValidationError("'reason' must be a string")
         return
 
-    try:
-        jsonschema.validate(instance=data, schema=REFEREE_POINT_EVENT_METADATA_SCHEMA)
-    except JSONSchemaValidationError as e:
+    error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+    if error is not None:
         # Convert jsonschema error into Django ValidationError with a concise message
-        raise ValidationError(f"metadata schema error: {e.message}")
+        raise ValidationError(f"metadata schema error: {error.message}")
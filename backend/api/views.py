@@ -9,6 +9,10 @@ from rest_framework.exceptions import ValidationError
 from .serializers import *
 from .models import *
 from .permissions import IsAdminOrReadOnly, IsAdmin, IsOwnerOrAdmin
+from .pagination import AthletePageNumberPagination, MatchCursorPagination, ResultLinkCursorPagination, wants_full_list
+from .read_models import category_read_model
+from .result_links import athlete_result_links, results_for_links
+from .search import search_athletes
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from django.conf import settings
@@ -180,7 +184,8 @@ class ClubViewSet(viewsets.ViewSet):
             return Response({'detail': 'Not found.'}, status=404)
 
         if request.method == 'GET':
-            events = match.point_events.all().order_by('timestamp')
+            from .archive import load_match_events
+            events = load_match_events(match)
             serializer = RefereePointEventSerializer(events, many=True)
             return Response(serializer.data)
 
@@ -203,11 +208,39 @@ class AthleteViewSet(viewsets.ModelViewSet):
     queryset = Athlete.objects.all()
     serializer_class = AthleteSerializer
     permission_classes = [AllowAny]
+    pagination_class = AthletePageNumberPagination
+
+    def _projection(self, request):
+        """`fields`/`expand` serializer kwargs from `?fields=a,b` and `?expand=club,...`; raises ValueError."""
+        kwargs = {}
+        for param, allowed in (('fields', AthleteSerializer.field_names()), ('expand', AthleteSerializer.EXPANDABLE)):
+            raw = request.query_params.get(param)
+            if raw is None:
+                continue
+            names = [name.strip() for name in raw.split(',') if name.strip()]
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                raise ValueError(f"Unknown {param}: {', '.join(unknown)}. Choose from: {', '.join(allowed)}")
+            kwargs[param] = names
+        return kwargs
 
     def list(self, request):
-        # Support optional filtering by coach status and simple search
+        """List athletes, optionally filtered by `?is_coach=` and searched with `?q=`.
+
+        `?fields=` and `?expand=` select a sparse projection (see
+        `AthleteSerializer`). The response is a page (`{count, next,
+        previous, results}`, 50 athletes unless `?page_size=` says
+        otherwise); `?all=1` returns the plain list of every athlete. Related
+        rows are joined up front, so the query count does not grow with the
+        number of athletes.
+        """
+        try:
+            projection = self._projection(request)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=400)
+
         is_coach = request.query_params.get('is_coach')
-        queryset = Athlete.objects.all()
+        queryset = Athlete.objects.select_related(*AthleteSerializer.RELATED)
         if is_coach is not None:
             if str(is_coach).lower() in ('1', 'true', 'yes'):
                 queryset = queryset.filter(is_coach=True)
@@ -216,9 +249,16 @@ class AthleteViewSet(viewsets.ModelViewSet):
 
         q = request.query_params.get('q')
         if q:
-            queryset = queryset.filter(models.Q(first_name__icontains=q) | models.Q(last_name__icontains=q))
-
-        serializer = self.serializer_class(queryset, many=True)
+            queryset = search_athletes(queryset, q)
+
+        if not wants_full_list(request):
+            if not queryset.ordered:
+                queryset = queryset.order_by('last_name', 'first_name', 'pk')
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.serializer_class(page, many=True, **projection)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = self.serializer_class(queryset, many=True, **projection)
         return Response(serializer.data)
 
     def retrieve(self, request, pk=None):
@@ -357,7 +397,7 @@ class CoachesViewSet(viewsets.ViewSet):
         queryset = Athlete.objects.filter(is_coach=True)
         q = request.query_params.get('q')
         if q:
-            queryset = queryset.filter(models.Q(first_name__icontains=q) | models.Q(last_name__icontains=q))
+            queryset = search_athletes(queryset, q)
         # Use a minimal serializer to keep payload small
         serializer = CoachSimpleSerializer(queryset, many=True)
         return Response(serializer.data)
@@ -556,11 +596,72 @@ class TeamViewSet(viewsets.ViewSet):
 
 class MatchViewSet(viewsets.ViewSet):
     permission_classes = [IsAdminOrReadOnly]
-    queryset = Match.objects.all()
+    # Everything MatchSerializer reads, loaded in a fixed number of queries
+    # regardless of how many matches are serialized.
+    queryset = Match.objects.select_related(
+        'category', 'red_corner__club', 'blue_corner__club', 'central_referee', 'winner', 'event_archive'
+    ).defer('event_archive__data').prefetch_related('referees', 'point_events__referee', 'referee_scores')
     serializer_class = MatchSerializer
+    pagination_class = MatchCursorPagination
+
+    # query param -> lookup; `athlete_id` is kept for older frontend calls
+    ID_FILTERS = {
+        'category': 'category_id',
+        'event': 'category__event_id',
+        'athlete': None,
+        'athlete_id': None,
+        'referee': None,
+    }
+
+    def filter_queryset(self, request, queryset):
+        """Apply the supported `?category=&event=&match_type=&athlete=&referee=` filters.
+
+        Raises ValueError with the parameter name when an id is not an integer.
+        """
+        params = request.query_params
+        values = {}
+        for name in self.ID_FILTERS:
+            raw = params.get(name)
+            if raw in (None, ''):
+                continue
+            try:
+                values[name] = int(raw)
+            except (TypeError, ValueError):
+                raise ValueError(name)
+
+        for name, lookup in self.ID_FILTERS.items():
+            if lookup and name in values:
+                queryset = queryset.filter(**{lookup: values[name]})
+        match_type = params.get('match_type')
+        if match_type:
+            queryset = queryset.filter(match_type=match_type)
+        athlete_id = values.get('athlete', values.get('athlete_id'))
+        if athlete_id is not None:
+            queryset = queryset.filter(models.Q(red_corner_id=athlete_id) | models.Q(blue_corner_id=athlete_id))
+        referee_id = values.get('referee')
+        if referee_id is not None:
+            # Subquery instead of a join on the m2m table so rows are not duplicated.
+            panel = Match.referees.through.objects.filter(athlete_id=referee_id).values('match_id')
+            queryset = queryset.filter(models.Q(pk__in=panel) | models.Q(central_referee_id=referee_id))
+        return queryset
 
     def list(self, request):
-        queryset = Match.objects.all()
+        """List matches, optionally filtered.
+
+        The response is a cursor page (`{next, previous, results}`, 50
+        matches unless `?page_size=` says otherwise); `?all=1` returns the
+        plain list of every match. Either way the prefetch plan above keeps
+        the query count independent of the number of matches returned.
+        """
+        try:
+            queryset = self.filter_queryset(request, self.queryset.all())
+        except ValueError as e:
+            return Response({str(e): ['A valid integer is required.']}, status=400)
+        if not wants_full_list(request):
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = self.serializer_class(queryset, many=True)
         return Response(serializer.data)
 
@@ -588,7 +689,104 @@ class MatchViewSet(viewsets.ViewSet):
         instance = self.queryset.get(pk=pk)
         instance.delete()
         return Response(status=204)
-    
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminOrReadOnly])
+    def stream(self, request, pk=None):
+        """Server-Sent Events stream of the live scoreboard for a match.
+
+        Sends a `snapshot` event first (per-referee round totals, central
+        penalties, votes and current winner) and then compact `delta` events
+        only when the score changes. The stream closes after a minute and
+        EventSource clients reconnect automatically. Without
+        LIVE_SCORE_STREAMING (sync workers) only the snapshot is sent and the
+        client polls.
+        """
+        from django.http import StreamingHttpResponse
+        from .live import event_stream, single_snapshot, streaming_enabled
+
+        if not Match.objects.filter(pk=pk).exists():
+            return Response({'detail': 'Not found.'}, status=404)
+        chunks = event_stream(int(pk)) if streaming_enabled() else single_snapshot(int(pk))
+        response = StreamingHttpResponse(chunks, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=True, methods=['get'], url_path='score-at', permission_classes=[IsAdminOrReadOnly])
+    def score_at(self, request, pk=None):
+        """Scoreboard of a match as it stood at a point in time.
+
+        Query with `?at=<ISO datetime>`, or `?round=<n>&elapsed=<seconds|mm:ss>`
+        for a moment relative to the first event of that round. The state is
+        replayed from the nearest score snapshot plus the events after it.
+        """
+        from datetime import timedelta
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+        from .live import scoreboard
+        from .snapshots import round_started_at, score_at
+
+        match = Match.objects.filter(pk=pk).select_related('red_corner', 'blue_corner').first()
+        if match is None:
+            return Response({'detail': 'Not found.'}, status=404)
+
+        params = request.query_params
+        if params.get('at'):
+            at = parse_datetime(params['at'])
+            if at is None:
+                return Response({'at': 'Expected an ISO 8601 datetime.'}, status=400)
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        elif params.get('round'):
+            try:
+                rd = int(params['round'])
+                elapsed = params.get('elapsed', '0')
+                minutes, _, seconds = elapsed.rpartition(':')
+                offset = int(minutes or 0) * 60 + float(seconds)
+            except ValueError:
+                return Response({'detail': 'round must be an integer and elapsed seconds or mm:ss.'}, status=400)
+            started = round_started_at(match, rd)
+            if started is None:
+                return Response({'round': f'Round {rd} has no events.'}, status=400)
+            at = started + timedelta(seconds=offset)
+        else:
+            return Response({'detail': 'Pass at=<datetime> or round=<n>[&elapsed=<seconds|mm:ss>].'}, status=400)
+
+        results = score_at(match, at)
+        snapshot = results['snapshot']
+        data = scoreboard(match, results)
+        data.update({
+            'at': at.isoformat(),
+            'snapshot': {'event_count': snapshot.event_count, 'last_event_at': snapshot.last_event_at.isoformat()} if snapshot else None,
+            'replayed_events': results['replayed'],
+        })
+        return Response(data)
+
+    @action(detail=False, methods=['post'], url_path='point-events/batch', permission_classes=[IsAdminOrReadOnly])
+    def point_events_batch(self, request):
+        """Create a batch of referee point events for one or more matches.
+
+        Accepts a JSON array of events (or {"events": [...]}) shaped like the
+        single-event `point_events` payload, each with its own `match`. Items
+        whose `external_id` was already ingested are reported as duplicates, so
+        clients can safely resend a batch that was not acknowledged.
+        """
+        from .ingestion import MAX_BATCH_SIZE, ingest_point_events
+
+        items = request.data.get('events') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Expected a list of events.'}, status=400)
+        if len(items) > MAX_BATCH_SIZE:
+            return Response({'detail': f'At most {MAX_BATCH_SIZE} events per batch.'}, status=400)
+
+        user = request.user if getattr(request, 'user', None) and request.user.is_authenticated else None
+        results = ingest_point_events(items, created_by=user)
+        counts = {'created': 0, 'duplicate': 0, 'invalid': 0}
+        for result in results:
+            counts[result['status']] += 1
+        return Response({'results': results, **counts}, status=200)
+
 class AnnualVisaViewSet(viewsets.ViewSet):
     permission_classes = [IsAdminOrReadOnly]
     # Use the unified Visa model under the hood (filter by type) so the
@@ -648,9 +846,8 @@ class CategoryViewSet(viewsets.ViewSet):
         return Category.objects.all()
 
     def list(self, request):
-        queryset = self.get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        # Same payload as CategorySerializer, built with a fixed number of queries.
+        return Response(category_read_model(self.get_queryset()))
 
     def create(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -661,42 +858,166 @@ class CategoryViewSet(viewsets.ViewSet):
 
     def retrieve(self, request, pk=None):
         instance = self.get_queryset().get(pk=pk)
-        serializer = self.serializer_class(instance)
-        return Response(serializer.data)
+        return Response(category_read_model([instance])[0])
     
+    @action(detail=True, methods=['get'])
+    def ranking(self, request, pk=None):
+        """Live ranking of a solo or teams category from the referee scores.
+
+        Optional `?drop_highest=`/`?drop_lowest=` (scores dropped per competitor),
+        `?rank_by=total|average` and `?tiebreakers=average,highest,lowest`
+        (also `total`, `count`). Cached until the next score write.
+        """
+        from .rankings import rank_category
+
+        category = Category.objects.filter(pk=pk).select_related('ranking_version').first()
+        if category is None:
+            return Response({'detail': 'Not found.'}, status=404)
+        if category.type not in ('solo', 'teams'):
+            return Response({'detail': 'Rankings are only available for solo and teams categories.'}, status=400)
+
+        params = request.query_params
+        try:
+            drops = {name: int(params[name]) for name in ('drop_highest', 'drop_lowest') if params.get(name)}
+        except ValueError:
+            return Response({'detail': 'drop_highest and drop_lowest must be integers.'}, status=400)
+        if any(value < 0 for value in drops.values()):
+            return Response({'detail': 'drop_highest and drop_lowest must not be negative.'}, status=400)
+        options = {'rank_by': params.get('rank_by', 'total')}
+        if 'tiebreakers' in params:
+            options['tiebreakers'] = [t for t in params['tiebreakers'].split(',') if t]
+        try:
+            return Response(rank_category(category, **drops, **options))
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=400)
+
+    @action(detail=True, methods=['get'])
+    def pools(self, request, pk=None):
+        """Round-robin pool tables of a fight category (wins, head-to-head, point difference)."""
+        from .pools import pool_tables
+
+        if not Category.objects.filter(pk=pk).exists():
+            return Response({'detail': 'Not found.'}, status=404)
+        return Response({'category': int(pk), 'pools': pool_tables([int(pk)]).get(int(pk), [])})
+
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def eligible_athletes(self, request, pk=None):
         """
-        Get list of athletes eligible to enroll in this category based on gender.
-        Categories with gender='mixt' return all athletes.
-        Male/female categories return only athletes with matching gender.
+        Athletes who may enroll in this category, checked in one query against
+        its rules on the event date: approval, gender, age, grade, valid visas,
+        not already enrolled (see api/eligibility.py).
+
+        ?athletes=1,2,3 checks only those athletes; ?include_ineligible=1 also
+        returns the athletes that fail, with the reason codes of every failed rule.
         """
-        category = self.get_queryset().get(pk=pk)
-        
-        # Get all approved athletes
-        athletes_queryset = Athlete.objects.filter(status='approved')
-        
-        # Filter by gender if category is not mixed
-        if category.gender != 'mixt':
-            athletes_queryset = athletes_queryset.filter(gender=category.gender)
-        
-        # Exclude already enrolled athletes
-        enrolled_athlete_ids = CategoryAthlete.objects.filter(
-            category=category
-        ).values_list('athlete_id', flat=True)
-        athletes_queryset = athletes_queryset.exclude(id__in=enrolled_athlete_ids)
-        
-        serializer = AthleteSerializer(athletes_queryset, many=True, context={'request': request})
-        return Response({
+        from .eligibility import REASONS, evaluate, event_date
+
+        try:
+            category = Category.objects.select_related('event', 'competition', 'min_grade', 'max_grade').get(pk=pk)
+        except Category.DoesNotExist:
+            return Response({'detail': 'Not found.'}, status=404)
+        athlete_ids = None
+        if request.query_params.get('athletes'):
+            try:
+                athlete_ids = [int(v) for v in request.query_params['athletes'].split(',') if v.strip()]
+            except ValueError:
+                return Response({'athletes': ['A comma-separated list of integers is required.']}, status=400)
+        include_ineligible = str(request.query_params.get('include_ineligible', '')).lower() in ('1', 'true', 'yes')
+
+        rows = evaluate(category, athlete_ids, only_eligible=not include_ineligible)
+        response = {
             'category': {
                 'id': category.id,
                 'name': category.name,
                 'gender': category.gender,
-                'type': category.type
+                'type': category.type,
+                'event_date': event_date(category),
             },
-            'eligible_athletes': serializer.data,
-            'count': athletes_queryset.count()
-        })
+            'eligible_athletes': [row for row in rows if row['eligible']],
+            'count': sum(1 for row in rows if row['eligible']),
+        }
+        if include_ineligible:
+            response['ineligible_athletes'] = [row for row in rows if not row['eligible']]
+            response['reasons'] = REASONS
+        return Response(response)
+
+    @action(detail=False, methods=['post'], url_path='auto-categorize')
+    def auto_categorize(self, request):
+        """
+        Place an event's registered athletes (approved participations) into
+        categories by gender, age bracket and grade range, creating missing
+        categories (see api/autocategorize.py for the rule format).
+
+        Body: {"event", "rules", "athletes"?: [...], "commit"?: false}. Returns
+        the planned changes; they are only written with "commit": true.
+        """
+        from landing.models import Event
+
+        from .autocategorize import autocategorize, parse_rules
+
+        data = request.data if isinstance(request.data, dict) else {}
+        event = Event.objects.filter(pk=data.get('event')).first() if str(data.get('event', '')).isdigit() else None
+        if event is None:
+            return Response({'event': ['A valid event ID is required.']}, status=400)
+        try:
+            rules = parse_rules(data.get('rules'))
+        except ValueError as e:
+            return Response({'rules': [str(e)]}, status=400)
+        athlete_ids = data.get('athletes')
+        if athlete_ids is not None and (
+            not isinstance(athlete_ids, list) or not all(isinstance(v, int) and not isinstance(v, bool) for v in athlete_ids)
+        ):
+            return Response({'athletes': ['A list of athlete IDs is required.']}, status=400)
+        commit = data.get('commit') in (True, 1, '1', 'true')
+        return Response(autocategorize(event, rules, athlete_ids, commit=commit), status=201 if commit else 200)
+
+
+class MedalTableViewSet(viewsets.ViewSet):
+    """
+    Medal tables, kept up to date as podiums change and results are approved.
+
+    ?scope=event_club|season_club|season_athlete (default season_club), filtered
+    by ?event=, ?season=, ?club= and ?athlete=; ?limit= rows (default 100, max 1000).
+    """
+    permission_classes = [IsAdminOrReadOnly]
+    SCOPES = {
+        'event_club': (EventClubMedals, ('event', 'club')),
+        'season_club': (SeasonClubMedals, ('season', 'club')),
+        'season_athlete': (SeasonAthleteMedals, ('season', 'athlete')),
+    }
+
+    def list(self, request):
+        scope = request.query_params.get('scope', 'season_club')
+        if scope not in self.SCOPES:
+            return Response({'detail': f"scope must be one of: {', '.join(self.SCOPES)}"}, status=400)
+        model, keys = self.SCOPES[scope]
+        queryset = model.objects.select_related(*[k for k in keys if k != 'season'])
+
+        filters = {}
+        for key in keys:
+            value = request.query_params.get(key)
+            if value:
+                if not value.isdigit():
+                    return Response({'detail': f'{key} must be an integer'}, status=400)
+                filters[key if key == 'season' else f'{key}_id'] = int(value)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 1000)
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=400)
+
+        rows = []
+        for row in queryset.filter(**filters).order_by('-gold', '-silver', '-bronze', 'pk')[:limit]:
+            data = {'gold': row.gold, 'silver': row.silver, 'bronze': row.bronze, 'total': row.total}
+            if 'season' in keys:
+                data['season'] = row.season
+            if 'event' in keys:
+                data.update(event=row.event_id, event_name=row.event.title)
+            if 'club' in keys:
+                data.update(club=row.club_id, club_name=row.club.name)
+            if 'athlete' in keys:
+                data.update(athlete=row.athlete_id, athlete_name=f'{row.athlete.first_name} {row.athlete.last_name}')
+            rows.append(data)
+        return Response({'scope': scope, 'results': rows})
 
 
 class CategoryAthleteViewSet(viewsets.ViewSet):
@@ -726,6 +1047,32 @@ class CategoryAthleteViewSet(viewsets.ViewSet):
         serializer = self.serializer_class(instance)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='bulk', permission_classes=[IsAdminOrReadOnly])
+    def bulk(self, request):
+        """Enroll athletes and/or teams into one or more categories.
+
+        Accepts a JSON array (or {"items": [...]}) of {"category", "athlete",
+        "weight"?} / {"category", "team"} items, or the shorthand
+        {"categories": [...], "athletes": [...], "teams": [...]} for every
+        combination. Each item is reported as created, duplicate (already
+        enrolled or repeated) or invalid with its errors; `?dry_run=1`
+        validates without writing.
+        """
+        from .enrollment import MAX_BATCH_SIZE, enroll, expand_payload
+
+        items = expand_payload(request.data)
+        if items is None:
+            return Response({'detail': 'Expected a list of enrollments or {"categories", "athletes", "teams"}.'}, status=400)
+        if len(items) > MAX_BATCH_SIZE:
+            return Response({'detail': f'At most {MAX_BATCH_SIZE} enrollments per batch.'}, status=400)
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        results = enroll(items, dry_run=dry_run)
+        counts = {'valid' if dry_run else 'created': 0, 'duplicate': 0, 'invalid': 0}
+        for result in results:
+            counts[result['status']] += 1
+        return Response({'results': results, **counts}, status=200)
+
 
 # FrontendTheme API removed — this viewset was intentionally deleted to disable theme management via the API.
 
@@ -898,6 +1245,23 @@ class GroupViewSet(viewsets.ViewSet):
         instance.delete()
         return Response(status=204)
 
+    @action(detail=True, methods=['get'])
+    def pools(self, request, pk=None):
+        """Pool tables of every category in the group."""
+        from .pools import pool_tables
+
+        if not Group.objects.filter(pk=pk).exists():
+            return Response({'detail': 'Not found.'}, status=404)
+        categories = list(Category.objects.filter(group_id=pk).order_by('pk').values_list('pk', 'name'))
+        tables = pool_tables([category_id for category_id, _ in categories])
+        return Response({
+            'group': int(pk),
+            'categories': [
+                {'category': category_id, 'name': name, 'pools': tables[category_id]}
+                for category_id, name in categories if category_id in tables
+            ],
+        })
+
 @api_view(['GET'])
 def api_root(request, format=None):
     """
@@ -1319,8 +1683,7 @@ def categories_list(request):
     """Get list of available categories."""
     try:
         categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return Response(category_read_model(categories))
     except Exception as e:
         # Return empty list if no categories exist
         return Response([])
@@ -1499,14 +1862,8 @@ class CategoryAthleteScoreViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get results submitted by this athlete OR team results where they are a member
-        scores = CategoryAthleteScore.objects.filter(
-            models.Q(athlete=request.user.athlete, submitted_by_athlete=True) |  # Individual results they submitted
-            models.Q(team_members=request.user.athlete, type='teams')     # Team results they're part of
-        ).select_related('category__competition', 'reviewed_by', 'athlete').prefetch_related('team_members').distinct()
-        
-        serializer = self.get_serializer(scores, many=True)
-        return Response(serializer.data)
+        # Results submitted by this athlete OR team results where they are a member
+        return self._linked_results(request, athlete_result_links(request.user.athlete.pk, scope='submitted'))
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def all_results(self, request):
@@ -1532,23 +1889,17 @@ class CategoryAthleteScoreViewSet(viewsets.ModelViewSet):
                 )
             target_athlete = request.user.athlete
         
-        # Get results for the target athlete with visibility rules:
-        # 1. Individual results where they are the athlete 
-        # 2. Team results where they are a team member
-        base_query = CategoryAthleteScore.objects.filter(
-            models.Q(athlete=target_athlete) |                              # All individual results (official + submitted)
-            models.Q(team_members=target_athlete, type='teams')      # All team results they're part of
-        ).select_related('category__competition', 'reviewed_by', 'athlete').prefetch_related('team_members').distinct()
-        
+        # Results for the target athlete: individual results where they are the
+        # athlete plus team results where they are a team member.
         # Apply visibility rules based on authentication and status
         if athlete_id:
             # Viewing a specific athlete's profile
             if request.user.is_authenticated and hasattr(request.user, 'athlete') and request.user.athlete.id == int(athlete_id):
                 # User viewing their own profile - show all results
-                scores = base_query
+                links = athlete_result_links(target_athlete.pk)
             else:
                 # User viewing someone else's profile (or unauthenticated) - only show approved results
-                scores = base_query.filter(status='approved')
+                links = athlete_result_links(target_athlete.pk, status='approved')
         else:
             # Viewing current user's own results via my-profile - requires authentication
             if not request.user.is_authenticated:
@@ -1557,10 +1908,9 @@ class CategoryAthleteScoreViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             # User viewing their own results via my-profile - show all results
-            scores = base_query
-        
-        serializer = self.get_serializer(scores, many=True)
-        return Response(serializer.data)
+            links = athlete_result_links(target_athlete.pk)
+
+        return self._linked_results(request, links)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAdmin])
     def pending_review(self, request):
@@ -1581,13 +1931,22 @@ class CategoryAthleteScoreViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get team results where user is submitter or team member
-        team_scores = CategoryAthleteScore.objects.filter(
-            models.Q(athlete=request.user.athlete, type='teams') |
-            models.Q(team_members=request.user.athlete, type='teams')
-        ).select_related('category__competition', 'reviewed_by').prefetch_related('team_members').distinct()
-        
-        serializer = self.get_serializer(team_scores, many=True)
+        # Team results where user is submitter or team member
+        return self._linked_results(request, athlete_result_links(request.user.athlete.pk, scope='teams'))
+
+    def _linked_results(self, request, links):
+        """Serialize the results behind an athlete's index links.
+
+        Pass `?page_size=` or `?cursor=` for keyset-paginated pages
+        (`{next, previous, results}`); otherwise the plain list is returned.
+        """
+        queryset = CategoryAthleteScore.objects.select_related('category__competition', 'reviewed_by', 'athlete').prefetch_related('team_members')
+        if 'cursor' in request.query_params or 'page_size' in request.query_params:
+            paginator = ResultLinkCursorPagination()
+            page = paginator.paginate_queryset(links, request, view=self)
+            serializer = self.get_serializer(results_for_links(page, queryset), many=True)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(results_for_links(links, queryset), many=True)
         return Response(serializer.data)
 
 
@@ -0,0 +1,87 @@
+"""Visa expiry: bulk status refresh and expiring-visa queries.
+
+`Visa.expires_on` stores the last valid day (issue date plus the type's
+`Visa.VALIDITY_DAYS`) and is indexed together with `visa_type`, so expiry
+questions are answered by one range query on that index instead of
+computing `is_valid()` per visa in Python.
+
+`visa_status` is written by `Visa.save()`, which only runs when a visa is
+edited; `refresh_visa_statuses` (run nightly by the
+`refresh_visa_statuses` command) applies the same rules with one `UPDATE`
+per visa type, touching only the rows whose status changed:
+
+- medical visas with `health_status='approved'` are 'Valid';
+- visas without an issue date are 'Not available';
+- otherwise 'Valid' until `expires_on`, then 'Expired'.
+"""
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from django.db.models import Case, CharField, Q, Value, When
+
+from .models import Athlete, Visa
+
+VALID = 'Valid'
+EXPIRED = 'Expired'
+NOT_AVAILABLE = 'Not available'
+
+
+def visa_status_expression(visa_type: str, today: date) -> Case:
+    """SQL expression computing `visa_status` for visas of `visa_type` on `today`."""
+    whens = []
+    if visa_type == 'medical':
+        whens.append(When(health_status='approved', then=Value(VALID)))
+    whens += [
+        When(issued_date__isnull=True, then=Value(NOT_AVAILABLE)),
+        When(expires_on__gte=today, then=Value(VALID)),
+    ]
+    return Case(*whens, default=Value(EXPIRED), output_field=CharField())
+
+
+def refresh_visa_statuses(today: Optional[date] = None) -> Dict[str, int]:
+    """Bring every stored `visa_status` up to date; returns {visa_type: rows updated}."""
+    today = today or date.today()
+    # Rows written around save() (queryset.update, raw imports) may lack expires_on.
+    missing = list(Visa.objects.filter(issued_date__isnull=False, expires_on__isnull=True).only('pk', 'visa_type', 'issued_date'))
+    for visa in missing:
+        visa.expires_on = Visa.expiry_for(visa.visa_type, visa.issued_date)
+    Visa.objects.bulk_update(missing, ['expires_on'], batch_size=1000)
+
+    updated = {}
+    for visa_type in Visa.VALIDITY_DAYS:
+        status = visa_status_expression(visa_type, today)
+        stale = Visa.objects.filter(visa_type=visa_type).filter(Q(visa_status__isnull=True) | ~Q(visa_status=status))
+        updated[visa_type] = stale.update(visa_status=status)
+    return updated
+
+
+def valid_visas(visa_type: str, on: date):
+    """Approved visas of `visa_type` valid on `on` (the `visa_status` rules evaluated for that day)."""
+    valid = Q(issued_date__lte=on, expires_on__gte=on)
+    if visa_type == 'medical':
+        valid |= Q(health_status='approved')
+    return Visa.objects.filter(valid, visa_type=visa_type, status='approved')
+
+
+def expiring_visas(visa_type: str, within_days: int = 30, today: Optional[date] = None):
+    """Approved visas of `visa_type` whose last valid day falls within the next `within_days` days."""
+    today = today or date.today()
+    return Visa.objects.filter(
+        visa_type=visa_type,
+        expires_on__range=(today, today + timedelta(days=within_days)),
+        status='approved',
+    ).select_related('athlete').order_by('expires_on', 'pk')
+
+
+def athletes_with_expiring_visa(visa_type: str, within_days: int = 30, today: Optional[date] = None):
+    """Athletes whose `visa_type` visa runs out within `within_days` days and who hold no later one.
+
+    For example `athletes_with_expiring_visa('medical')` lists the athletes
+    who need a new medical visa within a month.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=within_days)
+    renewed = Visa.objects.filter(visa_type=visa_type, expires_on__gt=horizon, status='approved').values('athlete_id')
+    return Athlete.objects.filter(
+        pk__in=expiring_visas(visa_type, within_days, today).values('athlete_id'),
+    ).exclude(pk__in=renewed)
@@ -299,6 +299,13 @@ STATICFILES_DIRS = [
 
 os.makedirs(os.path.join(BASE_DIR, 'static'), exist_ok=True)
 
+# Live scoreboard streams (api/live.py). An SSE stream holds a worker thread
+# for LIVE_SCORE_STREAM_MAX_SECONDS, so streaming is only switched on where
+# gunicorn runs threaded workers (entrypoint.sh, Procfile); sync workers get a
+# single snapshot and clients poll. Keep the cap below the worker --timeout.
+LIVE_SCORE_STREAMING = os.getenv('LIVE_SCORE_STREAMING', 'False') == 'True'
+LIVE_SCORE_STREAM_MAX_SECONDS = 60
+
 # JWT Configuration
 from datetime import timedelta
 
@@ -8,4 +8,8 @@ echo "Running database migrations..."
 python manage.py migrate --noinput --verbosity 1
 
 echo "Starting Gunicorn..."
-exec gunicorn crud.wsgi:application --bind 0.0.0.0:8000 --workers 2 --timeout 120
+# Threaded workers: live scoreboard streams (SSE) each hold a thread, not a
+# whole worker. Streams close after LIVE_SCORE_STREAM_MAX_SECONDS (60 s),
+# well inside the 120 s timeout.
+export LIVE_SCORE_STREAMING=${LIVE_SCORE_STREAMING:-True}
+exec gunicorn crud.wsgi:application --bind 0.0.0.0:8000 --workers 2 --worker-class gthread --threads 16 --timeout 120
@@ -44,4 +44,18 @@ counts = Visa.objects.values('visa_type').annotate(count=Count('id'))
 for row in counts:
     print(row['visa_type'], row['count'])
 
+# Stored status per type (refreshed nightly by `manage.py refresh_visa_statuses`)
+print('\n--- Counts by type and status ---')
+counts = Visa.objects.values('visa_type', 'visa_status').annotate(count=Count('id')).order_by('visa_type', 'visa_status')
+for row in counts:
+    print(row['visa_type'], row['visa_status'], row['count'])
+
+# One indexed range query per type on (visa_type, expires_on)
+from api.visas import athletes_with_expiring_visa, expiring_visas
+for visa_type in Visa.VALIDITY_DAYS:
+    print(f'\n--- {visa_type} visas expiring in the next 30 days ---')
+    for v in expiring_visas(visa_type, within_days=30):
+        print(f'ID={v.id}, athlete={v.athlete}, expires_on={v.expires_on}')
+    print('Athletes needing a renewal:', athletes_with_expiring_visa(visa_type, within_days=30).count())
+
 print('\nDone.')
@@ -20,7 +20,7 @@ const Athletes = () => {
   const GetData = async () => {
     try {
       // Fetch athletes
-      const response = await AxiosInstance.get("athletes/");
+      const response = await AxiosInstance.get("athletes/", { params: { all: 1 } });
       console.log("Athletes API Response:", response.data);
 
       // Fetch grades (clubs are now included in athlete response)
@@ -12,49 +12,74 @@ import AxiosInstance from "./Axios";
 import DeleteDialog from "./DeleteDialog";
 import { useAuth } from "../contexts/AuthContext";
 
+const PAGE_SIZE = 50;
+
 const Athletes = () => {
   const { isAdmin } = useAuth();
   const [myData, setMyData] = useState([]);
-  const [filteredData, setFilteredData] = useState([]);
-  const [grades, setGrades] = useState({});
+  const [grades, setGrades] = useState(null);
   const [openDialog, setOpenDialog] = useState(false);
   const [selectedAthlete, setSelectedAthlete] = useState(null);
   const [searchTerm, setSearchTerm] = useState("");
+  const [query, setQuery] = useState("");
+  const [page, setPage] = useState(1);
+  const [count, setCount] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const navigate = useNavigate();
 
+  const pageCount = Math.max(1, Math.ceil(count / PAGE_SIZE));
+
+  // Grades are a small lookup table; fetch them once.
+  useEffect(() => {
+    AxiosInstance.get("grades/")
+      .then((response) => {
+        setGrades(response.data.reduce((acc, grade) => {
+          acc[grade.id] = grade.name;
+          return acc;
+        }, {}));
+      })
+      .catch((error) => {
+        console.error("Error fetching grades:", error);
+        setGrades({});
+      });
+  }, []);
+
+  // Search on the server once typing pauses, starting again from page 1.
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setQuery(searchTerm.trim());
+      setPage(1);
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
   const GetData = async () => {
     try {
-      setLoading(true);
       setError(null);
-      
-      // Fetch athletes
-      const response = await AxiosInstance.get("athletes/");
-      console.log("Athletes API Response:", response.data);
-
-      // Fetch grades
-      const gradesResponse = await AxiosInstance.get("grades/");
-      console.log("Grades API Response:", gradesResponse.data);
 
-      // Map grade IDs to their names
-      const gradesMap = gradesResponse.data.reduce((acc, grade) => {
-        acc[grade.id] = grade.name;
-        return acc;
-      }, {});
-
-      setGrades(gradesMap);
+      // Fetch one page of athletes (only the columns the roster shows)
+      const params = {
+        fields: "id,first_name,last_name,club,current_grade,profile_image",
+        expand: "club",
+        page,
+        page_size: PAGE_SIZE,
+      };
+      if (query) {
+        params.q = query;
+      }
+      const response = await AxiosInstance.get("athletes/", { params });
 
       // Transform athlete data
-      const transformedData = response.data.map((athlete) => ({
+      const transformedData = response.data.results.map((athlete) => ({
         ...athlete,
         club: athlete.club?.name || "N/A",
-        grade: gradesMap[athlete.current_grade] || "N/A",
+        grade: grades[athlete.current_grade] || "N/A",
         full_name: `${athlete.first_name} ${athlete.last_name}`,
       }));
 
       setMyData(transformedData);
-      setFilteredData(transformedData);
+      setCount(response.data.count);
     } catch (error) {
       console.error("Error fetching data:", error);
       setError("Failed to load athletes data");
@@ -64,32 +89,22 @@ const Athletes = () => {
   };
 
   useEffect(() => {
-    GetData();
-  }, []);
-
-  // Filter data based on search term
-  useEffect(() => {
-    if (!searchTerm) {
-      setFilteredData(myData);
-    } else {
-      const filtered = myData.filter((athlete) =>
-        athlete.full_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        athlete.club.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        athlete.grade.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-      setFilteredData(filtered);
+    if (grades !== null) {
+      GetData();
     }
-  }, [searchTerm, myData]);
+  }, [grades, page, query]);
 
   const handleDelete = async () => {
     try {
       await AxiosInstance.delete(`athletes/${selectedAthlete.id}/`);
       console.log("Deleted athlete:", selectedAthlete);
-      
-      const updatedData = myData.filter((athlete) => athlete.id !== selectedAthlete.id);
-      setMyData(updatedData);
-      setFilteredData(updatedData);
+
       setOpenDialog(false);
+      if (myData.length === 1 && page > 1) {
+        setPage(page - 1);
+      } else {
+        GetData();
+      }
     } catch (error) {
       console.error("Error deleting athlete:", error);
       setError("Failed to delete athlete");
@@ -130,7 +145,7 @@ const Athletes = () => {
         <div>
           <h1 className="text-3xl font-bold tracking-tight">Athletes</h1>
           <p className="text-muted-foreground">
-            Manage athlete registrations and profiles ({filteredData.length} athletes)
+            Manage athlete registrations and profiles ({count} athletes)
           </p>
         </div>
         {isAdmin && (
@@ -149,7 +164,7 @@ const Athletes = () => {
           <div className="relative">
             <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-muted-foreground h-4 w-4" />
             <Input
-              placeholder="Search by name, club, or grade..."
+              placeholder="Search by name..."
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
               className="pl-10"
@@ -160,10 +175,10 @@ const Athletes = () => {
 
       <Card>
         <CardHeader>
-          <CardTitle>Athletes ({filteredData.length})</CardTitle>
+          <CardTitle>Athletes ({count})</CardTitle>
         </CardHeader>
         <CardContent>
-          {filteredData.length === 0 ? (
+          {myData.length === 0 ? (
             <Alert>
               <AlertDescription>
                 {searchTerm ? "No athletes found matching your search criteria." : "No athletes available."}
@@ -182,7 +197,7 @@ const Athletes = () => {
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {filteredData.map((athlete) => (
+                  {myData.map((athlete) => (
                     <TableRow key={athlete.id}>
                       <TableCell>
                         <div className="flex items-center space-x-3">
@@ -254,6 +269,19 @@ const Athletes = () => {
               </Table>
             </div>
           )}
+          {pageCount > 1 && (
+            <div className="flex items-center justify-end space-x-2 pt-4">
+              <span className="text-sm text-muted-foreground">
+                Page {page} of {pageCount}
+              </span>
+              <Button variant="outline" size="sm" onClick={() => setPage(page - 1)} disabled={page <= 1}>
+                Previous
+              </Button>
+              <Button variant="outline" size="sm" onClick={() => setPage(page + 1)} disabled={page >= pageCount}>
+                Next
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
@@ -134,7 +134,7 @@ const CategoryDetails = () => {
 
         // Fetch matches for this category
         try {
-          const matchesResponse = await AxiosInstance.get(`/matches/`);
+          const matchesResponse = await AxiosInstance.get(`/matches/`, { params: { category: categoryId, all: 1 } });
           const allMatches = Array.isArray(matchesResponse.data)
             ? matchesResponse.data
             : matchesResponse.data.results || [];
@@ -105,7 +105,7 @@ const CompetitionDetails = () => {
         const categoriesResponse = await AxiosInstance.get("/categories/");
         const teamsResponse = await AxiosInstance.get("/teams/");
         const clubsResponse = await AxiosInstance.get("/clubs/");
-        const matchesResponse = await AxiosInstance.get("/matches/");
+        const matchesResponse = await AxiosInstance.get("/matches/", { params: { all: 1 } });
 
         const competition = competitionsResponse.data.find(
           (comp) => comp.id === parseInt(competitionId)
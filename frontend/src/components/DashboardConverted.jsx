@@ -41,7 +41,7 @@ const Dashboard = () => {
           teamsResponse
         ] = await Promise.all([
           AxiosInstance.get("/clubs/"),
-          AxiosInstance.get("/athletes/"),
+          AxiosInstance.get("/athletes/", { params: { all: 1 } }),
           AxiosInstance.get("/annual-visas/"),
           AxiosInstance.get("/competitions/"),
           AxiosInstance.get("/categories/"),
@@ -29,7 +29,7 @@ const NewsSidebar = () => {
   const fetchSidebarData = async () => {
     try {
       // Fetch athletes using AxiosInstance (handles auth and cookies)
-      const athletesResponse = await AxiosInstance.get('/athletes/');
+      const athletesResponse = await AxiosInstance.get('/athletes/', { params: { all: 1 } });
       const allAthletes = athletesResponse.data.results || athletesResponse.data || [];
       
       // Shuffle array and take up to 5 athletes randomly
@@ -182,7 +182,7 @@ const ViewAthlete = () => {
   // Function to fetch all available athletes for lookups
   const fetchAvailableAthletes = async () => {
     try {
-      const response = await AxiosInstance.get('athletes/');
+      const response = await AxiosInstance.get('athletes/', { params: { all: 1 } });
       setAvailableAthletes(response.data);
     } catch (error) {
       console.error('Error fetching available athletes:', error);
@@ -280,7 +280,7 @@ const ViewAthlete = () => {
         setTrainingSeminars(trainingSeminarsResponse.data);
 
         // Fetch matches
-        const matchesResponse = await AxiosInstance.get(`matches/?athlete_id=${id}`);
+        const matchesResponse = await AxiosInstance.get(`matches/?athlete_id=${id}&all=1`);
         const matches = matchesResponse.data;
 
         // Fetch categories and competitions for matches
@@ -562,7 +562,7 @@ const ViewAthlete = () => {
   useEffect(() => {
     const fetchAthleteIds = async () => {
       try {
-        const response = await AxiosInstance.get("athletes/");
+        const response = await AxiosInstance.get("athletes/", { params: { all: 1 } });
         const ids = response.data.map((athlete) => athlete.id);
         setAthleteIds(ids);
 
@@ -286,7 +286,7 @@ const ViewAthleteConverted = () => {
           AxiosInstance.get(`grade-histories/?athlete=${id}`).catch(() => ({ data: [] })),
           AxiosInstance.get(`medical-visas/?athlete=${id}`).catch(() => ({ data: [] })),
           AxiosInstance.get(`annual-visas/?athlete=${id}`).catch(() => ({ data: [] })),
-          AxiosInstance.get(`matches/?athlete=${id}`).catch(() => ({ data: [] })),
+          AxiosInstance.get(`matches/?athlete=${id}&all=1`).catch(() => ({ data: [] })),
           // Fetch all available training seminars for the Add Seminar dialog
           AxiosInstance.get(`training-seminars/`).catch(() => ({ data: [] }))
         ]);
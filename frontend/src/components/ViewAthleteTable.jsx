@@ -444,7 +444,7 @@ const ViewAthleteConverted = () => {
           console.warn('Failed to fetch annual-visas:', err.response?.status, err.message);
           return { data: [] };
         }),
-        AxiosInstance.get(`matches/`).catch((err) => {
+        AxiosInstance.get(`matches/`, { params: { all: 1 } }).catch((err) => {
           console.warn('Failed to fetch matches:', err.response?.status, err.message);
           return { data: [] };
         })
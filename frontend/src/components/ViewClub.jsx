@@ -52,7 +52,7 @@ const ViewClub = () => {
         }, {});
 
         console.log("Fetching athletes...");
-        const athletesResponse = await AxiosInstance.get("athletes/");
+        const athletesResponse = await AxiosInstance.get("athletes/", { params: { all: 1 } });
         const clubAthletes = athletesResponse.data.filter(
           (athlete) => athlete.club === parseInt(id)
         );
@@ -27,7 +27,7 @@ const ViewClubConverted = () => {
         // Fetch club, athletes, and grades in parallel
         const [clubResponse, athletesResponse, gradesResponse] = await Promise.all([
           AxiosInstance.get(`clubs/${id}/`),
-          AxiosInstance.get("athletes/"),
+          AxiosInstance.get("athletes/", { params: { all: 1 } }),
           AxiosInstance.get("grades/")
         ]);
         